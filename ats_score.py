@@ -0,0 +1,186 @@
+"""
+Local ATS-style keyword match score for a resume against a job description.
+
+Keywords are the job description's single words and two-word phrases, weighted by
+TF-IDF (with sublinear term frequency), where the "documents" for IDF are the lines of the posting, so boilerplate
+that appears everywhere ("team", "customers") counts for less than stack names that
+appear once or twice. The top keywords become the columns of a NumPy matrix with one
+row per resume string (summary, each bullet, each skill list). Coverage is computed
+for all rows at once. The score is the share of keyword weight the resume covers.
+
+Usage: python ats_score.py [resume.json ...] [--job-description PATH]
+"""
+import argparse
+import json
+import re
+import time
+
+import numpy as np
+
+TOP_KEYWORDS = 40
+SKIPPED_SECTIONS = ("name", "contact")
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./-][a-z0-9+#]+)*(?:'[a-z]+)?")
+
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could
+did do does doing each every for from further had has have having he her here his how
+i if in into is it its itself just me more most my no nor not of off on once only or
+other our ours out over own per same she should so some such than that the their them
+then there these they this those through to too under until up very was we were what
+when where which while who whom why will with would you your yours
+ability able across etc eg ie including new one plus role strong us well work working
+years year day days week looking join seeking must will within
+business businesses client clients company customer customers team teams grow growth help
+build building built make making enable enabling empower focus ideal various want need
+""".split())
+
+
+def terms(text):
+    """Words plus two-word phrases whose words are adjacent and not stopwords."""
+    words = _TOKEN.findall(text.lower().replace("\u2019", "'"))
+    out = []
+    prev = None
+    for word in words:
+        # Contractions ("you'll") are function words; bare numbers are not skills
+        if word in STOPWORDS or "'" in word or word.isdigit() \
+                or (len(word) == 1 and word not in ("c", "r")):
+            prev = None
+            continue
+        out.append(word)
+        if prev is not None:
+            out.append(prev + " " + word)
+        prev = word
+    return out
+
+
+def _count_matrix(docs, vocab):
+    """docs x vocab term counts, filled with a single scatter-add."""
+    rows, cols = [], []
+    for i, doc in enumerate(docs):
+        for term in doc:
+            j = vocab.get(term)
+            if j is not None:
+                rows.append(i)
+                cols.append(j)
+    counts = np.zeros((len(docs), len(vocab)), dtype=np.float64)
+    np.add.at(counts, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), 1)
+    return counts
+
+
+def resume_segments(resume):
+    """(section, text) for every string in the resume outside the heading."""
+    segments = []
+
+    def walk(section, value):
+        if isinstance(value, str):
+            if value.strip():
+                segments.append((section, value))
+        elif isinstance(value, dict):
+            for item in value.values():
+                walk(section, item)
+        elif isinstance(value, list):
+            for item in value:
+                walk(section, item)
+
+    for section, value in resume.items():
+        if section not in SKIPPED_SECTIONS:
+            walk(section, value)
+    return segments
+
+
+class AtsReport:
+    def __init__(self, score, missing, sections, seconds):
+        self.score = score  # percent of keyword weight covered
+        self.missing = missing  # keywords absent from the whole resume, heaviest first
+        self.sections = sections  # section -> (score, keywords missing from that section)
+        self.seconds = seconds
+
+
+class AtsScorer:
+    """Extracts the job description's keywords once; score() can then be called per resume."""
+
+    def __init__(self, job_desc, top_k=TOP_KEYWORDS, ignore=()):
+        # ignore: e.g. the company name, which no resume is expected to contain
+        ignore = {term for text in ignore for term in terms(text)}
+        lines = [[t for t in terms(line) if t not in ignore]
+                 for line in job_desc.splitlines() if line.strip()]
+        vocab = {}
+        for line in lines:
+            for term in line:
+                vocab.setdefault(term, len(vocab))
+        counts = _count_matrix(lines, vocab)
+
+        tf = counts.sum(axis=0)
+        df = (counts > 0).sum(axis=0)
+        idf = np.log((1 + len(lines)) / (1 + df)) + 1
+        weights = (1 + np.log(np.maximum(tf, 1))) * idf
+        # Phrases that only ever occur once are usually just adjacent words, not skills
+        is_phrase = np.array([" " in term for term in vocab], dtype=bool)
+        weights[is_phrase & (tf < 2)] = 0
+
+        order = np.argsort(-weights, kind="stable")[:top_k]
+        order = order[weights[order] > 0]
+        names = list(vocab)
+        self.keywords = [names[j] for j in order]
+        self.weights = weights[order]
+        self._index = {term: i for i, term in enumerate(self.keywords)}
+
+    def score(self, resume):
+        start = time.perf_counter()
+        segments = resume_segments(resume)
+        section_names = list(dict.fromkeys(section for section, _ in segments))
+        section_ids = np.array([section_names.index(s) for s, _ in segments], dtype=np.intp)
+
+        present = _count_matrix([terms(text) for _, text in segments], self._index) > 0
+        total = self.weights.sum() or 1.0
+
+        covered = present.any(axis=0)
+        by_section = np.zeros((len(section_names), len(self.keywords)), dtype=bool)
+        np.logical_or.at(by_section, section_ids, present)
+        section_scores = by_section @ self.weights / total * 100
+
+        sections = {
+            name: (float(section_scores[i]),
+                   [k for k, hit in zip(self.keywords, by_section[i]) if not hit])
+            for i, name in enumerate(section_names)
+        }
+        missing = [k for k, hit in zip(self.keywords, covered) if not hit]
+        return AtsReport(float(self.weights @ covered / total * 100), missing, sections,
+                         time.perf_counter() - start)
+
+
+def format_report(report, label="ATS score", show_missing=8):
+    lines = [f"{label}: {report.score:.1f}% ({report.seconds * 1000:.1f} ms)"]
+    if report.missing:
+        lines.append("  missing keywords: " + ", ".join(report.missing[:show_missing * 2]))
+    for name, (score, missing) in report.sections.items():
+        lines.append(f"  {name:<12} {score:5.1f}%  missing: {', '.join(missing[:show_missing])}")
+    return "\n".join(lines)
+
+
+def format_change(before, after):
+    """One-line before/after summary, e.g. for resume.json vs optimized_resume.json."""
+    return (f"ATS score: {before.score:.1f}% -> {after.score:.1f}% "
+            f"({(before.seconds + after.seconds) * 1000:.1f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score resumes against a job description.")
+    parser.add_argument("resumes", nargs="*", default=["resume.json"],
+                        help="resume JSON files (default resume.json)")
+    parser.add_argument("--job-description", default="job_description.txt")
+    parser.add_argument("--company", action="append", default=[],
+                        help="name to leave out of the keywords (repeatable)")
+    args = parser.parse_args()
+
+    with open(args.job_description) as f:
+        scorer = AtsScorer(f.read(), ignore=args.company)
+    print("Keywords: " + ", ".join(scorer.keywords))
+    for path in args.resumes:
+        with open(path) as f:
+            print(format_report(scorer.score(json.load(f)), label=path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Batch mode for combo.py: tailor the resume and cover letter for every job in a manifest.
+
+The manifest is either JSONL (one {"company": ..., "job_description": ...} object per
+line) or CSV with "company" and "job_description" columns, where job_description is
+the path to that posting's description file. Results go to ./resume/<company>/ just
+like a single combo.py run. For hundreds of jobs, batch_queue.py sends the same
+manifest through the Batch API instead of making the calls interactively.
+
+Usage: python batch.py <manifest.jsonl|manifest.csv> [--workers N] [--speculative-cover] [--patch]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import combo
+from compile_pool import CompilePool
+from llm_cache import ResponseCache
+import tracing
+from token_budget import token_summary
+
+DEFAULT_WORKERS = 8
+
+
+def load_manifest(path):
+    """
+    Return a list of {"company", "job_description"} rows from a JSONL or CSV manifest.
+    Each company may appear once, since its jobs would share ./resume/<company>/.
+    """
+    with open(path, newline='') as f:
+        if path.endswith('.csv'):
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f if line.strip()]
+
+    jobs = []
+    seen = {}
+    for line_no, row in enumerate(rows, 1):
+        company = (row.get("company") or "").strip()
+        jd_path = (row.get("job_description") or "").strip()
+        if not company or not jd_path:
+            raise ValueError(f"{path}: row {line_no} needs both 'company' and 'job_description'")
+        key = os.path.normcase(company)
+        if key in seen:
+            raise ValueError(f"{path}: row {line_no} repeats company {company!r} from row {seen[key]}")
+        seen[key] = line_no
+        # Job description paths are relative to the manifest, not the working directory
+        if not os.path.isabs(jd_path):
+            jd_path = os.path.join(os.path.dirname(os.path.abspath(path)), jd_path)
+        jobs.append({"company": company, "job_description": jd_path})
+    return jobs
+
+
+def run_job(client, resume, job, speculative_cover=False, cache=None, pool=None, force=False,
+            patch=False, page_fit=True, candidates=1):
+    start = time.perf_counter()
+    with open(job["job_description"]) as f:
+        job_desc = f.read()
+    artifacts = combo.tailor(client, job["company"], resume, job_desc, show_progress=False,
+                             speculative_cover=speculative_cover, cache=cache, pool=pool,
+                             force=force, patch=patch, page_fit=page_fit, candidates=candidates)
+    ok = artifacts["resume_pdf"] is not None and artifacts["cover_pdf"] is not None
+    return ok, time.perf_counter() - start, None if ok else "LaTeX compilation failed"
+
+
+def run_batch(jobs, workers=DEFAULT_WORKERS, client=None, resume=None, speculative_cover=False,
+              cache=None, pool=None, force=False, patch=False, base_url=None, page_fit=True,
+              candidates=1):
+    """
+    Run combo.tailor for every job with at most `workers` pipelines in flight.
+    Returns a list of (company, ok, seconds, error) tuples in completion order.
+    """
+    if client is None:
+        client = combo.LazyClient(base_url)
+    if resume is None:
+        with open('resume.json') as f:
+            resume = json.load(f)
+
+    results = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(run_job, client, resume, job, speculative_cover, cache, pool, force,
+                            patch, page_fit, candidates): job
+            for job in jobs
+        }
+        for future in as_completed(futures):
+            company = futures[future]["company"]
+            try:
+                ok, seconds, error = future.result()
+            except Exception as e:
+                ok, seconds, error = False, 0.0, f"{type(e).__name__}: {e}"
+            results.append((company, ok, seconds, error))
+            status = "ok" if ok else "FAILED"
+            print(f"[{len(results)}/{len(jobs)}] {company}: {status} ({seconds:.1f}s)"
+                  + (f" - {error}" if error else ""))
+    return results
+
+
+def print_summary(results, elapsed):
+    succeeded = sum(1 for _, ok, _, _ in results if ok)
+    failed = [company for company, ok, _, _ in results if not ok]
+    print()
+    print(f"Finished {len(results)} jobs in {elapsed:.1f}s: {succeeded} succeeded, {len(failed)} failed")
+    if results and elapsed > 0:
+        print(f"Throughput: {len(results) / elapsed * 60:.1f} jobs/min")
+    if failed:
+        print("Failed: " + ", ".join(sorted(failed)))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the combo.py pipeline for every job in a manifest.",
+        epilog="Example: python batch.py jobs.jsonl --workers 8",
+    )
+    parser.add_argument("manifest", help="JSONL or CSV file of company + job_description path")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"pipelines to run at once (default {DEFAULT_WORKERS})")
+    parser.add_argument("--speculative-cover", action="store_true",
+                        help="start each cover letter from the original resume.json right away")
+    parser.add_argument("--compile-workers", type=int, default=None,
+                        help="concurrent pdflatex processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true",
+                        help="rerun every stage, LLM calls included, even if its checkpoint is current")
+    parser.add_argument("--candidates", type=int, default=1, metavar="N",
+                        help="request N optimized resumes per job and keep the best by local score")
+    parser.add_argument("--no-page-fit", action="store_true",
+                        help="don't draft-compile and trim resumes to fit on one page")
+    parser.add_argument("--no-format", action="store_true",
+                        help="compile without the precompiled preamble format files")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always call the API instead of reusing cached responses")
+    parser.add_argument("--patch", action="store_true",
+                        help="have the model return only a JSON Patch against resume.json")
+    parser.add_argument("--base-url", metavar="URL",
+                        help="OpenAI-compatible API endpoint (default: $OPENAI_BASE_URL or OpenAI)")
+    parser.add_argument("--profile", nargs="?", const=tracing.DEFAULT_PROFILE, metavar="PATH",
+                        help="trace every stage of every job and write the spans to PATH")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    error = combo.check_candidates(args.candidates, patch=args.patch)
+    if error:
+        parser.error(error)
+    return args
+
+
+def main():
+    args = parse_args()
+    if args.profile:
+        tracing.enable(args.profile)
+
+    try:
+        jobs = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(f"Loaded {len(jobs)} jobs from {args.manifest} ({args.workers} workers)")
+
+    start = time.perf_counter()
+    cache = ResponseCache(enabled=not args.no_cache)
+    with CompilePool(args.compile_workers, use_format=not args.no_format) as pool:
+        results = run_batch(jobs, args.workers, speculative_cover=args.speculative_cover,
+                            cache=cache, pool=pool, force=args.force, patch=args.patch,
+                            base_url=args.base_url, page_fit=not args.no_page_fit,
+                            candidates=args.candidates)
+    print_summary(results, time.perf_counter() - start)
+    print(cache.summary())
+    print(token_summary())
+    print(pool.summary())
+    tracing.finish()
+    sys.exit(0 if all(ok for _, ok, _, _ in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
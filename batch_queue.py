@@ -0,0 +1,280 @@
+"""
+Two-phase batch mode for large runs: submit every job's LLM requests at once through
+the OpenAI Batch API, then collect the answers and build all the PDFs.
+
+    python batch_queue.py submit jobs.jsonl            # writes .batch_queue/<batch id>.json
+    python batch_queue.py collect [<batch id>] --wait  # the latest batch by default
+
+submit writes the optimize and cover letter request of every job in a batch.py
+manifest to one JSONL file and uploads it as a single batch. Requests that are
+already in the response cache are left out. collect polls the batch and downloads
+the results. Every finished answer goes into the response cache (llm_cache.py), and
+then the batch.py pipeline runs for each job whose answers all arrived. Each of its
+LLM calls is then a cache hit, so only rendering and compilation remain, and the
+compile pool sets the pace.
+
+The cover letter goes out before any optimized resume exists, so it is written from
+the original resume, as with --speculative-cover. Answers that failed or were cut
+off at max_tokens are not cached, and their jobs are listed for a normal batch.py
+run. The same goes for jobs whose resume.json or job description changed after
+submit, since their prompts no longer match.
+
+Point --base-url at mock_openai_server.py to use its Batch API stand-in.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+import batch
+import combo
+import tracing
+from compile_pool import CompilePool
+from llm_cache import ResponseCache
+from token_budget import token_summary
+
+QUEUE_DIR = ".batch_queue"
+ENDPOINT = "/v1/chat/completions"
+COMPLETION_WINDOW = "24h"
+POLL_SECONDS = 30
+PENDING_STATUSES = ("validating", "in_progress", "finalizing", "cancelling")
+
+
+def build_requests(jobs, resume, cache=None):
+    """Batch API request lines for every job's optimize and cover letter calls not in cache."""
+    lines = []
+    for i, job in enumerate(jobs):
+        with open(job["job_description"]) as f:
+            job_desc = f.read()
+        optimize_prompt = combo.build_optimize_prompt(resume, job_desc)
+        calls = [
+            ("optimize", optimize_prompt, combo.optimize_budget(resume, optimize_prompt), combo.JSON_MODE),
+            ("cover", combo.build_cover_prompt(resume, job_desc), combo.COVER_MAX_TOKENS, None),
+        ]
+        for kind, prompt, max_tokens, response_format in calls:
+            if cache is not None and cache.get(combo.MODEL, max_tokens, prompt,
+                                                  response_format=response_format) is not None:
+                continue
+            body = {"model": combo.MODEL, "messages": [{"role": "user", "content": prompt}],
+                    "max_tokens": max_tokens}
+            if response_format is not None:
+                body["response_format"] = response_format
+            lines.append({"custom_id": f"{i}/{kind}", "method": "POST", "url": ENDPOINT, "body": body})
+    return lines
+
+
+def state_path(batch_id, queue_dir=QUEUE_DIR):
+    return os.path.join(queue_dir, batch_id + ".json")
+
+
+def load_state(batch_id=None, queue_dir=QUEUE_DIR):
+    """The saved state of batch_id, or of the most recently submitted batch."""
+    if batch_id is not None:
+        path = state_path(batch_id, queue_dir)
+    else:
+        paths = glob.glob(os.path.join(queue_dir, "*.json"))
+        if not paths:
+            raise FileNotFoundError(f"no submitted batches in {queue_dir}/")
+        path = max(paths, key=os.path.getmtime)
+    with open(path) as f:
+        return json.load(f)
+
+
+def submit(client, jobs, resume, manifest_path, cache=None, base_url=None, queue_dir=QUEUE_DIR):
+    """Upload the requests for jobs as one batch; returns the saved state, or None if all were cached."""
+    lines = build_requests(jobs, resume, cache)
+    if not lines:
+        print(f"Every answer is already cached; run `python batch.py {manifest_path}` directly")
+        return None
+
+    os.makedirs(queue_dir, exist_ok=True)
+    input_path = os.path.join(queue_dir, time.strftime("requests-%Y%m%d-%H%M%S.jsonl"))
+    with open(input_path, "w") as f:
+        for line in lines:
+            f.write(json.dumps(line) + "\n")
+
+    with tracing.span("batch_upload", requests=len(lines)):
+        with open(input_path, "rb") as f:
+            input_file = client.files.create(file=f, purpose="batch")
+        submitted = client.batches.create(input_file_id=input_file.id, endpoint=ENDPOINT,
+                                          completion_window=COMPLETION_WINDOW)
+
+    # The request file is read back by collect to map answers to their prompts
+    final_input = os.path.join(queue_dir, submitted.id + ".jsonl")
+    os.replace(input_path, final_input)
+    state = {"batch_id": submitted.id, "manifest": manifest_path, "jobs": jobs, "input": final_input,
+             "base_url": base_url, "submitted": time.time()}
+    with open(state_path(submitted.id, queue_dir), "w") as f:
+        json.dump(state, f, indent=2)
+    print(f"Submitted {len(lines)} requests for {len(jobs)} jobs as batch {submitted.id}")
+    print(f"Collect the results with `python batch_queue.py collect {submitted.id} --wait`")
+    return state
+
+
+def wait_for(client, batch_id, wait=False, poll_seconds=POLL_SECONDS):
+    """The batch once it has finished, or None if it is still running and wait is off."""
+    with tracing.span("batch_wait", batch=batch_id):
+        while True:
+            status = client.batches.retrieve(batch_id)
+            counts = status.request_counts
+            progress = f"{counts.completed + counts.failed}/{counts.total} done" if counts else ""
+            if status.status not in PENDING_STATUSES:
+                return status
+            print(f"Batch {batch_id}: {status.status} {progress}".rstrip())
+            if not wait:
+                return None
+            time.sleep(poll_seconds)
+
+
+def read_jsonl(text):
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def store_results(client, finished, state, cache):
+    """
+    Put every usable answer of a finished batch into cache. Returns (stored, failed),
+    sets of custom_ids.
+    """
+    with open(state["input"]) as f:
+        requests = {line["custom_id"]: line["body"] for line in read_jsonl(f.read())}
+
+    results = []
+    with tracing.span("batch_download", batch=state["batch_id"]):
+        for file_id in (finished.output_file_id, finished.error_file_id):
+            if file_id:
+                results += read_jsonl(client.files.content(file_id).text)
+
+    stored, prompt_tokens, completion_tokens = set(), 0, 0
+    for result in results:
+        custom_id = result.get("custom_id")
+        body = requests.get(custom_id)
+        response = result.get("response") or {}
+        if body is None or response.get("status_code") != 200:
+            continue
+        completion = response.get("body") or {}
+        usage = completion.get("usage") or {}
+        prompt_tokens += usage.get("prompt_tokens") or 0
+        completion_tokens += usage.get("completion_tokens") or 0
+        choice = (completion.get("choices") or [{}])[0]
+        if choice.get("finish_reason") != "stop":
+            continue
+        content = (choice.get("message") or {}).get("content") or ""
+        cache.put(body["model"], body["max_tokens"], body["messages"][-1]["content"], content,
+                  response_format=body.get("response_format"))
+        stored.add(custom_id)
+    print(f"Batch usage: {prompt_tokens} prompt + {completion_tokens} completion tokens")
+    return stored, set(requests) - stored
+
+
+def collect(client, state, cache, wait=False, poll_seconds=POLL_SECONDS):
+    """
+    Download a submitted batch into cache. Returns (ready, missing) job lists, or
+    None while the batch is still running.
+    """
+    finished = wait_for(client, state["batch_id"], wait, poll_seconds)
+    if finished is None:
+        return None
+    counts = finished.request_counts
+    print(f"Batch {state['batch_id']}: {finished.status}"
+          + (f", {counts.completed} completed, {counts.failed} failed" if counts else ""))
+    stored, failed = store_results(client, finished, state, cache)
+    print(f"Cached {len(stored)} answers" + (f", {len(failed)} unusable" if failed else ""))
+
+    ready, missing = [], []
+    for i, job in enumerate(state["jobs"]):
+        bad = any(f"{i}/{kind}" in failed for kind in ("optimize", "cover"))
+        (missing if bad else ready).append(job)
+    return ready, missing
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Submit a batch.py manifest through the Batch API, then collect and build it.",
+        epilog="Example: python batch_queue.py submit jobs.jsonl && python batch_queue.py collect --wait",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit_parser = commands.add_parser("submit", help="upload every job's LLM requests as one batch")
+    submit_parser.add_argument("manifest", help="JSONL or CSV file of company + job_description path")
+    submit_parser.add_argument("--base-url", metavar="URL",
+                               help="OpenAI-compatible API endpoint (default: $OPENAI_BASE_URL or OpenAI)")
+
+    collect_parser = commands.add_parser("collect", help="download a batch's answers and build every job")
+    collect_parser.add_argument("batch_id", nargs="?", help="batch to collect (default: the latest one)")
+    collect_parser.add_argument("--wait", action="store_true",
+                                help="poll until the batch has finished instead of exiting")
+    collect_parser.add_argument("--poll-seconds", type=float, default=POLL_SECONDS,
+                                help=f"time between status checks with --wait (default {POLL_SECONDS})")
+    collect_parser.add_argument("--workers", type=int, default=batch.DEFAULT_WORKERS,
+                                help=f"jobs to render at once (default {batch.DEFAULT_WORKERS})")
+    collect_parser.add_argument("--compile-workers", type=int, default=None,
+                                help="concurrent pdflatex processes (default: CPU count)")
+    collect_parser.add_argument("--force", action="store_true",
+                                help="rebuild every .tex and PDF even if nothing changed")
+    collect_parser.add_argument("--no-page-fit", action="store_true",
+                                help="don't draft-compile and trim resumes to fit on one page")
+    collect_parser.add_argument("--no-format", action="store_true",
+                                help="compile without the precompiled preamble format files")
+
+    for command in (submit_parser, collect_parser):
+        command.add_argument("--profile", nargs="?", const=tracing.DEFAULT_PROFILE, metavar="PATH",
+                             help="trace every stage and write the spans to PATH")
+    args = parser.parse_args(argv)
+    if args.command == "collect" and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.profile:
+        tracing.enable(args.profile)
+    cache = ResponseCache()
+
+    if args.command == "submit":
+        try:
+            jobs = batch.load_manifest(args.manifest)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            return 1
+        with open('resume.json') as f:
+            resume = json.load(f)
+        state = submit(combo.create_client(args.base_url), jobs, resume, args.manifest, cache,
+                       args.base_url)
+        tracing.finish()
+        return 0 if state is not None else 1
+
+    try:
+        state = load_state(args.batch_id)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        return 1
+    client = combo.create_client(state["base_url"])
+    collected = collect(client, state, cache, args.wait, args.poll_seconds)
+    if collected is None:
+        print("Still running; try again later or pass --wait")
+        tracing.finish()
+        return 2
+    ready, missing = collected
+
+    print(f"Building {len(ready)} of {len(state['jobs'])} jobs ({args.workers} workers)")
+    start = time.perf_counter()
+    with CompilePool(args.compile_workers, use_format=not args.no_format) as pool:
+        results = batch.run_batch(ready, args.workers, client=client, speculative_cover=True,
+                                  cache=cache, pool=pool, force=args.force,
+                                  page_fit=not args.no_page_fit)
+    batch.print_summary(results, time.perf_counter() - start)
+    if missing:
+        print("Not collected (run them with batch.py): "
+              + ", ".join(sorted(job["company"] for job in missing)))
+    print(cache.summary())
+    print(token_summary())
+    print(pool.summary())
+    tracing.finish()
+    return 0 if not missing and all(ok for _, ok, _, _ in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Benchmark: JSON Patch optimize mode vs. full resume regeneration.
+
+Sends the optimize request for resume.json + job_description.txt in both modes
+(bypassing the response cache) and reports latency, prompt/completion tokens and
+whether the answer produced a valid resume.
+
+Usage: python bench_patch.py [--repeat N] [--job-description PATH]
+"""
+import argparse
+import json
+import statistics
+import time
+
+import combo
+from json_patch import apply_patch
+from resume_schema import validate_resume
+
+MODES = (
+    ("full", combo.build_optimize_prompt, combo.optimize_budget),
+    ("patch", combo.build_patch_prompt, combo.patch_budget),
+)
+
+
+def run_once(client, mode, build_prompt, budget, resume, job_desc):
+    prompt = build_prompt(resume, job_desc)
+    max_tokens = budget(resume, prompt)
+    start = time.perf_counter()
+    response = client.chat.completions.create(
+        model=combo.MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=max_tokens,
+        response_format=combo.JSON_MODE,
+    )
+    seconds = time.perf_counter() - start
+    content = response.choices[0].message.content
+    try:
+        result = json.loads(content)
+        if mode == "patch":
+            result = apply_patch(resume, result["patch"])
+        valid = not validate_resume(result)
+    except (ValueError, TypeError, KeyError):
+        valid = False
+    usage = response.usage
+    return seconds, usage.prompt_tokens, usage.completion_tokens, valid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare patch and full optimize modes.")
+    parser.add_argument("--repeat", type=int, default=3, help="requests per mode (default 3)")
+    parser.add_argument("--resume", default="resume.json")
+    parser.add_argument("--job-description", default="job_description.txt")
+    args = parser.parse_args()
+
+    with open(args.resume) as f:
+        resume = json.load(f)
+    with open(args.job_description) as f:
+        job_desc = f.read()
+    client = combo.create_client()
+
+    print(f"{args.repeat} requests per mode, model {combo.MODEL}")
+    print(f"{'mode':>6} {'latency s':>10} {'p_tokens':>9} {'c_tokens':>9} {'valid':>6}")
+    means = {}
+    for mode, build_prompt, budget in MODES:
+        runs = [run_once(client, mode, build_prompt, budget, resume, job_desc)
+                for _ in range(args.repeat)]
+        latency = statistics.mean(r[0] for r in runs)
+        prompt_tokens = statistics.mean(r[1] for r in runs)
+        completion_tokens = statistics.mean(r[2] for r in runs)
+        valid = sum(1 for r in runs if r[3])
+        means[mode] = (latency, completion_tokens)
+        print(f"{mode:>6} {latency:10.2f} {prompt_tokens:9.0f} {completion_tokens:9.0f} "
+              f"{valid:>3}/{len(runs)}")
+
+    full, patch = means["full"], means["patch"]
+    if patch[0] and patch[1]:
+        print(f"patch mode: {full[0] / patch[0]:.1f}x faster, "
+              f"{full[1] / patch[1]:.1f}x fewer completion tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+Offline benchmark suite for the render and compile pipeline.
+
+Generates synthetic resumes of increasing size (more experiences, projects and
+bullets, with unicode and LaTeX special characters) and times each stage on its own:
+
+    llm        optimize + cover letter calls answered from recorded responses,
+               plus parsing and schema validation of the answers
+    json_load  json.loads of the resume file
+    render     build_resume_latex (including the LaTeX escaping of every field)
+    compile    pdflatex with its scratch directory (skipped when pdflatex is missing)
+
+Nothing goes over the network. LLM answers come from --recordings (captured once
+with --record), or default to echoing the input resume. Results are written to
+--output and compared against the saved baseline. Any stage more than --threshold
+slower than the baseline is flagged, and the exit status is 1.
+
+Usage: python bench_pipeline.py [--sizes small,medium] [--save-baseline] [--record]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+import combo
+from compile_pool import compile_tex
+from latex_format import pdflatex_version
+from llm_cache import ResponseCache, cached_completion
+from resume_latex import build_resume_latex
+from resume_schema import MAX_ACHIEVEMENTS
+from token_budget import count_tokens
+
+DEFAULT_OUTPUT = "bench_results.json"
+DEFAULT_BASELINE = "bench_baseline.json"
+DEFAULT_RECORDINGS = "bench_recordings.json"
+DEFAULT_THRESHOLD = 0.20  # flag stages more than 20% slower than the baseline
+MIN_DELTA = 0.001  # ...and more than 1 ms slower, so timer noise on tiny stages is ignored
+
+# name: (experiences, projects, bullets per entry)
+SIZES = {
+    "small": (2, 2, 3),
+    "medium": (4, 4, 5),
+    "large": (8, 8, 8),
+    "xlarge": (16, 16, 12),
+}
+
+JOB_DESCRIPTION = (
+    "Senior Software Engineer. Build React and TypeScript front ends, Python/FastAPI "
+    "services and PostgreSQL schemas on AWS. Kubernetes, Terraform and CI/CD experience "
+    "a plus; you will own features end to end & mentor engineers."
+)
+COVER_LETTER = (
+    "I am excited to apply for the Senior Software Engineer role. Over the past years I "
+    "have built React front ends and Python services that cut latency by 40% and saved "
+    "teams hours of manual work each week.\n\nI would welcome the chance to discuss how "
+    "my experience can help your team ship faster."
+)
+
+_SAMPLE_BULLETS = (
+    "Built a React & TypeScript dashboard used by 100+ sites, cutting load time by 45%",
+    "Réduit la latence: migrated the café-ordering API to FastAPI — p99 down from 800ms to 120ms",
+    "Automated the $1M/yr billing #reconciliation job with Python, saving ~2 hours/day",
+    "Led a team of 5 to ship snake_case → camelCase schema migrations with zero downtime",
+    "Designed {templated} reports in SQL; 3× faster “month-end” close for finance",
+)
+
+
+def synthetic_resume(experiences, projects, bullets):
+    def entry_bullets(i):
+        return [
+            (f"Area {i}.{j}: " if j % 3 == 0 else "") + _SAMPLE_BULLETS[(i + j) % len(_SAMPLE_BULLETS)]
+            for j in range(bullets)
+        ]
+
+    return {
+        "name": "Zoë Ångström-Núñez",
+        "contact": {
+            "email": "zoe@example.com",
+            "phone": "555-0100",
+            "linkedin": "https://www.linkedin.com/in/zoe-example",
+            "portfolio": "https://example.com/~zoe/portfolio_site/",
+        },
+        "summary": "Full-stack engineer (React, Python & SQL) shipping 100% test-covered, "
+                   "data-driven tools — fast.",
+        "experience": [
+            {
+                "title": f"Software Engineer {i}",
+                "company": f"Company #{i} & Co.",
+                "location": "Zürich, CH",
+                "date": f"20{10 + i % 15:02d} - Present",
+                "achievements": entry_bullets(i),
+            }
+            for i in range(experiences)
+        ],
+        "projects": [
+            {
+                "name": f"Project_{i}",
+                "subtitle": "Full-stack app with AI insights & Spotify integration",
+                "date": "2024 - 2025",
+                "details": entry_bullets(i + experiences),
+            }
+            for i in range(projects)
+        ],
+        "education": [
+            {
+                "degree": "M.S. Electrical & Computer Engineering",
+                "school": "Duke University",
+                "location": "Durham, NC",
+                "year": "2024",
+                "gpa": "3.9/4.0",
+                "relevant_coursework": ["Algorithms", "Distributed Systems", "Machine Learning"],
+            }
+        ],
+        "skills": {
+            "languages": ["Python", "TypeScript", "C++", "C#", "SQL"],
+            "tools_and_technologies": ["React", "FastAPI", "PostgreSQL", "Docker", "AWS"],
+        },
+    }
+
+
+class RecordedClient:
+    """Stands in for the OpenAI client, answering every request from recorded responses."""
+
+    def __init__(self, recordings, fallback):
+        self.recordings = recordings
+        self.fallback = fallback
+        self.chat = types.SimpleNamespace(completions=self)
+
+    def create(self, model, messages, max_tokens=None, **kwargs):
+        prompt = messages[-1]["content"]
+        key = ResponseCache.key(model, max_tokens, prompt, response_format=kwargs.get("response_format"))
+        content = self.recordings.get(key)
+        if content is None:
+            content = self.fallback(prompt)
+        message = types.SimpleNamespace(content=content)
+        usage = types.SimpleNamespace(prompt_tokens=count_tokens(prompt, model),
+                                      completion_tokens=count_tokens(content, model))
+        return types.SimpleNamespace(
+            choices=[types.SimpleNamespace(message=message, finish_reason="stop")], usage=usage
+        )
+
+
+def echo_fallback(resume):
+    """
+    Default 'recording': the optimize call returns the resume unchanged apart from
+    keeping the first MAX_ACHIEVEMENTS achievements, as the prompt asks.
+    """
+    optimized = dict(resume, experience=[
+        dict(exp, achievements=exp["achievements"][:MAX_ACHIEVEMENTS]) for exp in resume["experience"]
+    ])
+
+    def answer(prompt):
+        if "OPTIMIZED RESUME JSON" in prompt:
+            return json.dumps(optimized)
+        return COVER_LETTER
+    return answer
+
+
+def llm_stage(client, resume):
+    """The optimize and cover letter calls plus parsing/validation, without writing files."""
+    prompt = combo.build_optimize_prompt(resume, JOB_DESCRIPTION)
+    content = cached_completion(client, combo.MODEL, prompt, combo.optimize_budget(resume, prompt),
+                                None, combo.JSON_MODE, "optimize")
+    optimized = combo.parse_resume_json(content)
+    optimized, _ = combo.repair_resume(client, optimized, resume, JOB_DESCRIPTION)
+    cover = cached_completion(client, combo.MODEL, combo.build_cover_prompt(optimized, JOB_DESCRIPTION),
+                              combo.COVER_MAX_TOKENS, None, None, "cover letter")
+    return optimized, cover
+
+
+def timed(func, repeat):
+    """Median wall time of `repeat` calls and the last result."""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def bench_size(name, shape, recordings, repeat, compile_repeat, work_dir):
+    resume = synthetic_resume(*shape)
+    resume_text = json.dumps(resume, indent=2)
+    client = RecordedClient(recordings, echo_fallback(resume))
+    results = {}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        results["llm"], _ = timed(lambda: llm_stage(client, resume), repeat)
+    results["json_load"], loaded = timed(lambda: json.loads(resume_text), repeat)
+    results["render"], latex = timed(lambda: build_resume_latex(loaded), repeat)
+
+    output_dir = os.path.join(work_dir, name)
+    os.makedirs(output_dir, exist_ok=True)
+    tex_path = os.path.join(output_dir, f"Bench_{name}.tex")
+    with open(tex_path, "w") as f:
+        f.write(latex)
+
+    compile_ok = None
+    if shutil.which("pdflatex"):
+        results["compile"], compiled = timed(lambda: compile_tex(tex_path), compile_repeat)
+        compile_ok = compiled.ok
+
+    bullets = (shape[0] + shape[1]) * shape[2]
+    return {"bullets": bullets, "tex_bytes": len(latex.encode("utf-8")), "compile_ok": compile_ok,
+            "stages": results}
+
+
+def compare(results, baseline, threshold):
+    """Return [(size, stage, baseline s, current s)] for stages that got slower."""
+    regressions = []
+    for size, current in results["sizes"].items():
+        base = baseline.get("sizes", {}).get(size)
+        if base is None:
+            continue
+        for stage, seconds in current["stages"].items():
+            before = base["stages"].get(stage)
+            if before is None:
+                continue
+            if seconds > before * (1 + threshold) and seconds - before > MIN_DELTA:
+                regressions.append((size, stage, before, seconds))
+    return regressions
+
+
+def record(sizes, path):
+    """Capture real optimize / cover letter answers for each size into the recordings file."""
+    recordings = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            recordings = json.load(f)
+    client = combo.create_client()
+
+    class Recorder:
+        def __init__(self):
+            self.chat = types.SimpleNamespace(completions=self)
+
+        def create(self, model, messages, max_tokens=None, **kwargs):
+            response = client.chat.completions.create(model=model, messages=messages,
+                                                      max_tokens=max_tokens, **kwargs)
+            key = ResponseCache.key(model, max_tokens, messages[-1]["content"],
+                                    response_format=kwargs.get("response_format"))
+            recordings[key] = response.choices[0].message.content
+            return response
+
+    for name in sizes:
+        print(f"Recording responses for {name}...")
+        llm_stage(Recorder(), synthetic_resume(*SIZES[name]))
+    with open(path, "w") as f:
+        json.dump(recordings, f, indent=2)
+    print(f"Saved {len(recordings)} recorded responses to {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark of the render/compile pipeline.")
+    parser.add_argument("--sizes", default=",".join(SIZES),
+                        help=f"comma-separated sizes to run (default {','.join(SIZES)})")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per in-process stage")
+    parser.add_argument("--compile-repeat", type=int, default=3, help="runs of the pdflatex stage")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"relative slowdown flagged as a regression (default {DEFAULT_THRESHOLD})")
+    parser.add_argument("--recordings", default=DEFAULT_RECORDINGS,
+                        help="recorded LLM responses to replay")
+    parser.add_argument("--record", action="store_true",
+                        help="call the API once per size and save the answers to --recordings")
+    args = parser.parse_args()
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"unknown sizes: {', '.join(unknown)}")
+    if args.record:
+        record(sizes, args.recordings)
+        return
+
+    recordings = {}
+    if os.path.exists(args.recordings):
+        with open(args.recordings) as f:
+            recordings = json.load(f)
+
+    results = {
+        "created": time.time(),
+        "python": platform.python_version(),
+        "pdflatex": pdflatex_version(),
+        "sizes": {},
+    }
+    work_dir = tempfile.mkdtemp(prefix="bench_pipeline-")
+    try:
+        header = f"{'size':>7} {'bullets':>7} " + " ".join(
+            f"{stage:>10}" for stage in ("llm", "json_load", "render", "compile"))
+        print(header + "   (ms)")
+        for name in sizes:
+            entry = bench_size(name, SIZES[name], recordings, args.repeat, args.compile_repeat,
+                               work_dir)
+            results["sizes"][name] = entry
+            stages = entry["stages"]
+            cells = " ".join(
+                f"{stages[s] * 1000:10.2f}" if s in stages else f"{'-':>10}"
+                for s in ("llm", "json_load", "render", "compile"))
+            note = " (compile failed)" if entry["compile_ok"] is False else ""
+            print(f"{name:>7} {entry['bullets']:7} {cells}{note}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        shutil.copyfile(args.output, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    for size, stage, before, after in regressions:
+        print(f"REGRESSION {size}/{stage}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms "
+              f"(+{(after / before - 1) * 100:.0f}%)")
+    if regressions:
+        sys.exit(1)
+    print(f"No regressions against {args.baseline} (threshold {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Startup cost of the CLI, measured with `python -X importtime`.
+
+Runs each scenario in a fresh interpreter a few times and reports the fastest wall
+time, the total import time and the slowest top-level imports. The offline paths must
+not import the API or scoring libraries at all, and `build` must start within
+BUILD_TARGET_MS. The command exits with status 1 when either check fails.
+
+    python bench_startup.py [--runs 5] [--target-ms 150]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+BUILD_TARGET_MS = 150
+HEAVY_MODULES = ("openai", "httpx", "dotenv", "numpy", "tiktoken")
+# (label, cli.py arguments, whether the heavy modules may be imported)
+SCENARIOS = [
+    ("cli --help", ["--help"], False),
+    ("build --help", ["build", "--help"], False),
+    # A missing input file stops resume_builder right after its imports
+    ("build (imports)", ["build", "missing_resume.json"], False),
+    ("tailor --help", ["tailor", "--help"], False),
+    ("cover --help", ["cover", "--help"], False),
+]
+
+
+def parse_importtime(stderr):
+    """Return {top-level module: cumulative microseconds} and the set of all modules."""
+    top, modules = {}, set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        modules.add(name.strip())
+        if not name[1:].startswith(" "):
+            top[name.strip()] = int(cumulative)
+    return top, modules
+
+
+def measure(args, runs):
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli.py")
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", script] + args,
+                              capture_output=True, text=True)
+        wall = time.perf_counter() - start
+        top, modules = parse_importtime(proc.stderr)
+        if best is None or wall < best[0]:
+            best = (wall, top, modules)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CLI startup with -X importtime.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=BUILD_TARGET_MS,
+                        help=f"startup budget for `build` (default {BUILD_TARGET_MS} ms)")
+    args = parser.parse_args()
+
+    failed = False
+    for label, cli_args, heavy_allowed in SCENARIOS:
+        wall, top, modules = measure(cli_args, args.runs)
+        imports_ms = sum(top.values()) / 1000
+        print(f"{label:<18} {wall * 1000:7.1f} ms wall, {imports_ms:7.1f} ms importing")
+        for name, us in sorted(top.items(), key=lambda item: -item[1])[:5]:
+            print(f"    {us / 1000:7.1f} ms  {name}")
+        heavy = sorted(m for m in modules if m.split(".")[0] in HEAVY_MODULES)
+        if heavy and not heavy_allowed:
+            print(f"    FAIL: imports {', '.join(sorted({m.split('.')[0] for m in heavy}))}")
+            failed = True
+        if label.startswith("build") and wall * 1000 > args.target_ms:
+            print(f"    FAIL: over the {args.target_ms:.0f} ms startup target")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Per-output-directory build manifest for incremental builds.
+
+.build_manifest.json records, for every stage (e.g. "resume_tex", "resume_pdf"), a
+hash of the inputs it was built from and the artifact it produced. A stage whose
+inputs hash matches and whose artifact still exists can be skipped. combo.py also
+checkpoints its LLM stages ("optimize", "cover_text") here, and stages that failed
+are recorded with their error so a rerun only repeats what is missing or failed.
+
+    python build_manifest.py resume/acme    # show each stage's checkpoint
+"""
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+MANIFEST_NAME = ".build_manifest.json"
+# combo.py's pipeline, in order; resume_builder.py only uses the middle two
+STAGES = ("optimize", "resume_tex", "resume_pdf", "cover_text", "cover_tex", "cover_pdf")
+
+
+def digest(*parts):
+    """SHA-256 over a sequence of str/bytes parts (separated so ("ab", "c") != ("a", "bc"))."""
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        h.update(part)
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def file_digest(path):
+    with open(path, "rb") as f:
+        return digest(f.read())
+
+
+class BuildManifest:
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        try:
+            with open(self.path) as f:
+                self.stages = json.load(f)
+        except (OSError, ValueError):
+            self.stages = {}
+
+    def is_fresh(self, stage, inputs, artifact):
+        """True if stage was last built from `inputs` and its artifact is still on disk."""
+        with self._lock:
+            entry = self.stages.get(stage)
+        if entry is None or entry.get("inputs") != inputs or "error" in entry:
+            return False
+        if not os.path.exists(artifact):
+            return False
+        # The artifact must also be the one we built, not a hand-edited copy
+        return entry.get("output") == file_digest(artifact)
+
+    def record(self, stage, inputs, artifact):
+        entry = {
+            "inputs": inputs,
+            "artifact": os.path.basename(artifact),
+            "output": file_digest(artifact),
+            "built_at": time.time(),
+        }
+        with self._lock:
+            self.stages[stage] = entry
+            self._save()
+
+    def fail(self, stage, inputs, error):
+        """Record that stage failed on these inputs, so it is retried and the error can be seen."""
+        entry = {"inputs": inputs, "error": str(error), "built_at": time.time()}
+        with self._lock:
+            self.stages[stage] = entry
+            self._save()
+
+    def forget(self, stage):
+        with self._lock:
+            if self.stages.pop(stage, None) is not None:
+                self._save()
+
+    def _save(self):
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(self.stages, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def format_stages(manifest):
+    names = [s for s in STAGES if s in manifest.stages]
+    names += sorted(s for s in manifest.stages if s not in STAGES)
+    lines = []
+    for name in names:
+        entry = manifest.stages[name]
+        when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry.get("built_at", 0)))
+        if "error" in entry:
+            lines.append(f"{name:<12} FAILED  {when}  {entry['error']}")
+        else:
+            lines.append(f"{name:<12} ok      {when}  {entry.get('artifact')}")
+    return "\n".join(lines)
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python build_manifest.py <output_dir>")
+        sys.exit(1)
+    manifest = BuildManifest(sys.argv[1])
+    if not os.path.exists(manifest.path):
+        print(f"No {MANIFEST_NAME} in {sys.argv[1]}")
+        sys.exit(1)
+    print(format_stages(manifest))
+
+
+if __name__ == "__main__":
+    main()
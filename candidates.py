@@ -0,0 +1,100 @@
+"""
+Local scoring of candidate optimized resumes, for keeping the best of n answers.
+
+Each candidate gets a 0-100 score, a weighted mix (WEIGHTS) of:
+
+    keywords   ATS keyword coverage of the job description (ats_score.py)
+    schema     share of top-level sections that pass validation (resume_schema.py)
+    bullets    how close each experience / project stays to its original bullet
+               count (capped at MAX_ACHIEVEMENTS)
+    length     share of bullets between MIN_BULLET_CHARS and MAX_BULLET_CHARS
+
+Without numpy the keyword term is left out and the other weights are rescaled.
+"""
+from resume_schema import MAX_ACHIEVEMENTS, RESUME_SCHEMA, errors_by_section, validate_resume
+
+WEIGHTS = {"keywords": 0.5, "schema": 0.25, "bullets": 0.15, "length": 0.10}
+MIN_BULLET_CHARS = 40
+MAX_BULLET_CHARS = 220
+BULLET_FIELDS = (("experience", "achievements"), ("projects", "details"))
+
+
+class CandidateScore:
+    def __init__(self, index, total, parts, errors):
+        self.index = index
+        self.total = total  # 0-100
+        self.parts = parts  # component -> 0-1
+        self.errors = errors  # validation errors, as from validate_resume
+
+
+def _bullet_lists(resume, section, field):
+    entries = resume.get(section)
+    if not isinstance(entries, list):
+        return []
+    return [e.get(field) if isinstance(e, dict) and isinstance(e.get(field), list) else []
+            for e in entries]
+
+
+def bullet_count_score(candidate, original):
+    """1.0 when every entry keeps its original bullet count (at most MAX_ACHIEVEMENTS)."""
+    scores = []
+    for section, field in BULLET_FIELDS:
+        have = _bullet_lists(candidate, section, field)
+        for i, bullets in enumerate(_bullet_lists(original, section, field)):
+            target = max(1, min(len(bullets), MAX_ACHIEVEMENTS))
+            count = len(have[i]) if i < len(have) else 0
+            scores.append(max(0.0, 1 - abs(count - target) / target))
+    return sum(scores) / len(scores) if scores else 1.0
+
+
+def bullet_length_score(candidate):
+    bullets = [b for section, field in BULLET_FIELDS
+               for lst in _bullet_lists(candidate, section, field) for b in lst]
+    if not bullets:
+        return 0.0
+    ok = sum(1 for b in bullets if isinstance(b, str) and MIN_BULLET_CHARS <= len(b) <= MAX_BULLET_CHARS)
+    return ok / len(bullets)
+
+
+def schema_score(errors):
+    sections = RESUME_SCHEMA["required"]
+    bad = errors_by_section(errors)
+    return 1 - sum(1 for s in sections if s in bad) / len(sections)
+
+
+def score_candidates(candidates, original, scorer=None):
+    """
+    Score parsed candidate resumes (None for one that did not parse) against the
+    original resume. scorer is an ats_score.AtsScorer for the job, or None.
+    Returns CandidateScores, best first.
+    """
+    weights = dict(WEIGHTS)
+    if scorer is None:
+        del weights["keywords"]
+    scale = sum(weights.values())
+
+    scores = []
+    for index, candidate in enumerate(candidates):
+        if not isinstance(candidate, dict) or not candidate:
+            scores.append(CandidateScore(index, 0.0, {}, [((), "did not parse")]))
+            continue
+        errors = validate_resume(candidate)
+        parts = {
+            "schema": schema_score(errors),
+            "bullets": bullet_count_score(candidate, original),
+            "length": bullet_length_score(candidate),
+        }
+        if scorer is not None:
+            parts["keywords"] = scorer.score(candidate).score / 100
+        total = 100 * sum(weights[k] * parts[k] for k in weights) / scale
+        scores.append(CandidateScore(index, total, parts, errors))
+    # Stable: ties keep the API's order
+    return sorted(scores, key=lambda s: -s.total)
+
+
+def format_scores(scores):
+    lines = [f"{'candidate':>9} {'score':>6} " + " ".join(f"{k:>8}" for k in WEIGHTS)]
+    for s in sorted(scores, key=lambda s: s.index):
+        parts = " ".join(f"{s.parts[k] * 100:7.0f}%" if k in s.parts else f"{'-':>8}" for k in WEIGHTS)
+        lines.append(f"{s.index + 1:>9} {s.total:6.1f} {parts}")
+    return "\n".join(lines)
@@ -0,0 +1,81 @@
+"""
+One entry point for the resume tools:
+
+    python cli.py build resume.json [--force]         JSON -> PDF, offline
+    python cli.py build resume.json --preview         same, TeX-free approximation (preview.py)
+    python cli.py tailor instagram [--stream ...]     combo.py: optimize + cover letter
+    python cli.py cover glossgenius                   cover_gen.py: cover letter only
+
+Everything after the subcommand goes to the underlying script, so each keeps its own
+options and --help. Subcommands import their module only when they run. `build` never
+loads openai, dotenv or numpy, and `--help` or a usage error loads nothing beyond the
+standard library. Check startup cost with:
+
+    python -X importtime cli.py build resume.json 2> importtime.log
+    python bench_startup.py
+"""
+import sys
+
+USAGE = """usage: python cli.py <command> [args...]
+
+commands:
+  build    render a resume JSON file to PDF (resume_builder.py)
+  tailor   tailor resume.json to job_description.txt and write a cover letter (combo.py)
+  cover    write a cover letter for job_description.txt (cover_gen.py)
+
+Run `python cli.py <command> --help` for a command's options."""
+
+
+def run_build(argv):
+    import resume_builder
+    return resume_builder.main(argv)
+
+
+def run_tailor(argv):
+    import combo
+    return combo.main(argv)
+
+
+def run_cover(argv):
+    import cover_gen
+    return cover_gen.main(argv)
+
+
+def build_help():
+    print("Usage: python cli.py build <input_json_file> [--force] [--preview] [--profile[=trace.json]]")
+    print("Render a resume JSON file to ./resume/<name>/<name>.pdf without calling the API.")
+    print("--preview writes an approximate <name>_preview.pdf in pure Python, without pdflatex.")
+
+
+def cover_help():
+    print("Usage: python cli.py cover <company_name> [--no-cache] [--profile[=trace.json]]")
+    print("Write a cover letter for job_description.txt to ~/Desktop/resume/<company_name>.")
+
+
+COMMANDS = {
+    "build": (run_build, build_help),
+    "tailor": (run_tailor, None),
+    "cover": (run_cover, cover_help),
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(USAGE)
+        return 0 if argv else 1
+    command, args = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"Unknown command '{command}'\n")
+        print(USAGE)
+        return 1
+    run, show_help = COMMANDS[command]
+    # The hand-parsed scripts have no --help of their own; answer it without importing them
+    if show_help is not None and any(a in ("-h", "--help") for a in args):
+        show_help()
+        return 0
+    return run(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
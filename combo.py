@@ -1,45 +1,84 @@
-from openai import OpenAI
+import argparse
 import json
 import os
-from dotenv import load_dotenv
-import subprocess
-import sys
 import time
 import threading
 
-# Get input file from command line argument
-if len(sys.argv) != 2:
-    print("Usage: python combo.py <company_name>")
-    print("Example: python combo.py instagram")
-    sys.exit(1)
+from json_stream import SectionStreamParser
+from resume_schema import (
+    RESUME_SCHEMA,
+    errors_by_section,
+    section_errors,
+    trim_to_schema,
+    validate_resume,
+)
+import tracing
+
+# The other pipeline helpers (build_manifest, compile_pool, llm_cache, page_fit,
+# resume_latex, token_budget, ...) and concurrent.futures are imported in the
+# functions that use them, so --help and usage errors only load argparse
+
+MODEL = "gpt-4o-mini"  # Cheaper alternative to gpt-4o
+JSON_MODE = {"type": "json_object"}
+COVER_MAX_TOKENS = 1000
+OPTIMIZED_RESUME = "optimized_resume.json"
+COVER_TEXT = "cover_letter.txt"
+MAX_REPAIR_ATTEMPTS = 2
+
+
+def create_client(base_url=None):
+    """
+    Create an OpenAI client using the key from the environment / .env file. base_url
+    (or OPENAI_BASE_URL) points it at another server, e.g. mock_openai_server.py.
+    """
+    # Imported here: openai is most of this module's import time, and --help,
+    # usage errors and the offline paths never need it
+    from dotenv import load_dotenv
+    from openai import OpenAI
 
-company_name = sys.argv[1]
+    load_dotenv()
+    base_url = base_url or os.getenv("OPENAI_BASE_URL") or None
+    api_key = os.getenv("OPENAI_API_KEY")
+    if base_url and not api_key:
+        api_key = "local"  # a local server doesn't check it, but the client requires one
+    return OpenAI(api_key=api_key, base_url=base_url)
 
-base_name = 'Manith_Luthria_Resume_' + company_name
 
-# Create output directory structure: Desktop/resume/company_name
-resume_path = os.path.expanduser("./resume")
-output_dir = os.path.join(resume_path, company_name)
+class LazyClient:
+    """
+    Stands in for create_client(base_url) and creates it on first use, so a rerun
+    where every LLM stage is checkpointed never imports openai.
+    """
 
-# Create the directory if it doesn't exist
-if not os.path.exists(output_dir):
-    os.makedirs(output_dir)
-    print(f"Created output directory: {output_dir}")
-else:
-    print(f"Using existing directory: {output_dir}")
+    def __init__(self, base_url=None):
+        self.base_url = base_url
+        self._client = None
+        self._lock = threading.Lock()
 
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key)
+    def __getattr__(self, name):
+        with self._lock:
+            if self._client is None:
+                self._client = create_client(self.base_url)
+        return getattr(self._client, name)
 
-# Load your resume and job description
-with open('resume.json') as f:
-    resume = json.load(f)
-with open('job_description.txt') as f:
-    job_desc = f.read()
 
-# Build prompt
-prompt = f"""
+def prepare_output_dir(company_name):
+    """Create ./resume/<company_name> if needed and return its path."""
+    # Create output directory structure: resume/company_name
+    resume_path = os.path.expanduser("./resume")
+    output_dir = os.path.join(resume_path, company_name)
+
+    # Create the directory if it doesn't exist
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+        print(f"Created output directory: {output_dir}")
+    else:
+        print(f"Using existing directory: {output_dir}")
+    return output_dir
+
+
+def build_optimize_prompt(resume, job_desc):
+    return f"""
 Given the following resume (in JSON format) and the following job description, rewrite the resume JSON to better match the keywords, skills, and requirements in the job description.
 Only output optimized JSON — do not add explanations. Do not add any other text or comments. Keep the original formatting and structure of the resume. The output should be a similar length to the original resume.
 Do not format the json, return the json as a raw string so that json.loads() can be used to parse it.
@@ -58,356 +97,48 @@ JOB DESCRIPTION:
 OPTIMIZED RESUME JSON:
 """
 
-# Loading animation function
-def loading_animation():
-    animation = "|/-\\"
-    idx = 0
-    while not hasattr(loading_animation, 'stop'):
-        print(f"\rOptimizing resume for {company_name}... {animation[idx % len(animation)]}", end='', flush=True)
-        time.sleep(0.1)
-        idx += 1
-
-# Start loading animation in a separate thread
-loading_thread = threading.Thread(target=loading_animation)
-loading_thread.start()
-
-try:
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",  # Cheaper alternative to gpt-4o
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=2000  # Adjust as needed
-    )
-finally:
-    # Stop the loading animation
-    loading_animation.stop = True
-    loading_thread.join()
-    print("\r" + " " * 50 + "\r", end='', flush=True)  # Clear the loading line
-
-# Parse and save new resume
-optimized_json = response.choices[0].message.content
-# print(optimized_json)
-try:
-    optimized_resume = json.loads(optimized_json)
-except Exception as e:
-    print("Error parsing optimized_json:", e)
-    print("optimized_json value:", optimized_json)
-    raise
-optimized_resume_path = os.path.join(output_dir, 'optimized_resume.json')
-with open(optimized_resume_path, 'w') as f:
-    json.dump(optimized_resume, f, indent=2)
-
-print(f"Optimized resume saved to: {optimized_resume_path}")
-
-# Use the optimized resume that was already loaded
-resume = optimized_resume
-
-
-def clean_resume_latex(obj):
-    """
-    Recursively escape only & and % characters in string fields for LaTeX.
-    """
-    if isinstance(obj, dict):
-        return {k: clean_resume_latex(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [clean_resume_latex(item) for item in obj]
-    elif isinstance(obj, str):
-        # Only escape & and % characters
-        return obj.replace("&", "\\&").replace("%", "\\%")
-    else:
-        return obj
-
-
-resume = clean_resume_latex(resume)
-
-# Create LaTeX content based on the template
-resume_latex_content = (
-    """%-------------------------
-% Resume in Latex
-% Generated from JSON data
-%------------------------
-
-\\documentclass[letterpaper,11pt]{article}
-
-\\usepackage{latexsym}
-\\usepackage[empty]{fullpage}
-\\usepackage{titlesec}
-\\usepackage{marvosym}
-\\usepackage[usenames,dvipsnames]{color}
-\\usepackage{verbatim}
-\\usepackage{enumitem}
-\\usepackage[pdftex]{hyperref}
-\\usepackage{fancyhdr}
-
-\\pagestyle{fancy}
-\\fancyhf{} % clear all header and footer fields
-\\fancyfoot{}
-\\renewcommand{\\headrulewidth}{0pt}
-\\renewcommand{\\footrulewidth}{0pt}
-
-% Adjust margins
-\\addtolength{\\oddsidemargin}{-0.375in}
-\\addtolength{\\evensidemargin}{-0.375in}
-\\addtolength{\\textwidth}{1in}
-\\addtolength{\\topmargin}{-.5in}
-\\addtolength{\\textheight}{1.0in}
-
-\\urlstyle{same}
-
-\\raggedbottom
-\\raggedright
-\\setlength{\\tabcolsep}{0in}
-
-% Sections formatting
-\\titleformat{\\section}{
-  \\vspace{-4pt}\\scshape\\raggedright\\large
-}{}{0em}{}[\\color{black}\\titlerule \\vspace{-5pt}]
-
-%-------------------------
-% Custom commands
-\\newcommand{\\resumeItem}[2]{
-  \\item\\small{
-    \\textbf{#1}{: #2 \\vspace{-2pt}}
-  }
-}
-
-\\newcommand{\\resumeSubheading}[4]{
-  \\vspace{-1pt}\\item
-    \\begin{tabular*}{0.97\\textwidth}{l@{\\extracolsep{\\fill}}r}
-      \\textbf{#1} & #2 \\\\
-      \\textit{\\small#3} & \\textit{\\small #4} \\\\
-    \\end{tabular*}\\vspace{-5pt}
-}
-
-\\newcommand{\\resumeSubItem}[2]{\\resumeItem{#1}{#2}\\vspace{-4pt}}
-
-\\renewcommand{\\labelitemii}{$\\circ$}
-
-\\newcommand{\\resumeSubHeadingListStart}{\\begin{itemize}[leftmargin=*]}
-\\newcommand{\\resumeSubHeadingListEnd}{\\end{itemize}}
-\\newcommand{\\resumeItemListStart}{\\begin{itemize}}
-\\newcommand{\\resumeItemListEnd}{\\end{itemize}\\vspace{-5pt}}
-
-%-------------------------------------------
-%%%%%%  CV STARTS HERE  %%%%%%%%%%%%%%%%%%%%%%%%%%%%
-
-\\begin{document}
-
-%----------HEADING-----------------
-\\begin{tabular*}{\\textwidth}{l@{\\extracolsep{\\fill}}r}
-  \\textbf{\\Large """
-    + resume["name"]
-    + """} & Email : \\href{mailto:"""
-    + resume["contact"]["email"]
-    + """}{"""
-    + resume["contact"]["email"]
-    + """}\\\\
-  \\href{"""
-    + resume["contact"]["linkedin"]
-    + """}{"""
-    + resume["contact"]["linkedin"]
-    + """} & Mobile : """
-    + resume["contact"]["phone"]
-    + """ \\\\
-\\end{tabular*}
-
-%-----------SUMMART-----------------
-\\section{Summary}
-
-"""
-    + resume["summary"]
-    + """
 
-%-----------EXPERIENCE-----------------
-\\section{Experience}
-  \\resumeSubHeadingListStart
-"""
-)
+def build_patch_prompt(resume, job_desc):
+    return f"""
+Given the following resume (in JSON format) and the following job description, tailor the resume to better match the keywords, skills, and requirements in the job description.
+Do NOT return the whole resume. Return only the changes, as a JSON Patch (RFC 6902) against the resume JSON below, in a JSON object of the form {{"patch": [...]}}.
+Use "replace" for rewritten strings (e.g. {{"op": "replace", "path": "/experience/0/achievements/1", "value": "..."}}), "move" to reorder entries, "add" and "remove" for list items. Leave every unchanged field out of the patch.
+Make sure not to make up any information, only modify the resume to match the job description. You can change the ordering and add more detail, but do not claim I did anything I didn't do or have skills I don't have.
+Remember that achievements should start with active verbs like 'Led', 'Built', etc and should show a clear impact, numerically if possible.
+Each experience should never have more then five achievements; remove the least relevant ones where there are more.
+Remember that you are optimizing for an ATS, so make sure to include the keywords from the job description in the resume in order to achieve 95%+ ATS score.
 
-# Add experience entries
-for exp in resume["experience"]:
-    resume_latex_content += (
-        """
-    \\resumeSubheading
-      {"""
-        + exp["company"]
-        + """}{"""
-        + exp["location"]
-        + """}
-      {"""
-        + exp["title"]
-        + """}{"""
-        + exp["date"]
-        + """}
-      \\resumeItemListStart
-"""
-    )
-    for ach in exp["achievements"]:
-        # Split achievement into key and description if possible
-        if ": " in ach:
-            parts = ach.split(": ", 1)
-            key = parts[0]
-            description = parts[1]
-            resume_latex_content += (
-                """        \\resumeItem{"""
-                + key
-                + """}
-          {"""
-                + description
-                + """}
-"""
-            )
-        else:
-            # If no colon, use the whole achievement as description
-            resume_latex_content += (
-                """        \\item\\small{"""
-                + ach
-                + """ \\vspace{-2pt}}
-"""
-            )
-    resume_latex_content += """      \\resumeItemListEnd
-"""
+RESUME JSON:
+{json.dumps(resume)}
 
-resume_latex_content += """  \\resumeSubHeadingListEnd
+JOB DESCRIPTION:
+{job_desc}
 
-%-----------PROJECTS-----------------
-\\section{Projects}
-  \\resumeSubHeadingListStart
+JSON PATCH:
 """
 
-# Add experience entries
-for proj in resume["projects"]:
-    resume_latex_content += (
-        """
-    \\resumeSubheading
-      {"""
-        + proj["name"]
-        + """}{}
-      {"""
-        + proj["subtitle"]
-        + """}{}
-      \\resumeItemListStart
-"""
-    )
-    for detail in proj["details"]:
-        # Split achievement into key and description if possible
-        if ": " in detail:
-            parts = detail.split(": ", 1)
-            key = parts[0]
-            description = parts[1]
-            resume_latex_content += (
-                """        \\resumeItem{"""
-                + key
-                + """}
-          {"""
-                + description
-                + """}
-"""
-            )
-        else:
-            # If no colon, use the whole achievement as description
-            resume_latex_content += (
-                """        \\item\\small{"""
-                + detail
-                + """ \\vspace{-2pt}}
-"""
-            )
-    resume_latex_content += """      \\resumeItemListEnd
-"""
 
-resume_latex_content += """  \\resumeSubHeadingListEnd
+def build_repair_prompt(section, original, problems, job_desc):
+    return f"""
+A resume JSON was rewritten to better match a job description, but its "{section}" section came back missing or invalid:
+{chr(10).join("- " + p for p in problems)}
 
-%-----------EDUCATION-----------------
-\\section{Education}
-  \\resumeSubHeadingListStart
-"""
+Rewrite only the "{section}" section, starting from the original below, so that it matches the job description.
+Keep the same structure and field names as the original. Achievements should start with active verbs and show a clear impact, numerically if possible.
+Each experience should never have more then five achievements.
+Make sure not to make up any information.
+Return a JSON object with the single key "{section}" and nothing else.
 
-# Add education entries
-for edu in resume["education"]:
-    resume_latex_content += (
-        """    \\resumeSubheading
-      {"""
-        + edu["school"]
-        + """}{"""
-        + edu["location"]
-        + """}
-      {"""
-        + edu["degree"]
-        + """;  GPA: """
-        + edu["gpa"]
-        + """}{"""
-        + edu["year"]
-        + """}
-"""
-    )
+ORIGINAL {section.upper()} JSON:
+{json.dumps(original)}
 
-resume_latex_content += (
-    """  \\resumeSubHeadingListEnd
-
-%--------PROGRAMMING SKILLS------------
-\\section{Skills}
- \\resumeSubHeadingListStart
-   \\item{
-     \\textbf{Languages}{: """
-    + ", ".join(resume["skills"]["languages"])
-    + """}
-   }
-   \\item{
-     \\textbf{Tools and Technologies}{: """
-    + ", ".join(resume["skills"]["tools_and_technologies"])
-    + """}
-   }
- \\resumeSubHeadingListEnd
-
-%-------------------------------------------
-\\end{document}
+JOB DESCRIPTION:
+{job_desc}
 """
-)
 
-# Save LaTeX file
-tex_file_path = os.path.join(output_dir, base_name + ".tex")
-with open(tex_file_path, "w") as f:
-    f.write(resume_latex_content)
-
-print("Resume LaTeX file generated successfully!")
-
-# Compile LaTeX to PDF
-print("Compiling LaTeX to PDF...")
-try:
-    # Run pdflatex to compile the document from the output directory
-    result = subprocess.run(
-        ["pdflatex", "-interaction=nonstopmode", base_name + ".tex"],
-        capture_output=True,
-        text=True,
-        cwd=output_dir,
-    )
 
-    if result.returncode == 0:
-        print("PDF generated successfully!")
-        pdf_file_path = os.path.join(output_dir, base_name + ".pdf")
-        print("Output file: " + pdf_file_path)
-    else:
-        print("LaTeX compilation failed!")
-        print("Error output:")
-        print(result.stderr)
-
-except FileNotFoundError:
-    print(
-        "pdflatex not found. Please install a LaTeX distribution (like TeX Live or MiKTeX)"
-    )
-    print(
-        f"You can still compile manually by running: cd {output_dir} && pdflatex "
-        + base_name
-        + ".tex"
-    )
-except Exception as e:
-    print(f"Error during compilation: {e}")
-    print(
-        f"You can still compile manually by running: cd {output_dir} && pdflatex "
-        + base_name
-        + ".tex"
-    )
-
-cover_prompt = f"""
+def build_cover_prompt(resume, job_desc):
+    return f"""
 Given the following resume (in JSON format) and job description, write a compelling cover letter for the position.
 
 The cover letter should:
@@ -434,164 +165,764 @@ Please provide the cover letter content in the following format:
 Return only the cover letter content - no additional formatting or explanations.
 """
 
-# Start loading animation in a separate thread
-loading_thread = threading.Thread(target=loading_animation)
-loading_thread.start()
 
-try:
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": cover_prompt}],
-        max_tokens=1000
-    )
-finally:
-    # Stop the loading animation
-    loading_animation.stop = True
-    loading_thread.join()
-    print("\r" + " " * 60 + "\r", end='', flush=True)  # Clear the loading line
-
-# Get the generated cover letter content
-cover_letter_content = response.choices[0].message.content
-
-# Clean the content for LaTeX (escape special characters)
-def clean_latex_cover(text):
-    """Escape LaTeX special characters"""
-    replacements = {
-        '&': '\\&',
-        '%': '\\%',
-        '$': '\\$',
-        '#': '\\#',
-        '_': '\\_',
-        '{': '\\{',
-        '}': '\\}',
-    }
-    for old, new in replacements.items():
-        text = text.replace(old, new)
-    return text
+class LoadingAnimation:
+    """Spinner shown on the terminal while waiting on the API."""
 
-cover_letter_content = clean_latex_cover(cover_letter_content)
+    def __init__(self, message, width=50):
+        self.message = message
+        self.width = width
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
 
-# Create LaTeX content based on the template
-latex_content = f"""%-------------------------
-% Cover Letter in LaTeX
-%------------------------
+    def _run(self):
+        animation = "|/-\\"
+        idx = 0
+        while not self._stop.is_set():
+            print(f"\r{self.message} {animation[idx % len(animation)]}", end='', flush=True)
+            time.sleep(0.1)
+            idx += 1
 
-\\documentclass[letterpaper,11pt]{{article}}
+    def __enter__(self):
+        self._thread.start()
+        return self
 
-\\usepackage{{latexsym}}
-\\usepackage[empty]{{fullpage}}
-\\usepackage{{titlesec}}
-\\usepackage[usenames,dvipsnames]{{color}}
-\\usepackage{{enumitem}}
-\\usepackage[pdftex]{{hyperref}}
-\\usepackage{{fancyhdr}}
+    def __exit__(self, *exc):
+        # Stop the loading animation
+        self._stop.set()
+        self._thread.join()
+        print("\r" + " " * self.width + "\r", end='', flush=True)  # Clear the loading line
+        return False
 
-\\pagestyle{{fancy}}
-\\fancyhf{{}}
-\\renewcommand{{\\headrulewidth}}{{0pt}}
-\\renewcommand{{\\footrulewidth}}{{0pt}}
 
-% Adjust margins
-\\addtolength{{\\oddsidemargin}}{{-0.375in}}
-\\addtolength{{\\evensidemargin}}{{-0.375in}}
-\\addtolength{{\\textwidth}}{{1in}}
-\\addtolength{{\\topmargin}}{{-.5in}}
-\\addtolength{{\\textheight}}{{1.0in}}
+def request_completion(client, prompt, max_tokens, message=None, cache=None, response_format=None,
+                       label=None):
+    """Send a single-prompt chat completion, with a spinner when message is given."""
+    from llm_cache import cached_completion
 
-\\urlstyle{{same}}
-\\setlength{{\\parindent}}{{0pt}}
-\\setlength{{\\parskip}}{{6pt}}
+    def call():
+        return cached_completion(client, MODEL, prompt, max_tokens, cache, response_format, label)
 
-%-------------------------
-% Custom commands
-\\newcommand{{\\contactInfo}}[4]{{
-  \\begin{{tabular*}}{{\\textwidth}}{{l@{{\\extracolsep{{\\fill}}}}r}}
-    \\textbf{{\\Large #1}} & Email: \\href{{mailto:#2}}{{#2}} \\\\
-    #3 & Phone: #4 \\\\
-  \\end{{tabular*}}
-}}
+    if message is None:
+        return call()
+    with LoadingAnimation(message, width=60):
+        return call()
 
-%-------------------------------------------
-%%%%%%  COVER LETTER STARTS HERE  %%%%%%%%%%
-\\begin{{document}}
 
-%----------HEADING-----------------
-\\contactInfo{{{resume['name']}}}{{{resume['contact']['email']}}}{{LinkedIn: {resume['contact']['linkedin']}}}{{{resume['contact']['phone']}}}
+def request_completions(client, prompt, max_tokens, n, message=None, cache=None, response_format=None,
+                        label=None):
+    """request_completion for n candidate answers in one round trip; returns a list."""
+    from llm_cache import cached_completions
 
-\\vspace{{1em}}
+    def call():
+        return cached_completions(client, MODEL, prompt, max_tokens, n, cache, response_format, label)
 
-\\today
+    if message is None:
+        return call()
+    with LoadingAnimation(message, width=60):
+        return call()
 
-\\vspace{{1em}}
 
-\\vspace{{1em}}
+@tracing.traced("parse_json")
+def parse_resume_json(optimized_json, parser=None):
+    """
+    Parse the optimize response. When the JSON is malformed or cut off, keep every
+    top-level section that did arrive complete; validation then flags the rest.
+    `parser` is a SectionStreamParser that has already been fed the response.
+    """
+    try:
+        if parser is None:
+            parser = SectionStreamParser()
+            parser.feed(optimized_json)
+        optimized_resume = parser.result()
+    except ValueError as e:
+        print("Error parsing optimized_json:", e)
+        print(f"Keeping {len(parser.sections)} complete sections: {', '.join(parser.sections) or 'none'}")
+        if parser.unparsed:
+            print(f"Dropped malformed sections: {', '.join(map(str, parser.unparsed))}")
+        return dict(parser.sections)
+    return optimized_resume if isinstance(optimized_resume, dict) else {}
+
+
+def request_section_repair(client, section, original, problems, job_desc, cache=None):
+    """Re-request one resume section. Returns the new value, or None if it is unusable too."""
+    from llm_cache import cached_completion
+    from token_budget import output_budget
+
+    prompt = build_repair_prompt(section, original, problems, job_desc)
+    max_tokens = output_budget(json.dumps(original), MODEL, prompt=prompt)
+    content = cached_completion(client, MODEL, prompt, max_tokens, cache, JSON_MODE,
+                                f"repair {section}")
+    try:
+        value = json.loads(content)[section]
+    except (ValueError, TypeError, KeyError):
+        value = None
+    if value is None or section_errors(section, value):
+        if cache is not None:
+            # Don't let a bad answer be replayed on every later attempt and run
+            cache.discard(MODEL, max_tokens, prompt, response_format=JSON_MODE)
+        return None
+    return value
+
+
+@tracing.traced("validate_repair")
+def repair_resume(client, optimized_resume, resume, job_desc, cache=None):
+    """
+    Validate the optimized resume against the schema and re-request only the sections
+    that fail, in parallel. Sections still invalid after MAX_REPAIR_ATTEMPTS fall back to
+    the original resume's, with lists cut to the schema's limits; if even that does not
+    validate, the section is left as it is. Returns (resume, names of the sections
+    that were replaced).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    repaired = set()
+    for attempt in range(MAX_REPAIR_ATTEMPTS + 1):
+        problems = errors_by_section(validate_resume(optimized_resume))
+        if not problems:
+            break
+        for section, messages in problems.items():
+            print(f"Invalid {section} section: {'; '.join(messages)}")
+        if attempt == MAX_REPAIR_ATTEMPTS:
+            for section in problems:
+                if section not in resume:
+                    continue
+                original = trim_to_schema(resume[section], RESUME_SCHEMA["properties"][section])
+                if section_errors(section, original):
+                    print(f"The original {section} section is invalid too; leaving it as is")
+                    continue
+                print(f"Keeping the original {section} section")
+                optimized_resume[section] = original
+                repaired.add(section)
+            break
+
+        print(f"Re-requesting {len(problems)} section(s): {', '.join(problems)}")
+        with ThreadPoolExecutor(max_workers=len(problems)) as executor:
+            futures = {
+                section: executor.submit(request_section_repair, client, section,
+                                         resume.get(section), messages, job_desc, cache)
+                for section, messages in problems.items()
+            }
+        for section, future in futures.items():
+            value = future.result()
+            if value is not None:
+                optimized_resume[section] = value
+                repaired.add(section)
+    return optimized_resume, repaired
+
+
+def optimize_budget(resume, prompt):
+    """max_tokens for a full rewrite: the output is about as long as the input resume."""
+    from token_budget import output_budget
+    return output_budget(json.dumps(resume), MODEL, ratio=1.5, floor=2000, prompt=prompt)
+
+
+def patch_budget(resume, prompt):
+    """max_tokens for a patch, which rewrites some strings but never echoes the unchanged ones."""
+    from token_budget import output_budget
+    return output_budget(json.dumps(resume), MODEL, ratio=0.75, prompt=prompt)
+
+
+@tracing.traced("optimize")
+def optimize_resume(client, resume, job_desc, output_dir, spinner_message=None, cache=None,
+                    candidates=1, company_name=None):
+    """
+    Ask the model to tailor the resume and save optimized_resume.json. With
+    candidates > 1, that many answers come back from one call and the best one by
+    local score is kept (see candidates.py); company_name is left out of its keywords.
+    """
+    prompt = build_optimize_prompt(resume, job_desc)
+    max_tokens = optimize_budget(resume, prompt)
+    if candidates > 1:
+        optimized_resume = pick_candidate(client, resume, job_desc, prompt, max_tokens, candidates,
+                                          spinner_message, cache, company_name)
+    else:
+        optimized_json = request_completion(
+            client, prompt, max_tokens, spinner_message, cache, JSON_MODE, "optimize"
+        )
+        optimized_resume = parse_resume_json(optimized_json)
+    optimized_resume, _ = repair_resume(client, optimized_resume, resume, job_desc, cache)
+    return save_optimized_resume(optimized_resume, output_dir)
+
+
+@tracing.traced("select_candidate")
+def pick_candidate(client, resume, job_desc, prompt, max_tokens, n, spinner_message=None, cache=None,
+                   company_name=None):
+    """Request n optimize answers at once and return the parsed one that scores best."""
+    from candidates import format_scores, score_candidates
+
+    texts = request_completions(client, prompt, max_tokens, n, spinner_message, cache, JSON_MODE,
+                                "optimize")
+    parsed = [parse_resume_json(text) for text in texts]
+    try:
+        from ats_score import AtsScorer
+        scorer = AtsScorer(job_desc, ignore=[company_name] if company_name else ())
+    except ImportError:  # numpy is only needed for the keyword part of the score
+        scorer = None
+    scores = score_candidates(parsed, resume, scorer)
+    print(format_scores(scores))
+    best = scores[0]
+    print(f"Keeping candidate {best.index + 1} of {len(texts)} (score {best.total:.1f})")
+    return parsed[best.index]
+
+
+@tracing.traced("optimize_patch")
+def optimize_resume_patch(client, resume, job_desc, output_dir, spinner_message=None, cache=None):
+    """
+    Patch variant of optimize_resume: the model returns only a JSON Patch against the
+    original resume, which is applied locally and saved as resume_patch.json. Falls
+    back to full regeneration when the patch is unusable.
+    """
+    from json_patch import apply_patch, describe_patch
+
+    prompt = build_patch_prompt(resume, job_desc)
+    max_tokens = patch_budget(resume, prompt)
+    content = request_completion(client, prompt, max_tokens, spinner_message, cache, JSON_MODE, "patch")
+    try:
+        patch = json.loads(content)["patch"]
+        optimized_resume = apply_patch(resume, patch)
+    except (ValueError, TypeError, KeyError) as e:
+        # JsonPatchError is a ValueError too
+        print("Error applying resume patch:", e)
+        if cache is not None:
+            cache.discard(MODEL, max_tokens, prompt, response_format=JSON_MODE)
+        print("Falling back to full resume regeneration")
+        return optimize_resume(client, resume, job_desc, output_dir, spinner_message, cache)
+
+    patch_path = os.path.join(output_dir, 'resume_patch.json')
+    with open(patch_path, 'w') as f:
+        json.dump(patch, f, indent=2)
+    print(f"Applied {len(patch)} patch operations (saved to {patch_path}):")
+    for line in describe_patch(patch):
+        print("  " + line)
+
+    optimized_resume, _ = repair_resume(client, optimized_resume, resume, job_desc, cache)
+    return save_optimized_resume(optimized_resume, output_dir)
+
+
+@tracing.traced("save_json")
+def save_optimized_resume(optimized_resume, output_dir):
+    optimized_resume_path = os.path.join(output_dir, OPTIMIZED_RESUME)
+    with open(optimized_resume_path, 'w') as f:
+        json.dump(optimized_resume, f, indent=2)
+        tracing.add("bytes_written", f.tell())
+
+    print(f"Optimized resume saved to: {optimized_resume_path}")
+    return optimized_resume
+
+
+class StreamingResumeRenderer:
+    """
+    Feeds streamed completion text through an incremental JSON parser and renders
+    each resume template section to LaTeX as soon as the fields it uses are complete.
+    """
+
+    def __init__(self):
+        from resume_latex import resume_template
+
+        self.parser = SectionStreamParser()
+        self.fields = {}  # top-level fields received so far
+        self.rendered = {}
+        self.pending = list(resume_template().sections)
+        self.first_section = None
+        self.first_section_time = None
+        self.failed = False  # the stream stopped parsing; the full response is parsed instead
+        self._start = time.perf_counter()
+
+    def feed(self, text):
+        if self.failed:
+            return
+        try:
+            completed = self.parser.feed(text)
+        except ValueError as e:
+            print(f"Streaming parse failed ({e}); parsing the full response instead")
+            self.failed = True
+            self.rendered.clear()
+            return
+        if not completed:
+            return
+        from resume_latex import render_resume_section
+
+        for key, value in completed:
+            self.fields[key] = value
+        for name in list(self.pending):
+            try:
+                self.rendered[name] = render_resume_section(name, self.fields)
+            except (KeyError, TypeError):
+                # Fields still streaming (or an unexpected shape, which latex() will surface)
+                continue
+            self.pending.remove(name)
+            if self.first_section is None:
+                self.first_section = name
+                self.first_section_time = time.perf_counter() - self._start
+
+    def latex(self, resume):
+        """Assemble the document, rendering any section the stream did not produce."""
+        from resume_latex import build_resume_latex
+
+        return build_resume_latex(resume, self.rendered)
+
+
+@tracing.traced("optimize_stream")
+def optimize_resume_streaming(client, resume, job_desc, output_dir, spinner_message=None, cache=None):
+    """
+    Streaming variant of optimize_resume. Returns (optimized_resume, renderer), where
+    renderer already holds the LaTeX for every section that finished while streaming.
+    """
+    from token_budget import continue_if_truncated, count_tokens, log_usage
+
+    prompt = build_optimize_prompt(resume, job_desc)
+    max_tokens = optimize_budget(resume, prompt)
+    optimized_json = None
+    if cache is not None:
+        optimized_json = cache.get(MODEL, max_tokens, prompt, response_format=JSON_MODE)
+
+    if optimized_json is not None:
+        renderer = StreamingResumeRenderer()
+        renderer.feed(optimized_json)
+        print("Optimized resume loaded from cache")
+    else:
+        # Resolve a LazyClient before the clocks start, so importing openai doesn't
+        # count toward time to first token
+        completions = client.chat.completions
+        renderer = StreamingResumeRenderer()
+        start = time.perf_counter()
+        first_token_time = None
+        finish_reason = usage = None
+        chunks = []
+
+        def consume():
+            nonlocal first_token_time, finish_reason, usage
+            stream = completions.create(
+                model=MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                response_format=JSON_MODE,
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            for chunk in stream:
+                # The usage-only chunk at the end of the stream has no choices
+                usage = getattr(chunk, "usage", None) or usage
+                if not chunk.choices:
+                    continue
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                text = chunk.choices[0].delta.content
+                if not text:
+                    continue
+                if first_token_time is None:
+                    first_token_time = time.perf_counter() - start
+                chunks.append(text)
+                renderer.feed(text)
+
+        if spinner_message is None:
+            consume()
+        else:
+            with LoadingAnimation(spinner_message):
+                consume()
+
+        optimized_json = "".join(chunks)
+        log_usage("optimize", usage, finish_reason, count_tokens(prompt, MODEL))
+        if finish_reason == "length":
+            complete_json = continue_if_truncated(client, MODEL, prompt, max_tokens, optimized_json,
+                                                  finish_reason, "optimize")
+            renderer.feed(complete_json[len(optimized_json):])
+            optimized_json = complete_json
+        if first_token_time is not None:
+            print(f"Time to first token: {first_token_time:.2f}s")
+        if renderer.first_section is not None:
+            print(f"Time to first section ({renderer.first_section}): {renderer.first_section_time:.2f}s")
+        print(f"Streamed {len(renderer.rendered)} sections in {time.perf_counter() - start:.2f}s")
+
+    if cache is not None:
+        cache.put(MODEL, max_tokens, prompt, optimized_json, response_format=JSON_MODE)
+    optimized_resume = parse_resume_json(optimized_json, None if renderer.failed else renderer.parser)
+    optimized_resume, repaired = repair_resume(client, optimized_resume, resume, job_desc, cache)
+    if repaired:
+        # Sections rendered while streaming may be built from the replaced fields
+        renderer.rendered.clear()
+    return save_optimized_resume(optimized_resume, output_dir), renderer
+
+
+@tracing.traced("ats_score")
+def print_ats_scores(resume, optimized_resume, job_desc, company_name):
+    """Print the local ATS keyword score of resume.json and optimized_resume.json."""
+    try:
+        from ats_score import AtsScorer, format_change, format_report
+    except ImportError:  # numpy is only needed for the ATS score printout
+        print("ATS score skipped (numpy is not installed)")
+        return
+    scorer = AtsScorer(job_desc, ignore=[company_name])
+    before = scorer.score(resume)
+    after = scorer.score(optimized_resume)
+    print(format_change(before, after))
+    print(format_report(after, label="optimized_resume.json"))
+
+
+def write_tex(output_dir, base_name, latex_content):
+    tex_file_path = os.path.join(output_dir, base_name + ".tex")
+    with open(tex_file_path, "w") as f:
+        f.write(latex_content)
+        tracing.add("bytes_written", f.tell())
+    return tex_file_path
+
+
+def render_stage(manifest, stage, inputs, output_dir, base_name, render, label, force=False):
+    """Write render() to <base_name>.tex unless the manifest says it is already up to date."""
+    tex_file_path = os.path.join(output_dir, base_name + ".tex")
+    if not force and manifest.is_fresh(stage, inputs, tex_file_path):
+        print(f"{label} LaTeX file is up to date, skipping generation")
+        return tex_file_path
+    with tracing.span("render", stage=stage):
+        latex_content = render()
+    with tracing.span("write_tex", stage=stage):
+        write_tex(output_dir, base_name, latex_content)
+    manifest.record(stage, inputs, tex_file_path)
+    print(f"{label} LaTeX file generated successfully!")
+    return tex_file_path
+
+
+def submit_compile(pool, manifest, stage, tex_file_path, force=False):
+    """
+    Queue tex_file_path on the compile pool unless its PDF was already built from this
+    exact .tex. Returns (job, inputs) for finish_compile; job is None when skipped.
+    """
+    from build_manifest import file_digest
 
-Dear Hiring Team,
+    inputs = file_digest(tex_file_path)
+    pdf_file_path = os.path.splitext(tex_file_path)[0] + ".pdf"
+    if not force and manifest.is_fresh(stage, inputs, pdf_file_path):
+        return None, inputs
+    return pool.submit(tex_file_path), inputs
 
-\\vspace{{1em}}
 
-{cover_letter_content}
+@tracing.traced("page_fit")
+def fit_resume(resume, latex, job_desc, base_name, pool, company_name=None):
+    """
+    Trim the lowest-value bullets until the resume fits on one page, ranking them by
+    job keywords other than company_name. Returns the FitResult: the trimmed resume,
+    the LaTeX rendered from it and the page report.
+    """
+    from page_fit import fit_to_page, format_fit
+    from resume_latex import build_resume_latex
 
-\\vspace{{1em}}
+    result = fit_to_page(resume, latex, build_resume_latex, base_name, pool, job_desc,
+                         ignore=[company_name] if company_name else ())
+    for section, index, text in result.removed:
+        print(f"  dropped from {section}[{index}]: {text[:80]}{'...' if len(text) > 80 else ''}")
+    print(format_fit(result))
+    return result
 
-Sincerely,\\\\
-Manith Luthria
 
-\\end{{document}}
-"""
+def resume_tex_inputs(resume, page_fit):
+    from build_manifest import digest
+    from resume_latex import builder_fingerprint
 
-# Save LaTeX file
-base_name = f'Cover_Letter_{company_name}'
-tex_file_path = os.path.join(output_dir, base_name + ".tex")
-with open(tex_file_path, "w") as f:
-    f.write(latex_content)
-
-print("Cover Letter LaTeX file generated successfully!")
-
-# Compile LaTeX to PDF
-print("Compiling LaTeX to PDF...")
-try:
-    # Run pdflatex to compile the document from the output directory
-    result = subprocess.run(
-        ["pdflatex", "-interaction=nonstopmode", base_name + ".tex"],
-        capture_output=True,
-        text=True,
-        cwd=output_dir,
-    )
+    return digest(json.dumps(resume, sort_keys=True), builder_fingerprint(), f"page_fit={page_fit}")
 
-    if result.returncode == 0:
-        print("PDF generated successfully!")
-        pdf_file_path = os.path.join(output_dir, base_name + ".pdf")
-        print("Output file: " + pdf_file_path)
+
+def render_resume_stage(manifest, resume, job_desc, output_dir, base_name, pool, renderer=None,
+                        page_fit=True, force=False, company_name=None):
+    """
+    The resume_tex stage: render the resume, fit it to one page and write the .tex.
+    Returns (tex path, resume as typeset). A trimmed resume is recorded under its own
+    inputs, so the next run that starts from it finds the stage fresh. When the fit
+    could not be checked (no pdflatex, or the draft compile failed) the .tex is written
+    but not recorded, so the next run fits it again.
+    """
+    from resume_latex import build_resume_latex
+
+    tex_file_path = os.path.join(output_dir, base_name + ".tex")
+    inputs = resume_tex_inputs(resume, page_fit)
+    if not force and manifest.is_fresh("resume_tex", inputs, tex_file_path):
+        print("Resume LaTeX file is up to date, skipping generation")
+        return tex_file_path, resume
+    with tracing.span("render", stage="resume_tex"):
+        latex_content = renderer.latex(resume) if renderer is not None else build_resume_latex(resume)
+    checked = True
+    if page_fit:
+        fit = fit_resume(resume, latex_content, job_desc, base_name, pool, company_name)
+        latex_content, checked = fit.latex, fit.report is not None
+        if fit.resume is not resume:
+            resume = fit.resume
+            inputs = resume_tex_inputs(resume, page_fit)
+    with tracing.span("write_tex", stage="resume_tex"):
+        write_tex(output_dir, base_name, latex_content)
+    if checked:
+        manifest.record("resume_tex", inputs, tex_file_path)
+    else:
+        manifest.forget("resume_tex")
+    print("Resume LaTeX file generated successfully!")
+    return tex_file_path, resume
+
+
+@tracing.traced("wait_compile")
+def finish_compile(manifest, stage, tex_file_path, job, inputs):
+    from compile_pool import print_result
+
+    if job is None:
+        print(f"{os.path.splitext(os.path.basename(tex_file_path))[0]}.pdf is up to date, "
+              "skipping compilation")
+        return True
+    result = job.result()
+    ok = print_result(result)
+    if ok:
+        manifest.record(stage, inputs, result.pdf_path)
     else:
-        print("LaTeX compilation failed!")
-        print("Error output:")
-        print(result.stderr)
+        error = "pdflatex not found" if result.pdflatex_missing else result.error or "compile failed"
+        manifest.fail(stage, inputs, error.strip()[-300:])
+    return ok
 
-except FileNotFoundError:
-    print(
-        "pdflatex not found. Please install a LaTeX distribution (like TeX Live or MiKTeX)"
-    )
-    print(
-        f"You can still compile manually by running: cd {output_dir} && pdflatex "
-        + base_name
-        + ".tex"
-    )
-except Exception as e:
-    print(f"Error during compilation: {e}")
-    print(
-        f"You can still compile manually by running: cd {output_dir} && pdflatex "
-        + base_name
-        + ".tex"
-    )
 
-# Delete all files in the output directory that are not .pdf, .tex, or .json files
-for filename in os.listdir(output_dir):
-    if not (filename.endswith('.pdf') or filename.endswith('.tex') or filename.endswith('.json')):
-        file_path = os.path.join(output_dir, filename)
+def read_checkpoint(manifest, stage, inputs, path, force=False):
+    """The saved output of an LLM stage if its checkpoint matches inputs, else None."""
+    if force or not manifest.is_fresh(stage, inputs, path):
+        return None
+    with open(path) as f:
+        return f.read()
+
+
+def write_cover_letter(client, prompt, output_dir, manifest, cache=None, message=None, force=False):
+    """
+    The cover letter text for prompt. It comes from the cover_text checkpoint when that
+    matches, otherwise from the API, and is then saved to cover_letter.txt.
+    """
+    from build_manifest import digest
+
+    path = os.path.join(output_dir, COVER_TEXT)
+    inputs = digest(MODEL, prompt)
+    content = read_checkpoint(manifest, "cover_text", inputs, path, force)
+    if content is not None:
+        print("Cover letter text is up to date, skipping the cover letter call")
+        return content
+    try:
+        content = request_completion(client, prompt, COVER_MAX_TOKENS, message, cache, None, "cover letter")
+    except Exception as e:
+        manifest.fail("cover_text", inputs, f"{type(e).__name__}: {e}")
+        raise
+    with open(path, "w") as f:
+        f.write(content)
+    manifest.record("cover_text", inputs, path)
+    return content
+
+
+def check_candidates(candidates, stream=False, patch=False):
+    """Why tailor() can't run with this many candidates, or None if it can."""
+    if not isinstance(candidates, int) or isinstance(candidates, bool) or candidates < 1:
+        return "candidates must be a whole number of at least 1"
+    if candidates > 1 and (stream or patch):
+        return "candidates can't be combined with stream or patch"
+    return None
+
+
+@tracing.traced("tailor")
+def tailor(client, company_name, resume, job_desc, show_progress=True,
+           overlap=True, speculative_cover=False, cache=None, stream=False, pool=None,
+           force=False, patch=False, page_fit=True, candidates=1):
+    """
+    Run the full optimize -> render -> pdflatex -> cover letter pipeline for one company.
+    Returns a dict of the artifacts written and whether each compile succeeded.
+
+    With overlap, the cover letter request runs on a background thread while the
+    resume is rendered and compiled. With speculative_cover it is started from the
+    original resume before the optimize call even returns, so both LLM calls are in
+    flight at once.
+
+    With stream, the optimize call is streamed and resume sections are rendered to
+    LaTeX as they arrive instead of after the whole response. With patch, the model
+    only returns a JSON Patch against the resume instead of regenerating all of it.
+    Otherwise `candidates` answers can be requested at once, keeping the best-scoring.
+
+    Both documents compile on `pool` (the shared compile pool by default), so the
+    resume compiles while the cover letter is still being written.
+
+    With page_fit, the rendered resume is draft-compiled and trimmed locally until it
+    fits on one page (see page_fit.py) before the real compile. The trimmed resume is
+    the one saved, scored and given to the cover letter.
+
+    Every stage is checkpointed in the build manifest, the LLM calls included: a stage
+    whose inputs are unchanged and whose artifact still exists is skipped unless force
+    is set, so a rerun after a failure only repeats the missing or failed stages.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from build_manifest import BuildManifest, digest
+    from compile_pool import get_default_pool
+    from resume_latex import build_cover_latex, builder_fingerprint
+
+    pool = pool or get_default_pool()
+    output_dir = prepare_output_dir(company_name)
+    manifest = BuildManifest(output_dir)
+    base_name = 'Manith_Luthria_Resume_' + company_name
+    cover_message = f"Generating cover letter for {company_name}..." if show_progress else None
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        cover_future = None
+        if overlap and speculative_cover:
+            cover_future = executor.submit(
+                write_cover_letter, client, build_cover_prompt(resume, job_desc), output_dir, manifest,
+                cache, None, force
+            )
+
+        optimize_message = f"Optimizing resume for {company_name}..." if show_progress else None
+        optimize_prompt = (build_patch_prompt if patch else build_optimize_prompt)(resume, job_desc)
+        optimize_inputs = digest(MODEL, optimize_prompt, f"candidates={candidates}")
+        optimized_path = os.path.join(output_dir, OPTIMIZED_RESUME)
+        checkpoint = read_checkpoint(manifest, "optimize", optimize_inputs, optimized_path, force)
+        renderer = None
         try:
-            if os.path.isfile(file_path):
-                os.remove(file_path)
-                print(f"Deleted: {file_path}")
+            if checkpoint is not None:
+                print("Optimized resume is up to date, skipping the optimize call")
+                optimized_resume = json.loads(checkpoint)
+            elif stream:
+                optimized_resume, renderer = optimize_resume_streaming(
+                    client, resume, job_desc, output_dir, optimize_message, cache
+                )
+            elif patch:
+                optimized_resume = optimize_resume_patch(
+                    client, resume, job_desc, output_dir, optimize_message, cache
+                )
+            else:
+                optimized_resume = optimize_resume(
+                    client, resume, job_desc, output_dir, optimize_message, cache, candidates,
+                    company_name
+                )
         except Exception as e:
-            print(f"Error deleting {file_path}: {e}")
+            manifest.fail("optimize", optimize_inputs, f"{type(e).__name__}: {e}")
+            raise
+        if checkpoint is None:
+            # An answer that did not parse at all is not worth resuming from
+            if optimized_resume:
+                manifest.record("optimize", optimize_inputs, optimized_path)
+            else:
+                manifest.fail("optimize", optimize_inputs, "no usable resume JSON in the response")
+
+        # Fit the resume before anything else reads it, so the saved JSON, the ATS
+        # scores and the cover letter all describe the resume that gets typeset
+        resume_tex, fitted_resume = render_resume_stage(
+            manifest, optimized_resume, job_desc, output_dir, base_name, pool, renderer,
+            page_fit, force, company_name
+        )
+        if fitted_resume is not optimized_resume:
+            save_optimized_resume(fitted_resume, output_dir)
+            manifest.record("optimize", optimize_inputs, optimized_path)
+
+        if checkpoint is None:  # already reported by the run that made the checkpoint
+            print_ats_scores(resume, fitted_resume, job_desc, company_name)
+
+        resume = fitted_resume
+
+        if overlap and cover_future is None:
+            cover_future = executor.submit(
+                write_cover_letter, client, build_cover_prompt(resume, job_desc), output_dir, manifest,
+                cache, None, force
+            )
+
+        resume_job, resume_inputs = submit_compile(pool, manifest, "resume_pdf", resume_tex, force)
+
+        # Get the generated cover letter content
+        with tracing.span("wait_cover_letter"):
+            if cover_future is not None:
+                if cover_message and not cover_future.done():
+                    with LoadingAnimation(cover_message, width=60):
+                        cover_letter_content = cover_future.result()
+                else:
+                    cover_letter_content = cover_future.result()
+            else:
+                cover_letter_content = write_cover_letter(
+                    client, build_cover_prompt(resume, job_desc), output_dir, manifest, cache,
+                    cover_message, force
+                )
+    cover_base_name = f'Cover_Letter_{company_name}'
+    cover_tex = render_stage(
+        manifest, "cover_tex",
+        digest(cover_letter_content, json.dumps([resume["name"], resume["contact"]], sort_keys=True),
+               builder_fingerprint()),
+        output_dir, cover_base_name,
+        lambda: build_cover_latex(resume, cover_letter_content),
+        "Cover Letter", force,
+    )
+    cover_job, cover_inputs = submit_compile(pool, manifest, "cover_pdf", cover_tex, force)
+
+    print("Compiling LaTeX to PDF...")
+    resume_ok = finish_compile(manifest, "resume_pdf", resume_tex, resume_job, resume_inputs)
+    cover_ok = finish_compile(manifest, "cover_pdf", cover_tex, cover_job, cover_inputs)
+
+    return {
+        "output_dir": output_dir,
+        "resume_tex": resume_tex,
+        "cover_tex": cover_tex,
+        "resume_pdf": os.path.join(output_dir, base_name + ".pdf") if resume_ok else None,
+        "cover_pdf": os.path.join(output_dir, cover_base_name + ".pdf") if cover_ok else None,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Tailor resume.json and write a cover letter for job_description.txt.",
+        epilog="Example: python combo.py instagram",
+    )
+    parser.add_argument("company_name", help="company name, used for ./resume/<company_name>/")
+    parser.add_argument("--serial", action="store_true",
+                        help="request the cover letter after the resume is rendered instead of "
+                             "in the background (the resume still compiles meanwhile)")
+    parser.add_argument("--speculative-cover", action="store_true",
+                        help="start the cover letter from the original resume.json right away, "
+                             "in parallel with the optimize call")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always call the API instead of reusing cached responses")
+    parser.add_argument("--force", action="store_true",
+                        help="rerun every stage, LLM calls included, even if its checkpoint is current")
+    parser.add_argument("--no-page-fit", action="store_true",
+                        help="don't draft-compile and trim the resume to fit on one page")
+    parser.add_argument("--candidates", type=int, default=1, metavar="N",
+                        help="request N optimized resumes in one call and keep the best by "
+                             "local score (keywords, schema, bullet count and length)")
+    parser.add_argument("--base-url", metavar="URL",
+                        help="OpenAI-compatible API endpoint, e.g. http://127.0.0.1:8765/v1 for "
+                             "mock_openai_server.py (default: $OPENAI_BASE_URL or the OpenAI API)")
+    parser.add_argument("--profile", nargs="?", const=tracing.DEFAULT_PROFILE, metavar="PATH",
+                        help="trace every stage and write the spans to PATH (Chrome trace JSON, "
+                             f"or JSON lines for .jsonl; default {tracing.DEFAULT_PROFILE})")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--stream", action="store_true",
+                      help="stream the optimize call and render resume sections as they arrive")
+    mode.add_argument("--patch", action="store_true",
+                      help="have the model return only a JSON Patch against resume.json")
+    args = parser.parse_args(argv)
+    error = check_candidates(args.candidates, args.stream, args.patch)
+    if error:
+        parser.error(error)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    from llm_cache import ResponseCache
+    from token_budget import token_summary
+
+    if args.profile:
+        tracing.enable(args.profile)
+
+    client = LazyClient(args.base_url)
+
+    # Load your resume and job description
+    with open('resume.json') as f:
+        resume = json.load(f)
+    with open('job_description.txt') as f:
+        job_desc = f.read()
+
+    cache = ResponseCache(enabled=not args.no_cache)
+    try:
+        tailor(client, args.company_name, resume, job_desc,
+               overlap=not args.serial, speculative_cover=args.speculative_cover, cache=cache,
+               stream=args.stream, force=args.force, patch=args.patch,
+               page_fit=not args.no_page_fit, candidates=args.candidates)
+    finally:
+        print(cache.summary())
+        print(token_summary())
+        tracing.finish()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Parallel pdflatex compile service.
+
+CompilePool runs up to `workers` pdflatex processes at once (one per core by default).
+Callers submit .tex files and get futures back. pdflatex reads the .tex where it is
+but writes everything (-output-directory) to a private scratch directory on tmpfs
+(/dev/shm) when there is one, so concurrent jobs never share .aux/.log/.out files and
+the output directory never sees them. Only the finished PDF is moved next to the .tex,
+atomically, and the scratch directory is removed. Documents whose preamble can be
+precompiled start from a cached format file (see latex_format.py). Draft jobs
+(draft=True) run pdflatex with -draftmode, which typesets without writing a PDF, and
+return the log instead.
+"""
+import errno
+import functools
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import latex_format
+import tracing
+
+
+TMPFS_DIR = "/dev/shm"
+
+
+@functools.lru_cache(maxsize=1)
+def scratch_root():
+    """Where scratch directories go: tmpfs when it is usable, otherwise the system temp dir."""
+    if os.path.isdir(TMPFS_DIR) and os.access(TMPFS_DIR, os.W_OK | os.X_OK):
+        return TMPFS_DIR
+    return tempfile.gettempdir()
+
+
+def make_scratch_dir(prefix):
+    return tempfile.mkdtemp(prefix=prefix, dir=scratch_root())
+
+
+def move_into_place(src, dst):
+    """Move src to dst atomically: readers of dst see the old file or the new one, never part."""
+    try:
+        os.replace(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # tmpfs is another filesystem: copy next to dst first, then rename over it
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=os.path.splitext(dst)[1],
+                                        dir=os.path.dirname(dst) or ".")
+        os.close(fd)
+        try:
+            shutil.copy(src, tmp_path)  # with src's mode; mkstemp makes the file private
+            os.replace(tmp_path, dst)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+class CompileResult:
+    """Outcome of one compile job. output is None when pdflatex never ran."""
+
+    def __init__(self, tex_path, ok, pdf_path=None, output=None, error=None,
+                 pdflatex_missing=False, log=None):
+        self.tex_path = tex_path
+        self.ok = ok
+        self.pdf_path = pdf_path
+        self.output = output
+        self.error = error
+        self.pdflatex_missing = pdflatex_missing
+        self.log = log  # contents of the .log file, for draft jobs
+        self.seconds = 0.0
+        self.queue_depth = 0  # jobs already in the pool when this one was submitted
+
+
+class CompilePool:
+    """
+    Each worker thread only waits on its pdflatex subprocess, so the actual TeX work
+    runs in parallel OS processes.
+    """
+
+    def __init__(self, workers=None, use_format=True):
+        self.workers = workers or os.cpu_count() or 1
+        self.use_format = use_format
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pdflatex")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_seconds = 0.0
+
+    @property
+    def queue_depth(self):
+        """Jobs submitted but not yet finished (running + waiting)."""
+        with self._lock:
+            return self._pending
+
+    def submit(self, tex_path, draft=False):
+        """Queue tex_path for compilation. Returns a Future resolving to a CompileResult."""
+        with self._lock:
+            queue_depth = self._pending
+            self._pending += 1
+        return self._executor.submit(self._run, os.path.abspath(tex_path), queue_depth, draft)
+
+    def compile(self, tex_path, draft=False):
+        return self.submit(tex_path, draft).result()
+
+    def _run(self, tex_path, queue_depth, draft=False):
+        start = time.perf_counter()
+        try:
+            with tracing.span("pdflatex", file=os.path.basename(tex_path), queue_depth=queue_depth,
+                              draft=draft):
+                result = compile_tex(tex_path, self.use_format, draft)
+        finally:
+            with self._lock:
+                self._pending -= 1
+        result.seconds = time.perf_counter() - start
+        result.queue_depth = queue_depth
+        with self._lock:
+            self.completed += 1
+            self.total_seconds += result.seconds
+            if not result.ok:
+                self.failed += 1
+        return result
+
+    def summary(self):
+        with self._lock:
+            avg = self.total_seconds / self.completed if self.completed else 0.0
+            return (f"Compile pool: {self.completed} jobs ({self.failed} failed) on {self.workers} "
+                    f"workers, {avg:.2f}s avg compile time")
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        return False
+
+
+def compile_tex(tex_path, use_format=True, draft=False):
+    """
+    Compile one .tex file with a private scratch directory for pdflatex's output. A
+    draft compile writes no PDF; its result carries the pdflatex log.
+    """
+    output_dir = os.path.dirname(tex_path)
+    base_name = os.path.splitext(os.path.basename(tex_path))[0]
+    pdf_path = os.path.join(output_dir, base_name + ".pdf")
+
+    fmt = None
+    if use_format:
+        with open(tex_path) as f:
+            preamble = latex_format.split_preamble(f.read())
+        if preamble is not None:
+            with tracing.span("ensure_format"):
+                fmt = latex_format.ensure_format(preamble)
+
+    scratch_dir = make_scratch_dir("build-" + base_name + "-")
+    try:
+        try:
+            proc = run_pdflatex(base_name, output_dir, scratch_dir, fmt, draft)
+            if proc.returncode != 0 and fmt is not None:
+                # A stale or broken format should never cost us the PDF
+                proc = run_pdflatex(base_name, output_dir, scratch_dir, None, draft)
+        except FileNotFoundError:
+            return CompileResult(tex_path, False, error="pdflatex not found", pdflatex_missing=True)
+        except Exception as e:
+            return CompileResult(tex_path, False, error=str(e))
+
+        if draft:
+            try:
+                with open(os.path.join(scratch_dir, base_name + ".log"), errors="replace") as f:
+                    log = f.read()
+            except OSError:
+                log = None
+            return CompileResult(tex_path, proc.returncode == 0 and log is not None,
+                                 output=proc.stdout, error=proc.stderr, log=log)
+
+        built_pdf = os.path.join(scratch_dir, base_name + ".pdf")
+        if proc.returncode != 0 or not os.path.exists(built_pdf):
+            return CompileResult(tex_path, False, output=proc.stdout, error=proc.stderr)
+        move_into_place(built_pdf, pdf_path)
+        return CompileResult(tex_path, True, pdf_path=pdf_path, output=proc.stdout)
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+
+def run_pdflatex(base_name, cwd, output_dir, fmt=None, draft=False):
+    """Run pdflatex on <base_name>.tex in cwd, writing the PDF, log and aux files to output_dir."""
+    args, env = ["pdflatex", "-output-directory=" + output_dir], None
+    if fmt is not None:
+        fmt_args, env = latex_format.format_command(fmt)
+        args += fmt_args
+    if draft:
+        args.append("-draftmode")
+    return subprocess.run(
+        args + ["-interaction=nonstopmode", base_name + ".tex"],
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+        env=env,
+    )
+
+
+def print_result(result):
+    """Print the outcome of a compile job the way the scripts always have."""
+    output_dir = os.path.dirname(result.tex_path)
+    base_name = os.path.splitext(os.path.basename(result.tex_path))[0]
+    timing = f" ({result.seconds:.2f}s, queue depth {result.queue_depth})"
+
+    if result.ok:
+        print("PDF generated successfully!" + timing)
+        print("Output file: " + result.pdf_path)
+        return True
+
+    if result.output is not None:
+        print("LaTeX compilation failed!" + timing)
+        print("Error output:")
+        print(result.error)
+        return False
+
+    if result.pdflatex_missing:
+        print(
+            "pdflatex not found. Please install a LaTeX distribution (like TeX Live or MiKTeX)"
+        )
+    else:
+        print(f"Error during compilation: {result.error}")
+    print(
+        f"You can still compile manually by running: cd {output_dir} && pdflatex "
+        + base_name
+        + ".tex"
+    )
+    return False
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool():
+    """Process-wide pool shared by every entry point in this process."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = CompilePool()
+        return _default_pool
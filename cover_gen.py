@@ -1,43 +1,59 @@
-from openai import OpenAI
 import json
 import os
-import subprocess
 import sys
 import time
 import threading
-from dotenv import load_dotenv
-
-# Get company name from command line argument
-if len(sys.argv) != 2:
-    print("Usage: python cover_gen.py <company_name>")
-    print("Example: python cover_gen.py glossgenius")
-    sys.exit(1)
-
-company_name = sys.argv[1]
-
-# Create output directory structure: Desktop/resume/company_name
-resume_path = os.path.expanduser("~/Desktop/resume")
-output_dir = os.path.join(resume_path, company_name)
-
-# Create the directory if it doesn't exist
-if not os.path.exists(output_dir):
-    os.makedirs(output_dir)
-    print(f"Created output directory: {output_dir}")
-else:
-    print(f"Using existing directory: {output_dir}")
-
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key)
-
-# Load your resume and job description
-with open('resume.json') as f:
-    resume = json.load(f)
-with open('job_description.txt') as f:
-    job_desc = f.read()
-
-# Build prompt for cover letter generation
-cover_prompt = f"""
+import tracing
+from compile_pool import CompilePool, print_result
+from latex_escape import escape
+from llm_cache import ResponseCache, cached_completion
+
+
+def main(argv=None):
+    # Get company name from command line argument
+    args = list(sys.argv[1:] if argv is None else argv)
+    no_cache = "--no-cache" in args
+    if no_cache:
+        args.remove("--no-cache")
+    profile_path = tracing.pop_profile_arg(args)
+    if profile_path:
+        tracing.enable(profile_path)
+    if len(args) != 1:
+        print("Usage: python cover_gen.py <company_name> [--no-cache] [--profile[=trace.json]]")
+        print("Example: python cover_gen.py glossgenius")
+        sys.exit(1)
+
+    company_name = args[0]
+
+    # Imported after the argument check so usage errors don't pay for loading openai
+    from dotenv import load_dotenv
+    from openai import OpenAI
+
+    # Create output directory structure: Desktop/resume/company_name
+    resume_path = os.path.expanduser("~/Desktop/resume")
+    output_dir = os.path.join(resume_path, company_name)
+
+    # Create the directory if it doesn't exist
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+        print(f"Created output directory: {output_dir}")
+    else:
+        print(f"Using existing directory: {output_dir}")
+
+    load_dotenv()
+    api_key = os.getenv("OPENAI_API_KEY")
+    # OPENAI_BASE_URL can point at another endpoint, e.g. mock_openai_server.py
+    client = OpenAI(api_key=api_key, base_url=os.getenv("OPENAI_BASE_URL") or None)
+    cache = ResponseCache(enabled=not no_cache)
+
+    # Load your resume and job description
+    with open('resume.json') as f:
+        resume = json.load(f)
+    with open('job_description.txt') as f:
+        job_desc = f.read()
+
+    # Build prompt for cover letter generation
+    cover_prompt = f"""
 Given the following resume (in JSON format) and job description, write a compelling cover letter for the position.
 
 The cover letter should:
@@ -62,54 +78,35 @@ Please provide the cover letter content in the following format:
 Return only the cover letter content - no additional formatting or explanations.
 """
 
-# Loading animation function
-def loading_animation():
-    animation = "|/-\\"
-    idx = 0
-    while not hasattr(loading_animation, 'stop'):
-        print(f"\rGenerating cover letter for {company_name}... {animation[idx % len(animation)]}", end='', flush=True)
-        time.sleep(0.1)
-        idx += 1
-
-# Start loading animation in a separate thread
-loading_thread = threading.Thread(target=loading_animation)
-loading_thread.start()
-
-try:
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[{"role": "user", "content": cover_prompt}],
-        max_tokens=1000
-    )
-finally:
-    # Stop the loading animation
-    loading_animation.stop = True
-    loading_thread.join()
-    print("\r" + " " * 60 + "\r", end='', flush=True)  # Clear the loading line
-
-# Get the generated cover letter content
-cover_letter_content = response.choices[0].message.content
-
-# Clean the content for LaTeX (escape special characters)
-def clean_latex_cover(text):
-    """Escape LaTeX special characters"""
-    replacements = {
-        '&': '\\&',
-        '%': '\\%',
-        '$': '\\$',
-        '#': '\\#',
-        '_': '\\_',
-        '{': '\\{',
-        '}': '\\}',
-    }
-    for old, new in replacements.items():
-        text = text.replace(old, new)
-    return text
-
-cover_letter_content = clean_latex_cover(cover_letter_content)
-
-# Create LaTeX content based on the template
-latex_content = f"""%-------------------------
+    # Loading animation function
+    def loading_animation():
+        animation = "|/-\\"
+        idx = 0
+        while not hasattr(loading_animation, 'stop'):
+            print(f"\rGenerating cover letter for {company_name}... {animation[idx % len(animation)]}", end='', flush=True)
+            time.sleep(0.1)
+            idx += 1
+
+    # Start loading animation in a separate thread
+    loading_thread = threading.Thread(target=loading_animation)
+    loading_thread.start()
+
+    try:
+        cover_letter_content = cached_completion(client, "gpt-4o-mini", cover_prompt, 1000, cache)
+    finally:
+        # Stop the loading animation
+        loading_animation.stop = True
+        loading_thread.join()
+        print("\r" + " " * 60 + "\r", end='', flush=True)  # Clear the loading line
+
+    print(cache.summary())
+
+    # Clean the content for LaTeX (escape special characters)
+    with tracing.span("escape"):
+        cover_letter_content = escape(cover_letter_content)
+
+    # Create LaTeX content based on the template
+    latex_content = f"""%-------------------------
 % Cover Letter in LaTeX
 %------------------------
 
@@ -120,6 +117,8 @@ latex_content = f"""%-------------------------
 \\usepackage{{titlesec}}
 \\usepackage[usenames,dvipsnames]{{color}}
 \\usepackage{{enumitem}}
+% Everything above is precompiled into a format file (see latex_format.py)
+\\csname endofdump\\endcsname
 \\usepackage[pdftex]{{hyperref}}
 \\usepackage{{fancyhdr}}
 
@@ -177,48 +176,23 @@ Manith Luthria
 \\end{{document}}
 """
 
-# Save LaTeX file
-base_name = f'Cover_Letter_{company_name}'
-tex_file_path = os.path.join(output_dir, base_name + ".tex")
-with open(tex_file_path, "w") as f:
-    f.write(latex_content)
-
-print("LaTeX file generated successfully!")
-
-# Compile LaTeX to PDF
-print("Compiling LaTeX to PDF...")
-try:
-    # Run pdflatex to compile the document from the output directory
-    result = subprocess.run(
-        ["pdflatex", "-interaction=nonstopmode", base_name + ".tex"],
-        capture_output=True,
-        text=True,
-        cwd=output_dir,
-    )
-
-    if result.returncode == 0:
-        print("PDF generated successfully!")
-        pdf_file_path = os.path.join(output_dir, base_name + ".pdf")
-        print("Output file: " + pdf_file_path)
-    else:
-        print("LaTeX compilation failed!")
-        print("Error output:")
-        print(result.stderr)
-
-except FileNotFoundError:
-    print(
-        "pdflatex not found. Please install a LaTeX distribution (like TeX Live or MiKTeX)"
-    )
-    print(
-        f"You can still compile manually by running: cd {output_dir} && pdflatex "
-        + base_name
-        + ".tex"
-    )
-except Exception as e:
-    print(f"Error during compilation: {e}")
-    print(
-        f"You can still compile manually by running: cd {output_dir} && pdflatex "
-        + base_name
-        + ".tex"
-    )
+    # Save LaTeX file
+    base_name = f'Cover_Letter_{company_name}'
+    tex_file_path = os.path.join(output_dir, base_name + ".tex")
+    with tracing.span("write_tex", stage="cover_tex"):
+        with open(tex_file_path, "w") as f:
+            f.write(latex_content)
+            tracing.add("bytes_written", f.tell())
+
+    print("LaTeX file generated successfully!")
+
+    # Compile LaTeX to PDF
+    print("Compiling LaTeX to PDF...")
+    with CompilePool(workers=1) as pool:
+        print_result(pool.compile(tex_file_path))
+
+    tracing.finish()
+
 
+if __name__ == "__main__":
+    main()
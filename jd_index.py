@@ -0,0 +1,197 @@
+"""
+Rank a directory of scraped job descriptions by how well they match resume.json.
+
+Every .txt/.md file in the directory is tokenized once into a row of a sparse
+(CSR) term-count matrix stored next to the files in .jd_index.npz/.jd_index.json.
+Later runs only tokenize files that are new or changed since the last run, and
+drop rows for deleted files. Ranking weights the matrix with TF-IDF over the whole
+posting corpus and computes the cosine similarity of every posting to the resume
+in one vectorized pass.
+
+The shortlist can be written as a batch.py manifest so only the best matches go
+through the (paid) tailoring pipeline.
+
+Usage: python jd_index.py <jd_dir> [--top N] [--write-manifest shortlist.jsonl]
+"""
+import argparse
+import collections
+import json
+import os
+import tempfile
+import uuid
+
+import numpy as np
+
+from ats_score import resume_segments, terms
+
+INDEX_NAME = ".jd_index"
+JD_EXTENSIONS = (".txt", ".md")
+
+
+def _write_atomic(path, write, mode="w"):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    with os.fdopen(fd, mode) as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+class JdIndex:
+    def __init__(self, directory):
+        self.directory = directory
+        self.vocab = []
+        self._term_ids = {}
+        self.docs = []  # [{"file", "mtime_ns", "size"}], one per matrix row
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.float64)
+
+    @property
+    def _base(self):
+        return os.path.join(self.directory, INDEX_NAME)
+
+    def load(self):
+        try:
+            with open(self._base + ".json") as f:
+                meta = json.load(f)
+            with np.load(self._base + ".npz") as arrays:
+                vocab, docs = meta["vocab"], meta["docs"]
+                indptr, indices, counts = arrays["indptr"], arrays["indices"], arrays["counts"]
+                paired = str(arrays["save_id"]) == meta["save_id"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return self  # missing, corrupt or from an older version; rebuild
+        if not paired or len(docs) + 1 != len(indptr):
+            return self  # the two files come from different saves; rebuild
+        self.vocab = vocab
+        self._term_ids = {term: i for i, term in enumerate(self.vocab)}
+        self.docs = docs
+        self.indptr, self.indices, self.counts = indptr, indices, counts
+        return self
+
+    def save(self):
+        # Both files carry the same save id, so a crash between the two writes (or
+        # either file being replaced) leaves a pair that load() refuses
+        save_id = uuid.uuid4().hex
+        _write_atomic(self._base + ".npz", lambda f: np.savez(
+            f, indptr=self.indptr, indices=self.indices, counts=self.counts,
+            save_id=np.array(save_id)), mode="wb")
+        _write_atomic(self._base + ".json", lambda f: json.dump(
+            {"vocab": self.vocab, "docs": self.docs, "save_id": save_id}, f))
+
+    def _row(self, text):
+        counter = collections.Counter(terms(text))
+        ids = []
+        for term in counter:
+            if term not in self._term_ids:
+                self._term_ids[term] = len(self.vocab)
+                self.vocab.append(term)
+            ids.append(self._term_ids[term])
+        return np.asarray(ids, dtype=np.int64), np.asarray(list(counter.values()), dtype=np.float64)
+
+    def update(self):
+        """Bring the index in line with the directory. Returns (added, changed, removed)."""
+        current = {}
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if name.endswith(JD_EXTENSIONS) and os.path.isfile(path):
+                st = os.stat(path)
+                current[name] = {"file": name, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+        rows = []
+        kept = set()
+        changed = removed = 0
+        for i, doc in enumerate(self.docs):
+            if current.get(doc["file"]) == doc:
+                start, end = self.indptr[i], self.indptr[i + 1]
+                rows.append((doc, self.indices[start:end], self.counts[start:end]))
+                kept.add(doc["file"])
+            elif doc["file"] in current:
+                changed += 1
+            else:
+                removed += 1
+
+        fresh = [doc for name, doc in current.items() if name not in kept]
+        for doc in fresh:
+            with open(os.path.join(self.directory, doc["file"]), errors="replace") as f:
+                rows.append((doc, *self._row(f.read())))
+
+        self.docs = [doc for doc, _, _ in rows]
+        lengths = [len(ids) for _, ids, _ in rows]
+        self.indptr = np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+        self.indices = np.concatenate([ids for _, ids, _ in rows] or [np.zeros(0, np.int64)])
+        self.counts = np.concatenate([c for _, _, c in rows] or [np.zeros(0, np.float64)])
+        return len(fresh) - changed, changed, removed
+
+    def rank(self, resume):
+        """Return [(similarity, file)] for every indexed posting, best match first."""
+        n_docs, n_terms = len(self.docs), len(self.vocab)
+        if n_docs == 0:
+            return []
+        row_ids = np.repeat(np.arange(n_docs), np.diff(self.indptr))
+
+        df = np.bincount(self.indices, minlength=n_terms)
+        idf = np.log((1 + n_docs) / (1 + df)) + 1
+        weights = (1 + np.log(self.counts)) * idf[self.indices]
+        norms = np.sqrt(np.bincount(row_ids, weights * weights, minlength=n_docs))
+
+        query = np.zeros(n_terms)
+        for _, text in resume_segments(resume):
+            for term in terms(text):
+                i = self._term_ids.get(term)
+                if i is not None:
+                    query[i] += 1
+        nonzero = query > 0
+        query[nonzero] = (1 + np.log(query[nonzero])) * idf[nonzero]
+        query_norm = np.sqrt(query @ query)
+
+        dots = np.bincount(row_ids, weights * query[self.indices], minlength=n_docs)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            similarity = np.where(norms > 0, dots / (norms * (query_norm or 1.0)), 0.0)
+        order = np.argsort(-similarity, kind="stable")
+        return [(float(similarity[i]), self.docs[i]["file"]) for i in order]
+
+
+def write_manifest(path, directory, shortlist):
+    """Write the shortlist as a batch.py JSONL manifest (company = file name stem)."""
+    with open(path, "w") as f:
+        for _, name in shortlist:
+            jd_path = os.path.relpath(os.path.join(directory, name),
+                                      os.path.dirname(os.path.abspath(path)))
+            f.write(json.dumps({"company": os.path.splitext(name)[0], "job_description": jd_path})
+                    + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rank a directory of job descriptions against resume.json.",
+        epilog="Example: python jd_index.py postings/ --top 10 --write-manifest shortlist.jsonl",
+    )
+    parser.add_argument("directory", help="directory of .txt/.md job descriptions")
+    parser.add_argument("--resume", default="resume.json")
+    parser.add_argument("--top", type=int, default=20, help="postings to list (default 20)")
+    parser.add_argument("--write-manifest", metavar="PATH",
+                        help="write the top postings as a batch.py manifest")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="re-tokenize every posting instead of updating the index")
+    args = parser.parse_args()
+
+    with open(args.resume) as f:
+        resume = json.load(f)
+
+    index = JdIndex(args.directory)
+    if not args.rebuild:
+        index.load()
+    added, changed, removed = index.update()
+    index.save()
+    print(f"Indexed {len(index.docs)} postings ({added} new, {changed} changed, {removed} removed, "
+          f"{len(index.vocab)} terms)")
+
+    shortlist = index.rank(resume)[:args.top]
+    for rank, (score, name) in enumerate(shortlist, 1):
+        print(f"{rank:3}. {score:.3f}  {name}")
+    if args.write_manifest:
+        write_manifest(args.write_manifest, args.directory, shortlist)
+        print(f"Shortlist written to {args.write_manifest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+JSON Patch (RFC 6902) for the patch optimize mode in combo.py.
+
+Supports the add, remove, replace, move, copy and test operations with RFC 6901
+pointers ("/experience/0/achievements/-"). apply_patch never modifies its input and
+either applies every operation or raises JsonPatchError.
+"""
+import copy
+
+
+class JsonPatchError(ValueError):
+    pass
+
+
+def parse_pointer(pointer):
+    """Split a JSON Pointer into its unescaped reference tokens."""
+    if pointer == "":
+        return []
+    if not isinstance(pointer, str) or not pointer.startswith("/"):
+        raise JsonPatchError(f"invalid pointer {pointer!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _index(container, token, pointer, allow_end=False):
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise JsonPatchError(f"{pointer}: {token!r} is not an array index")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise JsonPatchError(f"{pointer}: index {index} out of range")
+    return index
+
+
+def _resolve(doc, tokens, pointer):
+    """Return the container holding the last token of pointer."""
+    node = doc
+    for token in tokens[:-1]:
+        if isinstance(node, dict):
+            if token not in node:
+                raise JsonPatchError(f"{pointer}: {token!r} not found")
+            node = node[token]
+        elif isinstance(node, list):
+            node = node[_index(node, token, pointer)]
+        else:
+            raise JsonPatchError(f"{pointer}: cannot descend into a {type(node).__name__}")
+    return node
+
+
+def _get(doc, pointer):
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        return doc
+    parent = _resolve(doc, tokens, pointer)
+    token = tokens[-1]
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchError(f"{pointer}: {token!r} not found")
+        return parent[token]
+    if isinstance(parent, list):
+        return parent[_index(parent, token, pointer)]
+    raise JsonPatchError(f"{pointer}: cannot index a {type(parent).__name__}")
+
+
+def _add(doc, pointer, value):
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        return value
+    parent = _resolve(doc, tokens, pointer)
+    if isinstance(parent, dict):
+        parent[tokens[-1]] = value
+    elif isinstance(parent, list):
+        parent.insert(_index(parent, tokens[-1], pointer, allow_end=True), value)
+    else:
+        raise JsonPatchError(f"{pointer}: cannot add to a {type(parent).__name__}")
+    return doc
+
+
+def _remove(doc, pointer):
+    tokens = parse_pointer(pointer)
+    if not tokens:
+        raise JsonPatchError("cannot remove the whole document")
+    parent = _resolve(doc, tokens, pointer)
+    if isinstance(parent, dict):
+        if tokens[-1] not in parent:
+            raise JsonPatchError(f"{pointer}: {tokens[-1]!r} not found")
+        return parent.pop(tokens[-1])
+    if isinstance(parent, list):
+        return parent.pop(_index(parent, tokens[-1], pointer))
+    raise JsonPatchError(f"{pointer}: cannot remove from a {type(parent).__name__}")
+
+
+def _operation(op, doc):
+    if not isinstance(op, dict) or "op" not in op or "path" not in op:
+        raise JsonPatchError(f"malformed operation {op!r}")
+    kind, path = op["op"], op["path"]
+    if kind in ("add", "replace", "test") and "value" not in op:
+        raise JsonPatchError(f"{kind} {path}: missing 'value'")
+    if kind in ("move", "copy") and "from" not in op:
+        raise JsonPatchError(f"{kind} {path}: missing 'from'")
+    # Check both pointers up front; move compares them as strings before resolving either
+    parse_pointer(path)
+    if kind in ("move", "copy"):
+        parse_pointer(op["from"])
+
+    if kind == "add":
+        return _add(doc, path, copy.deepcopy(op["value"]))
+    if kind == "remove":
+        _remove(doc, path)
+        return doc
+    if kind == "replace":
+        _get(doc, path)  # the target must exist
+        if path == "":
+            return copy.deepcopy(op["value"])
+        _remove(doc, path)
+        return _add(doc, path, copy.deepcopy(op["value"]))
+    if kind == "move":
+        if path.startswith(op["from"] + "/"):
+            raise JsonPatchError(f"move {op['from']}: cannot move into its own child")
+        return _add(doc, path, _remove(doc, op["from"]))
+    if kind == "copy":
+        return _add(doc, path, copy.deepcopy(_get(doc, op["from"])))
+    if kind == "test":
+        if _get(doc, path) != op["value"]:
+            raise JsonPatchError(f"test {path}: value does not match")
+        return doc
+    raise JsonPatchError(f"unknown operation {kind!r}")
+
+
+def apply_patch(doc, patch):
+    """Return a patched deep copy of doc."""
+    if not isinstance(patch, list):
+        raise JsonPatchError("a patch must be a list of operations")
+    doc = copy.deepcopy(doc)
+    for op in patch:
+        doc = _operation(op, doc)
+    return doc
+
+
+def describe_patch(patch):
+    """One line per operation, for printing the change set."""
+    lines = []
+    for op in patch:
+        if op.get("op") in ("move", "copy"):
+            lines.append(f"{op['op']:8} {op.get('from')} -> {op.get('path')}")
+        else:
+            lines.append(f"{op.get('op', '?'):8} {op.get('path')}")
+    return lines
@@ -0,0 +1,119 @@
+"""
+Incremental parser for a JSON object that arrives in chunks (e.g. a streamed completion).
+
+SectionStreamParser reports each top-level key of the object as soon as its value is
+complete, so callers can act on "experience" while "skills" is still being generated.
+A section whose value is not valid JSON is skipped and its key listed in `unparsed`.
+"""
+import json
+
+
+class SectionStreamParser:
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0  # next character of buffer to scan
+        self._started = False  # seen the opening brace of the top-level object
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._key = None  # top-level key whose value we are waiting on
+        self._expect_key = True
+        self._value_start = None
+        self.sections = {}
+        self.unparsed = []  # top-level keys whose values were not valid JSON
+
+    @property
+    def finished(self):
+        return self._finished
+
+    def feed(self, chunk):
+        """Add text and return a list of (key, value) pairs completed by it."""
+        self.buffer += chunk
+        completed = []
+        buf = self.buffer
+        i = self._pos
+        n = len(buf)
+
+        while i < n and not self._finished:
+            c = buf[i]
+
+            if not self._started:
+                # Skip anything before the object, such as a ```json fence
+                if c == "{":
+                    self._started = True
+                    self._depth = 1
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect_key and self._value_start is None:
+                        self._key = json.loads(buf[self._string_start:i + 1])
+                        self._expect_key = False
+                    elif self._depth == 1 and self._value_start is not None:
+                        # A top-level string value just closed
+                        self._complete(buf, i + 1, completed)
+                i += 1
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+                if self._depth == 1 and not self._expect_key and self._value_start is None:
+                    self._value_start = i
+            elif c in "{[":
+                if self._depth == 1 and self._value_start is None:
+                    self._value_start = i
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    # End of the top-level object; flush a trailing scalar value
+                    if self._value_start is not None:
+                        self._complete(buf, i, completed)
+                    self._finished = True
+                elif self._depth == 1 and self._value_start is not None:
+                    self._complete(buf, i + 1, completed)
+            elif c == ",":
+                if self._depth == 1:
+                    if self._value_start is not None:
+                        # Number / true / false / null value ends at the comma
+                        self._complete(buf, i, completed)
+                    self._expect_key = True
+            elif c == ":":
+                pass
+            elif not c.isspace() and self._depth == 1 and not self._expect_key \
+                    and self._value_start is None:
+                self._value_start = i
+            i += 1
+
+        self._pos = i
+        return completed
+
+    def _complete(self, buf, end, completed):
+        key = self._key
+        text = buf[self._value_start:end]
+        self._key = None
+        self._value_start = None
+        try:
+            value = json.loads(text)
+        except ValueError:
+            # A malformed value (trailing comma, bad literal) only loses its own section
+            self.unparsed.append(key)
+            return
+        self.sections[key] = value
+        completed.append((key, value))
+
+    def result(self):
+        """Parse the complete buffered document (raises ValueError if it is not valid JSON)."""
+        text = self.buffer
+        start = text.find("{")
+        end = text.rfind("}")
+        return json.loads(text[start:end + 1] if start != -1 and end != -1 else text)
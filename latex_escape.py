@@ -0,0 +1,88 @@
+"""
+Escaping of plain text (resume fields, generated cover letters) for LaTeX.
+
+All of LaTeX's special characters are covered by one precomputed table, and every
+string is escaped with it in one step. The templates apply escape() to every value
+as it is inserted (see resume_latex.py). Nothing has to copy and escape the whole
+resume beforehand, and only fields that are actually rendered are escaped. Results
+are memoised: a batch renders the same name, contact details and unchanged bullets
+for every job.
+
+Values that are already LaTeX can be wrapped in LatexString to be inserted as is.
+"""
+import functools
+
+MEMO_SIZE = 8192
+
+# Every character that is special in LaTeX text mode, with its printable form
+SPECIAL_CHARACTERS = {
+    "\\": r"\textbackslash{}",
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+    # Not special, but print as inverted punctuation in the default OT1 font encoding
+    "<": r"\textless{}",
+    ">": r"\textgreater{}",
+    "|": r"\textbar{}",
+}
+_TABLE = str.maketrans(SPECIAL_CHARACTERS)
+# Replacement order for text without backslashes: braces first, so the {} that the
+# \text... replacements insert are not escaped again
+_ORDERED = sorted(SPECIAL_CHARACTERS.items(), key=lambda item: item[0] not in "{}")
+_ORDERED.remove(("\\", SPECIAL_CHARACTERS["\\"]))
+
+# hyperref reads URLs almost verbatim; it only needs the characters that would end
+# or break the argument escaped
+_URL_TABLE = str.maketrans({c: "\\" + c for c in "&%#"})
+
+
+class LatexString(str):
+    """A string that is already LaTeX and must not be escaped again."""
+
+
+@functools.lru_cache(maxsize=MEMO_SIZE)
+def _escape_str(text):
+    if "\\" in text:
+        # Every replacement adds a backslash, so only a single pass gets this right
+        return text.translate(_TABLE)
+    # str.translate looks up every character in a dict; in CPython that is several
+    # times slower than a few replace() calls for the characters actually present
+    for char, replacement in _ORDERED:
+        if char in text:
+            text = text.replace(char, replacement)
+    return text
+
+
+def escape(value):
+    """Escape one value for LaTeX text. Non-strings are formatted with str() first."""
+    if type(value) is LatexString:
+        return value
+    if type(value) is not str:
+        value = str(value)
+    return _escape_str(value)
+
+
+def escape_url(value):
+    """Escape a URL for \\href / \\url; the result is a LatexString."""
+    return LatexString(str(value).translate(_URL_TABLE))
+
+
+def escape_tree(obj):
+    """Escaped copy of a JSON-like structure, for callers that need the escaped values themselves."""
+    if isinstance(obj, dict):
+        return {k: escape_tree(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [escape_tree(item) for item in obj]
+    if isinstance(obj, str):
+        return escape(obj)
+    return obj
+
+
+def memo_info():
+    return _escape_str.cache_info()
@@ -0,0 +1,108 @@
+"""
+Precompiled LaTeX formats for the fixed document preambles.
+
+Loading titlesec, enumitem, marvosym and friends is most of a pdflatex run. The part
+of a preamble above the endofdump marker is dumped once into a .fmt file (via
+mylatexformat) under .latex_fmt/, named after a hash of that text and the pdflatex
+version, and later compiles start from the format instead of re-reading the packages.
+A changed preamble simply gets a new format file.
+
+Packages after the marker (hyperref and anything that writes PDF objects) are still
+loaded normally on every run; they do not survive being dumped.
+"""
+import functools
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+
+FORMAT_DIR = ".latex_fmt"
+ENDOFDUMP = "\\csname endofdump\\endcsname"
+BEGIN_DOCUMENT = "\\begin{document}"
+
+_build_locks = {}
+_build_locks_guard = threading.Lock()
+_failed = set()  # formats that could not be built in this process; don't retry each compile
+
+
+def split_preamble(latex_content):
+    """Return the dumpable part of the preamble, or None if the document has no preamble."""
+    end = latex_content.find(ENDOFDUMP)
+    if end == -1:
+        end = latex_content.find(BEGIN_DOCUMENT)
+    if end == -1:
+        return None
+    return latex_content[:end]
+
+
+@functools.lru_cache(maxsize=1)
+def pdflatex_version():
+    try:
+        result = subprocess.run(["pdflatex", "--version"], capture_output=True, text=True)
+    except OSError:
+        return ""
+    return result.stdout.split("\n", 1)[0]
+
+
+def format_name(preamble):
+    h = hashlib.sha256()
+    h.update(pdflatex_version().encode("utf-8"))
+    h.update(b"\0")
+    h.update(preamble.encode("utf-8"))
+    return "preamble-" + h.hexdigest()[:16]
+
+
+def ensure_format(preamble, format_dir=FORMAT_DIR):
+    """
+    Return (format_dir, name) for a .fmt built from preamble, building it if needed.
+    Returns None when the format cannot be built (e.g. mylatexformat is not installed).
+    """
+    format_dir = os.path.abspath(format_dir)
+    name = format_name(preamble)
+    fmt_path = os.path.join(format_dir, name + ".fmt")
+    if os.path.exists(fmt_path):
+        return format_dir, name
+
+    with _build_locks_guard:
+        lock = _build_locks.setdefault(name, threading.Lock())
+    with lock:
+        if os.path.exists(fmt_path):
+            return format_dir, name
+        if name in _failed:
+            return None
+        os.makedirs(format_dir, exist_ok=True)
+        build_dir = tempfile.mkdtemp(prefix=".build-" + name + "-", dir=format_dir)
+        try:
+            with open(os.path.join(build_dir, name + ".tex"), "w") as f:
+                f.write(preamble + ENDOFDUMP + "\n" + BEGIN_DOCUMENT + "\n\\end{document}\n")
+            try:
+                result = subprocess.run(
+                    ["pdflatex", "-ini", "-interaction=nonstopmode", "-jobname=" + name,
+                     "&pdflatex", "mylatexformat.ltx", name + ".tex"],
+                    capture_output=True,
+                    text=True,
+                    cwd=build_dir,
+                )
+            except OSError:
+                _failed.add(name)
+                return None
+            built = os.path.join(build_dir, name + ".fmt")
+            if result.returncode != 0 or not os.path.exists(built):
+                _failed.add(name)
+                return None
+            # Rename into place so other processes never load a half-written format
+            os.replace(built, fmt_path)
+            return format_dir, name
+        finally:
+            shutil.rmtree(build_dir, ignore_errors=True)
+
+
+def format_command(fmt):
+    """pdflatex arguments and environment for compiling against ensure_format()'s result."""
+    format_dir, name = fmt
+    env = dict(os.environ)
+    # Trailing separator keeps the default search path after our directory
+    env["TEXFORMATS"] = format_dir + os.pathsep + env.get("TEXFORMATS", "")
+    return ["-fmt=" + name], env
@@ -0,0 +1,310 @@
+"""
+Small compiled template engine for LaTeX documents.
+
+Templates are plain .tex files with tags that cannot clash with TeX syntax:
+
+    << contact.email >>                  insert a value (dotted lookups into dicts)
+    << skills.languages|join >>          ... passed through a filter
+    <<#for exp in experience>> ... <</for>>
+    <<#for key, sep, text in exp.achievements|bullets>> ... <</for>>
+    \href{<< contact.linkedin|url >>}   a URL, escaped for hyperref rather than as text
+    <<#if sep>> ... <<#else>> ... <</if>>
+    <<#section experience>> ... <</section>>   a named part that can be rendered alone
+    <<! comment >>
+
+A line holding nothing but a block tag or comment is dropped entirely, so the template
+lays out exactly like the generated document. Each template is translated once into a
+Python render function that appends to a list and joins it at the end. The compiled
+code is cached in memory and, marshalled, under .template_cache/ so later processes
+skip parsing too.
+"""
+import hashlib
+import marshal
+import operator
+import os
+import re
+import sys
+import tempfile
+import threading
+
+from latex_escape import escape_url
+
+TEMPLATE_CACHE_DIR = ".template_cache"
+ENGINE_VERSION = "1"
+
+_TAG = re.compile(r"<<\s*([#/!]?)(.*?)\s*>>", re.S)
+_BLOCK_LINE = re.compile(r"^[ \t]*(<<[#/!][^\n>]*>>)[ \t]*\r?\n", re.M)
+_FOR = re.compile(r"^(\w+(?:\s*,\s*\w+)*)\s+in\s+(.+)$")
+_NAME = re.compile(r"^[A-Za-z_]\w*(\.\w+)*$")
+
+
+class TemplateError(Exception):
+    pass
+
+
+def split_bullets(items):
+    """
+    Split "Key: description" bullets for \\resumeItem. Yields (key, sep, description)
+    triples like str.partition; sep is empty (and key the whole bullet) without a key.
+    """
+    return map(operator.methodcaller("partition", ": "), items)
+
+
+FILTERS = {
+    "join": lambda items: ", ".join(items),
+    "bullets": split_bullets,
+    "url": escape_url,
+}
+
+
+_FSTRING_ESCAPES = {"\\": "\\\\", "'": "\\'", "{": "{{", "}": "}}"}
+_FSTRING_ESCAPES.update({chr(i): "\\x%02x" % i for i in range(32)})
+
+
+def _fstring_literal(text):
+    """Escape text for the literal part of a single-quoted f-string."""
+    return "".join(_FSTRING_ESCAPES.get(c, c) for c in text)
+
+
+class _CodeWriter:
+    def __init__(self):
+        self.lines = []
+        self.indent = 0
+
+    def line(self, text):
+        self.lines.append("    " * self.indent + text)
+
+
+class _Compiler:
+    """Translates template source into the source of a Python module."""
+
+    def __init__(self, source, name, finalize):
+        self.name = name
+        self.finalize = finalize
+        self.tokens = self._tokenize(source)
+        self.pos = 0
+        self.sections = []
+        self._section_bodies = []
+
+    def _tokenize(self, source):
+        source = _BLOCK_LINE.sub(r"\1", source)
+        tokens = []
+        last = 0
+        for match in _TAG.finditer(source):
+            if match.start() > last:
+                tokens.append(("text", source[last:match.start()]))
+            kind, body = match.group(1), match.group(2).strip()
+            if kind == "#":
+                word, _, rest = body.partition(" ")
+                tokens.append((word, rest.strip()))
+            elif kind == "/":
+                tokens.append(("end", body))
+            elif kind == "!":
+                pass
+            else:
+                tokens.append(("expr", body))
+            last = match.end()
+        if last < len(source):
+            tokens.append(("text", source[last:]))
+        return tokens
+
+    def _expr(self, expr, scope):
+        parts = [p.strip() for p in expr.split("|")]
+        path = parts[0]
+        negate = False
+        if path.startswith("not "):
+            negate, path = True, path[4:].strip()
+        if not _NAME.match(path):
+            raise TemplateError(f"{self.name}: bad expression {expr!r}")
+        head, *attrs = path.split(".")
+        # Keys are double-quoted because the generated code embeds them in f'...' strings
+        code = "v_" + head if head in scope else f'ctx["{head}"]'
+        for attr in attrs:
+            code += f'["{attr}"]'
+        for flt in parts[1:]:
+            if flt not in FILTERS:
+                raise TemplateError(f"{self.name}: unknown filter {flt!r}")
+            code = f'_filters["{flt}"]({code})'
+        return f"(not {code})" if negate else code
+
+    def compile(self):
+        main = _CodeWriter()
+        main.line("def render(ctx, _pre, _fin=_fin, _filters=_filters):")
+        main.indent += 1
+        main.line("_out = []")
+        main.line("_a = _out.append")
+        self._block(main, frozenset(), stop=(), top=True)
+        main.line("return ''.join(_out)")
+        return "\n".join(sum(self._section_bodies, []) + main.lines) + "\n"
+
+    def _block(self, w, scope, stop, top=False):
+        """Emit code until one of the `stop` tags; returns the tag that ended the block."""
+        start = len(w.lines)
+        while self.pos < len(self.tokens):
+            kind, value = self.tokens[self.pos]
+            self.pos += 1
+            if kind in ("text", "expr"):
+                # Emit a run of literals and values as one f-string, i.e. a single
+                # string build and append for the whole run
+                parts = []
+                while True:
+                    if kind == "text":
+                        parts.append(_fstring_literal(value))
+                    else:
+                        parts.append("{_fin(%s)}" % self._expr(value, scope) if self.finalize
+                                     else "{%s}" % self._expr(value, scope))
+                    if self.pos >= len(self.tokens) or self.tokens[self.pos][0] not in ("text", "expr"):
+                        break
+                    kind, value = self.tokens[self.pos]
+                    self.pos += 1
+                w.line("_a(f'%s')" % "".join(parts))
+            elif kind == "for":
+                match = _FOR.match(value)
+                if not match:
+                    raise TemplateError(f"{self.name}: bad for loop {value!r}")
+                names = [n.strip() for n in match.group(1).split(",")]
+                targets = ", ".join("v_" + n for n in names)
+                w.line(f"for {targets} in {self._expr(match.group(2), scope)}:")
+                w.indent += 1
+                self._expect(self._block(w, scope | set(names), ("for",)), "for")
+                w.indent -= 1
+            elif kind == "if":
+                w.line(f"if {self._expr(value, scope)}:")
+                w.indent += 1
+                ended = self._block(w, scope, ("if", "else"))
+                w.indent -= 1
+                if ended == "else":
+                    w.line("else:")
+                    w.indent += 1
+                    ended = self._block(w, scope, ("if",))
+                    w.indent -= 1
+                self._expect(ended, "if")
+            elif kind == "section":
+                if not top or scope:
+                    raise TemplateError(f"{self.name}: sections must be at the top level")
+                self._section(w, value)
+            elif kind == "else":
+                if "else" in stop:
+                    return self._close(w, start, "else")
+                raise TemplateError(f"{self.name}: unexpected <<#else>>")
+            elif kind == "end":
+                if value in stop:
+                    return self._close(w, start, value)
+                raise TemplateError(f"{self.name}: unexpected <</{value}>>")
+            else:
+                raise TemplateError(f"{self.name}: unknown tag <<#{kind}>>")
+        if stop:
+            raise TemplateError(f"{self.name}: missing <</{stop[0]}>>")
+        return self._close(w, start, None)
+
+    @staticmethod
+    def _close(w, start, ended):
+        # Python needs a statement even when the block rendered nothing
+        if len(w.lines) == start:
+            w.line("pass")
+        return ended
+
+    def _section(self, w, name):
+        if not re.match(r"^\w+$", name) or name in self.sections:
+            raise TemplateError(f"{self.name}: bad or duplicate section {name!r}")
+        self.sections.append(name)
+        # Sections append straight into the caller's output list, so a full render
+        # still joins everything exactly once
+        sw = _CodeWriter()
+        sw.line(f"def section_{name}(ctx, _a, _fin=_fin, _filters=_filters):")
+        sw.indent += 1
+        self._expect(self._block(sw, frozenset(), ("section",)), "section")
+        self._section_bodies.append(sw.lines + [""])
+        w.line(f"if {name!r} in _pre:")
+        w.line(f"    _a(_pre[{name!r}])")
+        w.line("else:")
+        w.line(f"    section_{name}(ctx, _a)")
+
+    def _expect(self, ended, tag):
+        if ended != tag:
+            raise TemplateError(f"{self.name}: expected <</{tag}>>")
+
+
+def _cache_key(source, finalize=False):
+    h = hashlib.sha256()
+    for part in (ENGINE_VERSION, sys.version, str(bool(finalize)), source):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+_compiled = {}  # cache key -> (code object, section names)
+_compiled_lock = threading.Lock()
+
+
+def _compile_source(source, name, cache_dir, finalize):
+    key = _cache_key(source, finalize)
+    with _compiled_lock:
+        if key in _compiled:
+            return _compiled[key]
+
+    cached = None
+    path = os.path.join(cache_dir, key + ".marshal") if cache_dir else None
+    if path and os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                cached = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            cached = None
+
+    if cached is None:
+        compiler = _Compiler(source, name, finalize is not None)
+        module_source = compiler.compile()
+        cached = (compile(module_source, f"<template {name}>", "exec"), tuple(compiler.sections))
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                marshal.dump(cached, f)
+            os.replace(tmp_path, path)
+
+    with _compiled_lock:
+        _compiled[key] = cached
+    return cached
+
+
+class Template:
+    """
+    A compiled template. Every inserted value goes through finalize (e.g. an escaping
+    function); with finalize=None values are formatted directly, as str() would.
+    """
+
+    def __init__(self, source, name="<string>", cache_dir=TEMPLATE_CACHE_DIR, finalize=None):
+        self.name = name
+        code, self.sections = _compile_source(source, name, cache_dir, finalize)
+        namespace = {"_fin": finalize, "_filters": FILTERS}
+        exec(code, namespace)
+        self._render = namespace["render"]
+        self._section_funcs = {s: namespace["section_" + s] for s in self.sections}
+
+    def render(self, ctx, prerendered=None):
+        """Render the whole document; sections found in `prerendered` are used verbatim."""
+        return self._render(ctx, prerendered or {})
+
+    def render_section(self, name, ctx):
+        out = []
+        self._section_funcs[name](ctx, out.append)
+        return "".join(out)
+
+
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+
+def load_template(path, **kwargs):
+    """Load and compile a template file, reusing the compiled template while it is unchanged."""
+    st = os.stat(path)
+    key = (os.path.abspath(path), st.st_mtime_ns, st.st_size, tuple(sorted(kwargs.items())))
+    with _loaded_lock:
+        template = _loaded.get(key)
+    if template is None:
+        with open(path) as f:
+            template = Template(f.read(), name=os.path.basename(path), **kwargs)
+        with _loaded_lock:
+            _loaded[key] = template
+    return template
@@ -0,0 +1,194 @@
+"""
+Content-addressed on-disk cache for LLM completions.
+
+Responses are keyed on a SHA-256 of (model, max_tokens, full prompt), plus n for
+multi-candidate requests and response_format for JSON mode, i.e. every request
+parameter the pipeline sets, so a repeat run with byte-identical resume.json / job
+description / prompt text skips the API call.
+Entries older than max_age seconds are ignored and the oldest entries are evicted
+once the cache grows past max_bytes. The directory is only walked for that on the
+first put() and whenever a running size estimate passes max_bytes, not on every put().
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+import tracing
+from token_budget import complete, complete_n
+
+DEFAULT_CACHE_DIR = ".llm_cache"
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024  # 200 MB
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60  # 30 days
+EVICT_TO = 0.9  # a full cache is trimmed to this fraction of max_bytes, leaving room for new puts
+
+
+class ResponseCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 max_age=DEFAULT_MAX_AGE, enabled=True):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._size = None  # bytes on disk at the last evict(), plus what put() wrote since
+
+    @staticmethod
+    def key(model, max_tokens, prompt, n=1, response_format=None):
+        h = hashlib.sha256()
+        parts = [model, str(max_tokens), prompt]
+        # Parameters at their defaults stay out of the key, so plain single-answer keys never change
+        if n != 1:
+            parts.append(f"n={n}")
+        if response_format is not None:
+            parts.append("response_format=" + json.dumps(response_format, sort_keys=True))
+        for part in parts:
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, model, max_tokens, prompt, n=1, response_format=None):
+        """Return the cached completion text (a list of n texts for n > 1), or None on a miss."""
+        if not self.enabled:
+            return None
+        path = self._path(self.key(model, max_tokens, prompt, n, response_format))
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                os.remove(path)
+                self._count(False)
+                return None
+            with open(path) as f:
+                entry = json.load(f)
+            # Touch the entry so size-based eviction drops least recently used first
+            os.utime(path)
+        except (OSError, ValueError):
+            self._count(False)
+            return None
+        self._count(True)
+        return entry["content"]
+
+    def put(self, model, max_tokens, prompt, content, n=1, response_format=None):
+        if not self.enabled:
+            return
+        path = self._path(self.key(model, max_tokens, prompt, n, response_format))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {"model": model, "max_tokens": max_tokens, "created": time.time(), "content": content}
+        # Write to a temp file and rename so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+            size = f.tell()
+        os.replace(tmp_path, path)
+        with self._lock:
+            # Overwritten entries are counted twice, which only makes eviction come early
+            if self._size is not None:
+                self._size += size
+            due = self._size is None or self._size > self.max_bytes
+        if due:
+            self.evict()
+
+    def discard(self, model, max_tokens, prompt, n=1, response_format=None):
+        """Drop one entry, e.g. a response that turned out to be unusable."""
+        if self.enabled:
+            self._remove(self._path(self.key(model, max_tokens, prompt, n, response_format)))
+
+    def evict(self):
+        """
+        Drop expired entries, then, if still over max_bytes, the least recently used
+        ones until under EVICT_TO of it.
+        """
+        if not os.path.isdir(self.cache_dir):
+            self._size = 0
+            return
+        now = time.time()
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                if now - st.st_mtime > self.max_age:
+                    self._remove(path)
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+        entries.sort()
+        limit = self.max_bytes * EVICT_TO if total > self.max_bytes else self.max_bytes
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            self._remove(path)
+            total -= size
+        with self._lock:
+            self._size = total
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def summary(self):
+        if not self.enabled:
+            return "LLM cache: disabled"
+        return f"LLM cache: {self.hits} hits, {self.misses} misses"
+
+
+def cached_completion(client, model, prompt, max_tokens, cache=None, response_format=None,
+                      label=None):
+    """
+    Single-prompt chat completion that consults `cache` first and stores the answer
+    afterwards. Returns the completion text. response_format is passed through to the
+    API (e.g. {"type": "json_object"} for JSON mode); truncated answers are continued
+    and token usage is logged under label (see token_budget.py).
+    """
+    with tracing.span("llm", label=label or "completion", model=model, max_tokens=max_tokens) as span:
+        if cache is not None:
+            content = cache.get(model, max_tokens, prompt, response_format=response_format)
+            if content is not None:
+                span.set(cache="hit")
+                return content
+
+        content = complete(client, model, prompt, max_tokens, response_format, label)
+
+        if cache is not None:
+            span.set(cache="miss")
+            cache.put(model, max_tokens, prompt, content, response_format=response_format)
+        return content
+
+
+def cached_completions(client, model, prompt, max_tokens, n, cache=None, response_format=None,
+                       label=None):
+    """cached_completion for n candidate answers from one call (see token_budget.complete_n)."""
+    with tracing.span("llm", label=label or "completion", model=model, max_tokens=max_tokens, n=n) as span:
+        if cache is not None:
+            contents = cache.get(model, max_tokens, prompt, n, response_format)
+            if contents is not None:
+                span.set(cache="hit")
+                return contents
+        contents = complete_n(client, model, prompt, max_tokens, n, response_format, label)
+        if cache is not None:
+            span.set(cache="miss")
+            cache.put(model, max_tokens, prompt, contents, n, response_format)
+        return contents
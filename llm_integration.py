@@ -1,11 +1,15 @@
 from openai import OpenAI
 import json
 import os
+import sys
 from dotenv import load_dotenv
+from llm_cache import ResponseCache, cached_completion
 
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key)
+# OPENAI_BASE_URL can point at another endpoint, e.g. mock_openai_server.py
+client = OpenAI(api_key=api_key, base_url=os.getenv("OPENAI_BASE_URL") or None)
+cache = ResponseCache(enabled="--no-cache" not in sys.argv[1:])
 
 
 # Load your resume and job description
@@ -30,15 +34,17 @@ JOB DESCRIPTION:
 OPTIMIZED RESUME JSON:
 """
 
-# Call OpenAI API
-response = client.chat.completions.create(
-    model="gpt-4o",  # Or another suitable model
-    messages=[{"role": "user", "content": prompt}],
-    max_tokens=2000  # Adjust as needed
+# Call OpenAI API (or reuse a cached answer for an identical prompt)
+optimized_json = cached_completion(
+    client,
+    "gpt-4o",  # Or another suitable model
+    prompt,
+    2000,  # Adjust as needed
+    cache,
 )
+print(cache.summary())
 
 # Parse and save new resume
-optimized_json = response.choices[0].message.content
 optimized_resume = json.loads(optimized_json)
 with open('optimized_resume.json', 'w') as f:
     json.dump(optimized_resume, f, indent=2)
@@ -0,0 +1,425 @@
+"""
+Local stand-in for the OpenAI chat completions API, for offline and load testing.
+
+Implements POST /v1/chat/completions, plain and streaming (server-sent events,
+including the usage chunk for stream_options.include_usage), and the Batch API
+(POST /v1/files, POST /v1/batches, GET /v1/batches/<id>, GET /v1/files/<id>/content)
+for batch_queue.py: a batch stays in_progress for --batch-seconds and then every
+line is answered like a chat completion. It answers from
+recorded responses when given --replay (a bench_recordings.json-style file keyed
+like the response cache) and otherwise with canned answers shaped like the real
+ones: the optimize prompt echoes the resume it was sent, patch and repair prompts
+get minimal valid JSON, and anything else gets a short cover letter. max_tokens is
+honoured (about 4 characters per token), and a continuation request (see
+token_budget.continuation_messages) gets the rest of the answer it was cut from, so
+truncation and continuation can be exercised too.
+
+Latency, failures and rate limits are configurable:
+
+    --latency-ms 800 --jitter-ms 300 --distribution lognormal
+    --tokens-per-second 60            stream pacing
+    --error-rate 0.02                 random 500s
+    --rate-limit-rate 0.05            random 429s (with Retry-After)
+    --rpm 500                         429 once more than 500 requests arrive in a minute
+
+Point the scripts at it with --base-url (combo.py, batch.py) or OPENAI_BASE_URL:
+
+    python mock_openai_server.py --port 8765 &
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python batch.py jobs.jsonl --workers 64
+
+GET /stats returns request counters as JSON.
+"""
+import argparse
+import collections
+import email.parser
+import email.policy
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from llm_cache import ResponseCache
+from token_budget import CONTINUE_PROMPT
+
+CHARS_PER_TOKEN = 4
+COVER_LETTER = (
+    "I am excited to apply for this role. In my current position I have built full-stack "
+    "tools with React, Python and SQL that cut manual work by hours every day and made "
+    "dashboards 50% more responsive.\n\n"
+    "I would welcome the chance to bring the same focus on impact and fast iteration to "
+    "your team, and I look forward to discussing how I can help."
+)
+
+
+def _trim_achievements(experience):
+    # What a well-behaved model does with "never more than five achievements".
+    # A repair prompt can carry a null or malformed section; echo that back as is.
+    if not isinstance(experience, list):
+        return experience
+    for exp in experience:
+        if isinstance(exp, dict) and isinstance(exp.get("achievements"), list):
+            exp["achievements"] = exp["achievements"][:5]
+    return experience
+
+
+def canned_answer(prompt):
+    """A plausible answer for each of the pipeline's prompts."""
+    if "single key" in prompt:
+        section = re.search(r'"([^"]+)" section', prompt).group(1)
+        original = json.loads(prompt.split("JSON:\n", 1)[1].split("\n\nJOB DESCRIPTION:", 1)[0])
+        if section == "experience":
+            _trim_achievements(original)
+        return json.dumps({section: original})
+    if "JSON PATCH:" in prompt:
+        return json.dumps({"patch": []})
+    if "OPTIMIZED RESUME JSON:" in prompt:
+        resume = json.loads(prompt.split("RESUME JSON:\n", 1)[1].split("\n\nJOB DESCRIPTION:", 1)[0])
+        _trim_achievements(resume.get("experience", []))
+        return json.dumps(resume)
+    return COVER_LETTER
+
+
+class MockState:
+    def __init__(self, args, recordings):
+        self.args = args
+        self.recordings = recordings
+        self.lock = threading.Lock()
+        self.stats = collections.Counter()
+        self.recent = collections.deque()  # request times within the last minute, for --rpm
+        self.random = random.Random(args.seed)
+        self.files = {}  # file id -> (file object, bytes), for the Batch API
+        self.batches = {}
+
+    def latency(self):
+        args = self.args
+        with self.lock:
+            if args.distribution == "uniform":
+                ms = self.random.uniform(args.latency_ms - args.jitter_ms, args.latency_ms + args.jitter_ms)
+            elif args.distribution == "normal":
+                ms = self.random.gauss(args.latency_ms, args.jitter_ms)
+            elif args.distribution == "lognormal" and args.latency_ms > 0:
+                # Long right tail like real API latency; median latency_ms
+                sigma = args.jitter_ms / args.latency_ms if args.jitter_ms else 0.5
+                ms = self.random.lognormvariate(0, sigma) * args.latency_ms
+            else:
+                ms = args.latency_ms
+        return max(0.0, ms) / 1000
+
+    def admit(self):
+        """Return None to serve the request, or (status, message) to fail it."""
+        args = self.args
+        now = time.monotonic()
+        with self.lock:
+            self.stats["requests"] += 1
+            if args.rpm:
+                while self.recent and now - self.recent[0] > 60:
+                    self.recent.popleft()
+                if len(self.recent) >= args.rpm:
+                    self.stats["429"] += 1
+                    return 429, "Rate limit reached for requests per minute"
+                self.recent.append(now)
+            roll = self.random.random()
+        if roll < args.rate_limit_rate:
+            with self.lock:
+                self.stats["429"] += 1
+            return 429, "Rate limit reached (injected)"
+        if roll < args.rate_limit_rate + args.error_rate:
+            with self.lock:
+                self.stats["500"] += 1
+            return 500, "The server had an error while processing your request (injected)"
+        return None
+
+    def completion(self, request):
+        """The chat.completion response body for a (non-streaming) request body."""
+        model = request.get("model", "gpt-4o-mini")
+        messages = request.get("messages") or [{"content": ""}]
+        prompt = messages[-1].get("content") or ""
+        partial = ""
+        if prompt == CONTINUE_PROMPT and len(messages) >= 3:
+            # [prompt, answer so far, CONTINUE_PROMPT]: answer the original prompt from where it stopped
+            prompt = messages[-3].get("content") or ""
+            partial = messages[-2].get("content") or ""
+        content, finish_reason = self.answer(model, prompt, request.get("max_tokens"), partial,
+                                              request.get("response_format"))
+        n = max(1, int(request.get("n") or 1))
+        prompt_tokens = sum(len(m.get("content") or "") for m in messages) // CHARS_PER_TOKEN + 1
+        completion_tokens = (len(content) // CHARS_PER_TOKEN + 1) * n
+        return {
+            "id": "chatcmpl-" + uuid.uuid4().hex[:24],
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            # Every one of the n choices gets the same canned or recorded answer
+            "choices": [{
+                "index": i,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": finish_reason,
+            } for i in range(n)],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    def add_file(self, data, filename, purpose):
+        file = {"id": "file-" + uuid.uuid4().hex[:24], "object": "file", "bytes": len(data),
+                "created_at": int(time.time()), "filename": filename, "purpose": purpose}
+        with self.lock:
+            self.files[file["id"]] = (file, data)
+        return file
+
+    def create_batch(self, input_file_id, endpoint, completion_window):
+        batch = {"id": "batch_" + uuid.uuid4().hex[:24], "object": "batch", "endpoint": endpoint,
+                 "input_file_id": input_file_id, "completion_window": completion_window,
+                 "status": "in_progress", "output_file_id": None, "error_file_id": None,
+                 "created_at": int(time.time()), "completed_at": None,
+                 "request_counts": {"total": 0, "completed": 0, "failed": 0}}
+        with self.lock:
+            _, data = self.files[input_file_id]
+        batch["request_counts"]["total"] = sum(1 for line in data.splitlines() if line.strip())
+        with self.lock:
+            self.batches[batch["id"]] = batch
+        threading.Thread(target=self._run_batch, args=(batch,), daemon=True).start()
+        return batch
+
+    def _run_batch(self, batch):
+        time.sleep(self.args.batch_seconds)
+        with self.lock:
+            _, data = self.files[batch["input_file_id"]]
+        output, errors = [], []
+        for line in data.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            failure = self.admit()
+            if failure is None:
+                response = {"status_code": 200, "request_id": uuid.uuid4().hex,
+                            "body": self.completion(item.get("body") or {})}
+                output.append({"id": "batch_req_" + uuid.uuid4().hex[:24],
+                               "custom_id": item.get("custom_id"), "response": response, "error": None})
+            else:
+                status, message = failure
+                response = {"status_code": status, "request_id": uuid.uuid4().hex,
+                            "body": {"error": {"message": message}}}
+                errors.append({"id": "batch_req_" + uuid.uuid4().hex[:24],
+                               "custom_id": item.get("custom_id"), "response": response, "error": None})
+        with self.lock:
+            self.stats["batch_requests"] += len(output) + len(errors)
+
+        def as_file(lines, name):
+            if not lines:
+                return None
+            data = "".join(json.dumps(line) + "\n" for line in lines).encode("utf-8")
+            return self.add_file(data, name, "batch_output")["id"]
+
+        output_file_id = as_file(output, batch["id"] + "_output.jsonl")
+        error_file_id = as_file(errors, batch["id"] + "_error.jsonl")
+        with self.lock:
+            batch.update(status="completed", completed_at=int(time.time()),
+                         output_file_id=output_file_id, error_file_id=error_file_id,
+                         request_counts={"total": len(output) + len(errors),
+                                         "completed": len(output), "failed": len(errors)})
+
+    def answer(self, model, prompt, max_tokens, partial="", response_format=None):
+        content = self.recordings.get(ResponseCache.key(model, max_tokens, prompt,
+                                                        response_format=response_format))
+        with self.lock:
+            self.stats["replayed" if content is not None else "canned"] += 1
+            if partial:
+                self.stats["continuations"] += 1
+        if content is None:
+            content = canned_answer(prompt)
+        if partial:
+            content = content[len(partial):] if content.startswith(partial) else ""
+        finish_reason = "stop"
+        if max_tokens and len(content) > max_tokens * CHARS_PER_TOKEN:
+            content = content[:max_tokens * CHARS_PER_TOKEN]
+            finish_reason = "length"
+        return content, finish_reason
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state = None  # MockState, set by serve()
+
+    def log_message(self, format, *args):
+        if self.state.args.verbose:
+            super().log_message(format, *args)
+
+    def _json(self, status, body, headers=()):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        parts = self.path.rstrip("/").split("/")
+        if len(parts) >= 3 and parts[-3] == "files" and parts[-1] == "content":
+            with self.state.lock:
+                file = self.state.files.get(parts[-2])
+            if file is None:
+                self._json(404, {"error": {"message": f"no file {parts[-2]}"}})
+                return
+            data = file[1]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        elif len(parts) >= 2 and parts[-2] == "batches":
+            with self.state.lock:
+                batch = self.state.batches.get(parts[-1])
+                batch = dict(batch) if batch is not None else None
+            if batch is None:
+                self._json(404, {"error": {"message": f"no batch {parts[-1]}"}})
+            else:
+                self._json(200, batch)
+        elif self.path.rstrip("/").endswith("/stats"):
+            with self.state.lock:
+                self._json(200, dict(self.state.stats))
+        elif self.path.rstrip("/").endswith("/models"):
+            self._json(200, {"object": "list", "data": [{"id": "gpt-4o-mini", "object": "model"}]})
+        else:
+            self._json(404, {"error": {"message": "not found"}})
+
+    def _upload(self, body):
+        # multipart/form-data with "purpose" and "file" fields, as the openai client sends it
+        message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+            b"Content-Type: " + self.headers.get("Content-Type", "").encode("latin-1") + b"\r\n\r\n" + body
+        )
+        fields = {}
+        if message.is_multipart():
+            for part in message.iter_parts():
+                fields[part.get_param("name", header="content-disposition")] = part
+        if "file" not in fields:
+            self._json(400, {"error": {"message": "missing file", "type": "invalid_request_error"}})
+            return
+        purpose = fields["purpose"].get_payload(decode=True).decode("utf-8") if "purpose" in fields else ""
+        file = fields["file"]
+        self._json(200, self.state.add_file(file.get_payload(decode=True), file.get_filename() or "upload",
+                                            purpose))
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        path = self.path.rstrip("/")
+        if path.endswith("/files"):
+            self._upload(body)
+            return
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            self._json(400, {"error": {"message": "invalid JSON body", "type": "invalid_request_error"}})
+            return
+        if path.endswith("/batches"):
+            if request.get("input_file_id") not in self.state.files:
+                self._json(404, {"error": {"message": f"no file {request.get('input_file_id')}"}})
+                return
+            self._json(200, self.state.create_batch(request["input_file_id"], request.get("endpoint"),
+                                                    request.get("completion_window")))
+            return
+        if not path.endswith("/chat/completions"):
+            self._json(404, {"error": {"message": f"unknown endpoint {self.path}"}})
+            return
+
+        time.sleep(self.state.latency())
+        failure = self.state.admit()
+        if failure is not None:
+            status, message = failure
+            kind = "rate_limit_exceeded" if status == 429 else "server_error"
+            headers = [("Retry-After", "1")] if status == 429 else []
+            self._json(status, {"error": {"message": message, "type": kind, "code": kind}}, headers)
+            return
+
+        completion = self.state.completion(dict(request, n=1) if request.get("stream") else request)
+        if request.get("stream"):
+            include_usage = (request.get("stream_options") or {}).get("include_usage", False)
+            choice = completion["choices"][0]
+            self._stream(completion["id"], completion["model"], choice["message"]["content"],
+                         choice["finish_reason"], completion["usage"] if include_usage else None)
+            return
+        self._json(200, completion)
+
+    def _stream(self, completion_id, model, content, finish_reason, usage):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(choices, usage=None):
+            body = {"id": completion_id, "object": "chat.completion.chunk",
+                    "created": int(time.time()), "model": model, "choices": choices}
+            if usage is not None:
+                body["usage"] = usage
+            self.wfile.write(b"data: " + json.dumps(body).encode("utf-8") + b"\n\n")
+            self.wfile.flush()
+
+        # One chunk per token-sized piece, paced at --tokens-per-second
+        delay = 1 / self.state.args.tokens_per_second if self.state.args.tokens_per_second else 0
+        event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        for i in range(0, len(content), CHARS_PER_TOKEN):
+            event([{"index": 0, "delta": {"content": content[i:i + CHARS_PER_TOKEN]},
+                    "finish_reason": None}])
+            if delay:
+                time.sleep(delay)
+        event([{"index": 0, "delta": {}, "finish_reason": finish_reason}])
+        if usage is not None:
+            event([], usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def serve(args):
+    recordings = {}
+    if args.replay:
+        with open(args.replay) as f:
+            recordings = json.load(f)
+    state = MockState(args, recordings)
+    handler = type("MockHandler", (Handler,), {"state": state})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    server.daemon_threads = True
+    server.request_queue_size = 1024  # hundreds of concurrent clients during load tests
+    print(f"Mock OpenAI server on http://{args.host}:{server.server_port}/v1 "
+          f"({len(recordings)} recorded responses)", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("Served: " + ", ".join(f"{k}={v}" for k, v in sorted(state.stats.items())))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible chat completions server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--replay", metavar="PATH",
+                        help="recorded responses to serve (see bench_pipeline.py --record)")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="time before the response starts (median for lognormal)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--distribution", choices=("fixed", "uniform", "normal", "lognormal"),
+                        default="fixed")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="pace streamed responses (default: as fast as possible)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that get a 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0,
+                        help="fraction of requests that get a 429")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute before 429s (0: unlimited)")
+    parser.add_argument("--batch-seconds", type=float, default=0.0,
+                        help="how long a Batch API batch stays in_progress before it is answered")
+    parser.add_argument("--seed", type=int, default=None, help="seed for latency and failure injection")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    serve(parse_args())
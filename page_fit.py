@@ -0,0 +1,259 @@
+"""
+One-page fit check for the tailored resume.
+
+fit_to_page() typesets the rendered resume with a draft compile (pdflatex -draftmode:
+full typesetting, no PDF written) and reads the page count and overflow from the log.
+A probe added before \\begin{document} prints the page number and how full the last
+page is, and the log's "Overfull \\hbox" warnings are counted. When the resume spills
+onto another page, the lowest-value bullets are dropped locally. Each bullet's height
+is estimated from its length, and enough bullets go to cover the overflow. Then the
+document is re-rendered and checked again. This repeats for at most MAX_PASSES
+draft compiles and needs no LLM calls.
+
+Bullet value comes from the job description's ATS keywords (ats_score.py). A bullet
+that is the only place a keyword appears is worth that keyword's weight, and every
+keyword it mentions adds a little more. Without a job description or numpy, bullets
+are dropped from the end: the oldest entry's last bullet first.
+
+    python page_fit.py resume/acme/Manith_Luthria_Resume_acme.tex
+"""
+import math
+import os
+import re
+import shutil
+import sys
+
+import tracing
+from compile_pool import compile_tex, make_scratch_dir
+
+MAX_PAGES = 1
+MAX_PASSES = 4
+MIN_BULLETS = 1  # bullets every experience / project keeps
+TRIMMED_SECTIONS = (("experience", "achievements"), ("projects", "details"))
+
+# Rough geometry of a bullet in resume_template.tex, for turning overflow into bullets
+CHARS_PER_LINE = 105
+LINE_PT = 12.0
+BULLET_GAP_PT = 2.0
+
+PROBE = ("\\AtEndDocument{\\par\\typeout{PAGEFIT page=\\arabic{page} "
+         "total=\\the\\pagetotal\\space goal=\\the\\pagegoal}}\n")
+_PROBE_LINE = re.compile(r"PAGEFIT page=(\d+) total=([\d.]+)pt goal=([\d.]+)pt")
+_OUTPUT_WRITTEN = re.compile(r"Output written on .*?\((\d+) pages?")
+_OVERFULL = re.compile(r"^Overfull \\[hv]box \(([\d.]+)pt too (?:wide|high)", re.M)
+EMPTY_PAGE_GOAL = 16383.0  # \pagegoal is \maxdimen until something is on the page
+
+
+class PageReport:
+    def __init__(self, pages, overflow_pt, overfull_boxes, worst_overfull_pt):
+        self.pages = pages
+        self.overflow_pt = overflow_pt  # height spilling past the last allowed page
+        self.overfull_boxes = overfull_boxes
+        self.worst_overfull_pt = worst_overfull_pt
+
+
+class FitResult:
+    def __init__(self, resume, latex, report, removed, passes):
+        self.resume = resume
+        self.latex = latex
+        self.report = report  # PageReport of the final document, None if it could not be checked
+        self.removed = removed  # (section, entry index, bullet text), in the order dropped
+        self.passes = passes
+
+
+def add_probe(latex):
+    """The document with the page probe inserted before \\begin{document}."""
+    start = latex.find("\\begin{document}")
+    if start == -1:
+        return latex
+    return latex[:start] + PROBE + latex[start:]
+
+
+def parse_log(log, max_pages=MAX_PAGES):
+    """PageReport from a pdflatex log, or None if the log says nothing about pages."""
+    overfull = [float(pt) for pt in _OVERFULL.findall(log)]
+    pages = overflow = None
+    probe = _PROBE_LINE.search(log)
+    if probe:
+        page, total, goal = int(probe.group(1)), float(probe.group(2)), float(probe.group(3))
+        empty = goal >= EMPTY_PAGE_GOAL or total == 0
+        pages = page - 1 if empty and page > 1 else page
+        # Full pages past the limit count at the last page's goal height
+        overflow = max(0, pages - max_pages - 1) * (0 if empty else goal) + (0 if empty else total)
+    written = _OUTPUT_WRITTEN.search(log)
+    if written:
+        pages = int(written.group(1))
+    if pages is None:
+        return None
+    if pages <= max_pages:
+        overflow = 0.0
+    elif not overflow:
+        overflow = LINE_PT  # no probe: assume a line over and let the next pass tell
+    return PageReport(pages, overflow, len(overfull), max(overfull, default=0.0))
+
+
+def check_pages(latex, base_name, pool=None, max_pages=MAX_PAGES):
+    """Draft-compile latex in a scratch directory and return its PageReport."""
+    scratch = make_scratch_dir("pagefit-")
+    try:
+        tex_path = os.path.join(scratch, base_name + ".tex")
+        with open(tex_path, "w") as f:
+            f.write(add_probe(latex))
+        with tracing.span("draft_compile"):
+            result = pool.compile(tex_path, draft=True) if pool else compile_tex(tex_path, draft=True)
+        if not result.ok or result.log is None:
+            return None
+        return parse_log(result.log, max_pages)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def bullet_height(text):
+    return math.ceil(max(1, len(text)) / CHARS_PER_LINE) * LINE_PT + BULLET_GAP_PT
+
+
+def _keyword_scorer(job_desc, ignore=()):
+    """
+    Return f(text) -> {keyword: weight} for the job's ATS keywords, leaving out the
+    words of `ignore` (e.g. the company name), or None without numpy.
+    """
+    if not job_desc:
+        return None
+    try:
+        from ats_score import AtsScorer, terms
+    except ImportError:
+        return None
+    scorer = AtsScorer(job_desc, ignore=ignore)
+    weights = dict(zip(scorer.keywords, (float(w) for w in scorer.weights)))
+    return lambda text: {t: weights[t] for t in terms(text) if t in weights}
+
+
+def rank_bullets(resume, job_desc=None, ignore=()):
+    """
+    Every experience / project bullet, lowest value first, as (section, entry index,
+    bullet index). Keywords in `ignore` don't count toward a bullet's value.
+    """
+    keywords_of = _keyword_scorer(job_desc, ignore)
+    bullets = []
+    for section, field in TRIMMED_SECTIONS:
+        for i, entry in enumerate(resume.get(section) or []):
+            for j, text in enumerate(entry.get(field) or []):
+                bullets.append((section, i, j, text))
+
+    counts = {}
+    found = []
+    if keywords_of is not None:
+        # Keywords elsewhere in the resume (summary, skills) are covered no matter what
+        other = [resume.get("summary") or ""] + [
+            " ".join(v) if isinstance(v, list) else str(v) for v in (resume.get("skills") or {}).values()
+        ]
+        for text in other:
+            for term in keywords_of(text):
+                counts[term] = counts.get(term, 0) + 1
+        for _, _, _, text in bullets:
+            kws = keywords_of(text)
+            found.append(kws)
+            for term in kws:
+                counts[term] = counts.get(term, 0) + 1
+
+    ranked = []
+    for n, (section, i, j, text) in enumerate(bullets):
+        value = 0.0
+        if keywords_of is not None:
+            kws = found[n]
+            value = sum(w for t, w in kws.items() if counts[t] == 1) + 0.1 * sum(kws.values())
+        # Ties go to position: later entries are older, later bullets less important
+        ranked.append((value, -i, -j, section, i, j))
+    ranked.sort()
+    return [(section, i, j) for _, _, _, section, i, j in ranked]
+
+
+def trim(resume, overflow_pt, job_desc=None, ignore=()):
+    """
+    Copy of resume without the lowest-value bullets whose estimated height covers
+    overflow_pt. Returns (resume, removed); removed is empty when nothing can go.
+    """
+    fields = dict(TRIMMED_SECTIONS)
+    remaining = {}
+    for section, field in TRIMMED_SECTIONS:
+        for i, entry in enumerate(resume.get(section) or []):
+            remaining[section, i] = len(entry.get(field) or [])
+
+    drop, freed = [], 0.0
+    for section, i, j in rank_bullets(resume, job_desc, ignore):
+        if freed >= overflow_pt:
+            break
+        if remaining[section, i] <= MIN_BULLETS:
+            continue
+        remaining[section, i] -= 1
+        text = resume[section][i][fields[section]][j]
+        drop.append((section, i, j, text))
+        freed += bullet_height(text)
+
+    dropped = {(section, i, j) for section, i, j, _ in drop}
+    trimmed = dict(resume)
+    for section, field in TRIMMED_SECTIONS:
+        if section in resume:
+            trimmed[section] = [
+                dict(entry, **{field: [b for j, b in enumerate(entry.get(field) or [])
+                                       if (section, i, j) not in dropped]})
+                for i, entry in enumerate(resume[section])
+            ]
+    return trimmed, [(section, i, text) for section, i, _, text in drop]
+
+
+def fit_to_page(resume, latex, render, base_name, pool=None, job_desc=None, ignore=(),
+                max_pages=MAX_PAGES, max_passes=MAX_PASSES):
+    """
+    Make the resume fit on max_pages. latex is the document already rendered from
+    resume; render(resume) renders a trimmed copy. Draft compiles run in scratch
+    directories (see compile_pool.scratch_root). Returns a FitResult; when pdflatex is
+    unavailable the document comes back unchanged with report None. Bullets are
+    ranked by the job_desc keywords they carry, minus those in `ignore`.
+    """
+    removed = []
+    for passes in range(1, max_passes + 1):
+        report = check_pages(latex, base_name, pool, max_pages)
+        if report is None or report.pages <= max_pages or passes == max_passes:
+            break
+        resume, dropped = trim(resume, report.overflow_pt, job_desc, ignore)
+        if not dropped:
+            break
+        removed += dropped
+        print(f"Resume runs to {report.pages} pages ({report.overflow_pt:.0f}pt over); "
+              f"dropping {len(dropped)} bullet{'s' if len(dropped) != 1 else ''}")
+        with tracing.span("render", stage="page_fit"):
+            latex = render(resume)
+    return FitResult(resume, latex, report, removed, passes)
+
+
+def format_fit(result, max_pages=MAX_PAGES):
+    report = result.report
+    if report is None:
+        return "Page fit: not checked (draft compile failed or pdflatex is missing)"
+    status = "fits" if report.pages <= max_pages else "DOES NOT FIT"
+    line = (f"Page fit: {report.pages} page{'s' if report.pages != 1 else ''}, {status} "
+            f"after {result.passes} draft pass{'es' if result.passes != 1 else ''}")
+    if result.removed:
+        line += f", {len(result.removed)} bullet{'s' if len(result.removed) != 1 else ''} dropped"
+    if report.overfull_boxes:
+        line += f" ({report.overfull_boxes} overfull boxes, worst {report.worst_overfull_pt:.1f}pt)"
+    return line
+
+
+def main():
+    args = sys.argv[1:]
+    if len(args) != 1:
+        print("Usage: python page_fit.py <file.tex>")
+        sys.exit(1)
+    tex_path = args[0]
+    with open(tex_path) as f:
+        latex = f.read()
+    base_name = os.path.splitext(os.path.basename(tex_path))[0]
+    report = check_pages(latex, base_name)
+    print(format_fit(FitResult(None, latex, report, [], 1)))
+    sys.exit(0 if report is not None and report.pages <= MAX_PAGES else 1)
+
+
+if __name__ == "__main__":
+    main()
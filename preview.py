@@ -0,0 +1,293 @@
+"""
+TeX-free preview of a resume, for iterating on resume.json where pdflatex is slow or
+not installed (CI and preview containers).
+
+The sections of resume_template.tex (heading, summary, experience, projects,
+education, skills) are laid out in pure Python and written as a small PDF in a few
+milliseconds. It is an approximation for checking content and length, not the final
+document. Text is set in the PDF base fonts (Helvetica, so nothing is embedded) and
+wrapped with their metrics, and the spacing only roughly follows the template.
+Final output still comes from pdflatex.
+
+    python preview.py resume.json [out.pdf]
+    python resume_builder.py resume.json --preview
+"""
+import json
+import os
+import re
+import sys
+import zlib
+
+from latex_template import split_bullets
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792  # US letter, in points
+MARGIN_X = 36
+MARGIN_TOP = 36
+MARGIN_BOTTOM = 36
+TEXT_RIGHT = PAGE_WIDTH - MARGIN_X
+
+NAME_SIZE = 17  # \Large
+SECTION_SIZE = 12  # \large
+NORMAL_SIZE = 11
+SMALL_SIZE = 10  # \small
+BULLET_INDENT = 14
+BULLET_TEXT = 26
+
+# Advance widths (1/1000 em) of the printable ASCII characters, from the base-14 AFMs
+_HELVETICA = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+_HELVETICA_BOLD = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+)
+# Punctuation outside ASCII that resumes use, by WinAnsi code: bullet, dashes, quotes
+_EXTRA = {149: (350, 350), 150: (556, 556), 151: (1000, 1000),
+          145: (222, 278), 146: (222, 278), 147: (333, 500), 148: (333, 500)}
+
+
+def _width_table(ascii_widths, column):
+    table = [556] * 256  # anything else: about an average letter
+    table[32:127] = ascii_widths
+    for code, widths in _EXTRA.items():
+        table[code] = widths[column]
+    return table
+
+
+# style -> (resource name, base font, widths by WinAnsi code)
+FONTS = {
+    "regular": ("F1", "Helvetica", _width_table(_HELVETICA, 0)),
+    "bold": ("F2", "Helvetica-Bold", _width_table(_HELVETICA_BOLD, 1)),
+    "italic": ("F3", "Helvetica-Oblique", _width_table(_HELVETICA, 0)),
+}
+
+
+def encode(text):
+    """text as WinAnsi bytes; characters the base fonts lack become '?'."""
+    return text.encode("cp1252", errors="replace")
+
+
+def text_width(text, style, size):
+    widths = FONTS[style][2]
+    return sum(widths[b] for b in encode(text)) * size / 1000
+
+
+def wrap(runs, width, size):
+    """
+    Break (style, text) runs into lines no wider than width, at spaces. Returns a list
+    of lines, each a list of (style, text) runs.
+    """
+    lines, line, line_width = [], [], 0.0
+    for style, text in runs:
+        for token in re.findall(r"\S+|\s+", text):
+            if token.isspace():
+                if not line:
+                    continue
+                token = " "
+            token_width = text_width(token, style, size)
+            if token != " " and line and line_width + token_width > width:
+                lines.append(_merge(line))
+                line, line_width = [], 0.0
+            line.append((style, token))
+            line_width += token_width
+    if line:
+        lines.append(_merge(line))
+    return lines
+
+
+def _merge(tokens):
+    while tokens and tokens[-1][1] == " ":
+        tokens.pop()
+    runs = []
+    for style, text in tokens:
+        if runs and runs[-1][0] == style:
+            runs[-1] = (style, runs[-1][1] + text)
+        else:
+            runs.append((style, text))
+    return runs
+
+
+def _pdf_string(text):
+    raw = encode(text).decode("latin-1")
+    return "(" + raw.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+class Layout:
+    """Top-to-bottom layout of lines onto pages, as PDF content stream operators."""
+
+    def __init__(self):
+        self.pages = []
+        self.new_page()
+
+    def new_page(self):
+        self.ops = []
+        self.pages.append(self.ops)
+        self.y = PAGE_HEIGHT - MARGIN_TOP
+
+    def advance(self, height):
+        """Move down one line of the given height and return its baseline."""
+        if self.y - height < MARGIN_BOTTOM:
+            self.new_page()
+        self.y -= height
+        return self.y
+
+    def gap(self, height):
+        self.y -= height
+
+    def runs(self, x, y, runs, size):
+        ops = ["BT", f"{x:.2f} {y:.2f} Td"]
+        for style, text in runs:
+            ops.append(f"/{FONTS[style][0]} {size} Tf {_pdf_string(text)} Tj")
+        ops.append("ET")
+        self.ops.append(" ".join(ops))
+
+    def row(self, left, right, size, height, right_size=None):
+        """One line with runs flush left and flush right, like the template's tabular* rows."""
+        y = self.advance(height)
+        self.runs(MARGIN_X, y, left, size)
+        if right:
+            right_size = right_size or size
+            width = sum(text_width(text, style, right_size) for style, text in right)
+            self.runs(TEXT_RIGHT - width, y, right, right_size)
+
+    def paragraph(self, runs, x, size, leading):
+        for line in wrap(runs, TEXT_RIGHT - x, size):
+            self.runs(x, self.advance(leading), line, size)
+
+    def rule(self, gap=3):
+        self.y -= gap
+        self.ops.append(f"0.5 w {MARGIN_X} {self.y:.2f} m {TEXT_RIGHT} {self.y:.2f} l S")
+
+
+def _section(layout, title):
+    layout.gap(8)
+    layout.row([("regular", title.upper())], None, SECTION_SIZE, SECTION_SIZE + 4)
+    layout.rule()
+
+
+def _subheading(layout, title, right, subtitle, date):
+    layout.gap(3)
+    layout.row([("bold", title)], [("regular", right)] if right else None, NORMAL_SIZE, NORMAL_SIZE + 3)
+    layout.row([("italic", subtitle)], [("italic", date)] if date else None, SMALL_SIZE, SMALL_SIZE + 3)
+
+
+def _bullets(layout, items):
+    for key, sep, description in split_bullets(items):
+        runs = [("bold", key), ("regular", sep + description)] if sep else [("regular", key)]
+        lines = wrap(runs, TEXT_RIGHT - MARGIN_X - BULLET_TEXT, SMALL_SIZE)
+        for i, line in enumerate(lines):
+            y = layout.advance(SMALL_SIZE + 2)
+            if i == 0:
+                layout.runs(MARGIN_X + BULLET_INDENT, y, [("regular", "•")], SMALL_SIZE)
+            layout.runs(MARGIN_X + BULLET_TEXT, y, line, SMALL_SIZE)
+    layout.gap(2)
+
+
+def layout_resume(resume):
+    """Lay the resume out the way resume_template.tex does; returns the Layout."""
+    layout = Layout()
+    contact = resume.get("contact") or {}
+    layout.row([("bold", resume.get("name", ""))],
+               [("regular", "Email : " + contact.get("email", ""))], NAME_SIZE, NAME_SIZE, NORMAL_SIZE)
+    layout.row([("regular", contact.get("linkedin", ""))],
+               [("regular", "Mobile : " + contact.get("phone", ""))], NORMAL_SIZE, NORMAL_SIZE + 3)
+
+    if resume.get("summary"):
+        _section(layout, "Summary")
+        layout.gap(2)
+        layout.paragraph([("regular", resume["summary"])], MARGIN_X, NORMAL_SIZE, NORMAL_SIZE + 2)
+
+    if resume.get("experience"):
+        _section(layout, "Experience")
+        for exp in resume["experience"]:
+            _subheading(layout, exp.get("company", ""), exp.get("location", ""),
+                        exp.get("title", ""), exp.get("date", ""))
+            _bullets(layout, exp.get("achievements") or [])
+
+    if resume.get("projects"):
+        _section(layout, "Projects")
+        for proj in resume["projects"]:
+            _subheading(layout, proj.get("name", ""), "", proj.get("subtitle", ""), "")
+            _bullets(layout, proj.get("details") or [])
+
+    if resume.get("education"):
+        _section(layout, "Education")
+        for edu in resume["education"]:
+            _subheading(layout, edu.get("school", ""), edu.get("location", ""),
+                        f"{edu.get('degree', '')};  GPA: {edu.get('gpa', '')}", edu.get("year", ""))
+
+    skills = resume.get("skills")
+    if skills:
+        _section(layout, "Skills")
+        for label, key in (("Languages", "languages"), ("Tools and Technologies", "tools_and_technologies")):
+            layout.gap(2)
+            layout.paragraph([("bold", label), ("regular", ": " + ", ".join(skills.get(key) or []))],
+                             MARGIN_X + BULLET_INDENT, NORMAL_SIZE, NORMAL_SIZE + 2)
+    return layout
+
+
+def pdf_bytes(pages):
+    """A minimal PDF 1.4 file with one page per list of content stream operators."""
+    objects = [None, None]  # catalog and page tree, filled in below
+    fonts = []
+    for name, base, _ in FONTS.values():
+        objects.append(f"<< /Type /Font /Subtype /Type1 /BaseFont /{base} /Encoding /WinAnsiEncoding >>"
+                       .encode("ascii"))
+        fonts.append(f"/{name} {len(objects)} 0 R")
+    resources = "<< /Font << " + " ".join(fonts) + " >> >>"
+
+    kids = []
+    for ops in pages:
+        data = zlib.compress("\n".join(ops).encode("latin-1"))
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(data) + data + b"\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                       f"/Resources {resources} /Contents {len(objects)} 0 R >>".encode("ascii"))
+        kids.append(f"{len(objects)} 0 R")
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode("ascii")
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def write_preview(resume, pdf_path):
+    """Write the preview PDF of resume to pdf_path; returns the number of pages."""
+    layout = layout_resume(resume)
+    tmp_path = pdf_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(pdf_bytes(layout.pages))
+    os.replace(tmp_path, pdf_path)
+    return len(layout.pages)
+
+
+def main():
+    args = sys.argv[1:]
+    if len(args) not in (1, 2):
+        print("Usage: python preview.py <input_json_file> [output.pdf]")
+        sys.exit(1)
+    with open(args[0]) as f:
+        resume = json.load(f)
+    pdf_path = args[1] if len(args) == 2 else os.path.splitext(args[0])[0] + "_preview.pdf"
+    pages = write_preview(resume, pdf_path)
+    print(f"Preview written to {pdf_path} ({pages} page{'s' if pages != 1 else ''})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,350 +1,122 @@
 import json
-import subprocess
 import os
 import sys
-
-# Get input file from command line argument
-if len(sys.argv) != 2:
-    print("Usage: python resume_builder.py <input_json_file>")
-    print("Example: python resume_builder.py my_resume.json")
-    sys.exit(1)
-
-input_file = sys.argv[1]
-
-# Check if input file exists
-if not os.path.exists(input_file):
-    print(f"Error: File '{input_file}' not found.")
-    sys.exit(1)
-
-# Get base name without extension for output files
-base_name = os.path.splitext(input_file)[0]
-
-# Create output directory on desktop
-resume_path = os.path.expanduser("./resume")
-output_dir = os.path.join(resume_path, base_name)
-
-# Create the directory if it doesn't exist
-if not os.path.exists(output_dir):
-    os.makedirs(output_dir)
-    print(f"Created output directory: {output_dir}")
-
-# Load JSON resume
-with open(input_file, "r") as f:
-    resume = json.load(f)
-
-
-def clean_latex(obj):
-    """
-    Recursively escape only & and % characters in string fields for LaTeX.
-    """
-    if isinstance(obj, dict):
-        return {k: clean_latex(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [clean_latex(item) for item in obj]
-    elif isinstance(obj, str):
-        # Only escape & and % characters
-        return obj.replace("&", "\\&").replace("%", "\\%")
+import tracing
+from build_manifest import BuildManifest, digest, file_digest
+from compile_pool import CompilePool, print_result
+from resume_latex import build_resume_latex, builder_fingerprint
+
+
+def prepare_output_dir(input_file):
+    """Return (base name, ./resume/<base name>) for input_file, creating the directory."""
+    # Get base name without extension for output files
+    base_name = os.path.splitext(input_file)[0]
+
+    # Create output directory on desktop
+    resume_path = os.path.expanduser("./resume")
+    output_dir = os.path.join(resume_path, base_name)
+
+    # Create the directory if it doesn't exist
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+        print(f"Created output directory: {output_dir}")
+    return base_name, output_dir
+
+
+def build_preview(input_file):
+    """Write the TeX-free preview of input_file to ./resume/<name>/<name>_preview.pdf."""
+    import preview  # imported here: only --preview needs it
+    base_name, output_dir = prepare_output_dir(input_file)
+    with tracing.span("read_json"):
+        with open(input_file, "r") as f:
+            resume = json.load(f)
+    pdf_file_path = os.path.join(output_dir, base_name + "_preview.pdf")
+    with tracing.span("preview"):
+        pages = preview.write_preview(resume, pdf_file_path)
+    print(f"Preview generated ({pages} page{'s' if pages != 1 else ''}, approximate layout)")
+    print("Output file: " + pdf_file_path)
+    return True
+
+
+def build(input_file, force=False):
+    """Render input_file (a resume JSON) to ./resume/<name>/<name>.tex and compile it."""
+    base_name, output_dir = prepare_output_dir(input_file)
+
+    # Load JSON resume
+    with tracing.span("read_json"):
+        with open(input_file, "r") as f:
+            resume_text = f.read()
+
+    manifest = BuildManifest(output_dir)
+    tex_file_path = os.path.join(output_dir, base_name + ".tex")
+    pdf_file_path = os.path.join(output_dir, base_name + ".pdf")
+
+    # Skip regenerating the .tex when neither the JSON nor the builder changed
+    tex_inputs = digest(resume_text, builder_fingerprint())
+    if not force and manifest.is_fresh("resume_tex", tex_inputs, tex_file_path):
+        print("LaTeX file is up to date, skipping generation")
     else:
-        return obj
-
-
-resume = clean_latex(resume)
-
-# Create LaTeX content based on the template
-latex_content = (
-    """%-------------------------
-% Resume in Latex
-% Generated from JSON data
-%------------------------
-
-\\documentclass[letterpaper,11pt]{article}
-
-\\usepackage{latexsym}
-\\usepackage[empty]{fullpage}
-\\usepackage{titlesec}
-\\usepackage{marvosym}
-\\usepackage[usenames,dvipsnames]{color}
-\\usepackage{verbatim}
-\\usepackage{enumitem}
-\\usepackage[pdftex]{hyperref}
-\\usepackage{fancyhdr}
-
-\\pagestyle{fancy}
-\\fancyhf{} % clear all header and footer fields
-\\fancyfoot{}
-\\renewcommand{\\headrulewidth}{0pt}
-\\renewcommand{\\footrulewidth}{0pt}
-
-% Adjust margins
-\\addtolength{\\oddsidemargin}{-0.375in}
-\\addtolength{\\evensidemargin}{-0.375in}
-\\addtolength{\\textwidth}{1in}
-\\addtolength{\\topmargin}{-.5in}
-\\addtolength{\\textheight}{1.0in}
-
-\\urlstyle{same}
-
-\\raggedbottom
-\\raggedright
-\\setlength{\\tabcolsep}{0in}
-
-% Sections formatting
-\\titleformat{\\section}{
-  \\vspace{-4pt}\\scshape\\raggedright\\large
-}{}{0em}{}[\\color{black}\\titlerule \\vspace{-5pt}]
-
-%-------------------------
-% Custom commands
-\\newcommand{\\resumeItem}[2]{
-  \\item\\small{
-    \\textbf{#1}{: #2 \\vspace{-2pt}}
-  }
-}
-
-\\newcommand{\\resumeSubheading}[4]{
-  \\vspace{-1pt}\\item
-    \\begin{tabular*}{0.97\\textwidth}{l@{\\extracolsep{\\fill}}r}
-      \\textbf{#1} & #2 \\\\
-      \\textit{\\small#3} & \\textit{\\small #4} \\\\
-    \\end{tabular*}\\vspace{-5pt}
-}
-
-\\newcommand{\\resumeSubItem}[2]{\\resumeItem{#1}{#2}\\vspace{-4pt}}
-
-\\renewcommand{\\labelitemii}{$\\circ$}
-
-\\newcommand{\\resumeSubHeadingListStart}{\\begin{itemize}[leftmargin=*]}
-\\newcommand{\\resumeSubHeadingListEnd}{\\end{itemize}}
-\\newcommand{\\resumeItemListStart}{\\begin{itemize}}
-\\newcommand{\\resumeItemListEnd}{\\end{itemize}\\vspace{-5pt}}
-
-%-------------------------------------------
-%%%%%%  CV STARTS HERE  %%%%%%%%%%%%%%%%%%%%%%%%%%%%
-
-\\begin{document}
-
-%----------HEADING-----------------
-\\begin{tabular*}{\\textwidth}{l@{\\extracolsep{\\fill}}r}
-  \\textbf{\\Large """
-    + resume["name"]
-    + """} & Email : \\href{mailto:"""
-    + resume["contact"]["email"]
-    + """}{"""
-    + resume["contact"]["email"]
-    + """}\\\\
-  \\href{"""
-    + resume["contact"]["linkedin"]
-    + """}{"""
-    + resume["contact"]["linkedin"]
-    + """} & Mobile : """
-    + resume["contact"]["phone"]
-    + """ \\\\
-\\end{tabular*}
-
-%-----------SUMMART-----------------
-\\section{Summary}
-
-"""
-    + resume["summary"]
-    + """
-
-%-----------EXPERIENCE-----------------
-\\section{Experience}
-  \\resumeSubHeadingListStart
-"""
-)
-
-# Add experience entries
-for exp in resume["experience"]:
-    latex_content += (
-        """
-    \\resumeSubheading
-      {"""
-        + exp["company"]
-        + """}{"""
-        + exp["location"]
-        + """}
-      {"""
-        + exp["title"]
-        + """}{"""
-        + exp["date"]
-        + """}
-      \\resumeItemListStart
-"""
-    )
-    for ach in exp["achievements"]:
-        # Split achievement into key and description if possible
-        if ": " in ach:
-            parts = ach.split(": ", 1)
-            key = parts[0]
-            description = parts[1]
-            latex_content += (
-                """        \\resumeItem{"""
-                + key
-                + """}
-          {"""
-                + description
-                + """}
-"""
-            )
-        else:
-            # If no colon, use the whole achievement as description
-            latex_content += (
-                """        \\item\\small{"""
-                + ach
-                + """ \\vspace{-2pt}}
-"""
-            )
-    latex_content += """      \\resumeItemListEnd
-"""
-
-latex_content += """  \\resumeSubHeadingListEnd
-
-%-----------PROJECTS-----------------
-\\section{Projects}
-  \\resumeSubHeadingListStart
-"""
-
-# Add experience entries
-for proj in resume["projects"]:
-    latex_content += (
-        """
-    \\resumeSubheading
-      {"""
-        + proj["name"]
-        + """}{}
-      {"""
-        + proj["subtitle"]
-        + """}{}
-      \\resumeItemListStart
-"""
-    )
-    for detail in proj["details"]:
-        # Split achievement into key and description if possible
-        if ": " in detail:
-            parts = detail.split(": ", 1)
-            key = parts[0]
-            description = parts[1]
-            latex_content += (
-                """        \\resumeItem{"""
-                + key
-                + """}
-          {"""
-                + description
-                + """}
-"""
-            )
-        else:
-            # If no colon, use the whole achievement as description
-            latex_content += (
-                """        \\item\\small{"""
-                + detail
-                + """ \\vspace{-2pt}}
-"""
-            )
-    latex_content += """      \\resumeItemListEnd
-"""
-
-latex_content += """  \\resumeSubHeadingListEnd
-
-%-----------EDUCATION-----------------
-\\section{Education}
-  \\resumeSubHeadingListStart
-"""
-
-# Add education entries
-for edu in resume["education"]:
-    latex_content += (
-        """    \\resumeSubheading
-      {"""
-        + edu["school"]
-        + """}{"""
-        + edu["location"]
-        + """}
-      {"""
-        + edu["degree"]
-        + """;  GPA: """
-        + edu["gpa"]
-        + """}{"""
-        + edu["year"]
-        + """}
-"""
-    )
-
-latex_content += (
-    """  \\resumeSubHeadingListEnd
-
-%--------PROGRAMMING SKILLS------------
-\\section{Skills}
- \\resumeSubHeadingListStart
-   \\item{
-     \\textbf{Languages}{: """
-    + ", ".join(resume["skills"]["languages"])
-    + """}
-   }
-   \\item{
-     \\textbf{Tools and Technologies}{: """
-    + ", ".join(resume["skills"]["tools_and_technologies"])
-    + """}
-   }
- \\resumeSubHeadingListEnd
-
-%-------------------------------------------
-\\end{document}
-"""
-)
-
-# Save LaTeX file
-tex_file_path = os.path.join(output_dir, base_name + ".tex")
-with open(tex_file_path, "w") as f:
-    f.write(latex_content)
-
-print("LaTeX file generated successfully!")
-
-# Compile LaTeX to PDF
-print("Compiling LaTeX to PDF...")
-try:
-    # Run pdflatex to compile the document from the output directory
-    result = subprocess.run(
-        ["pdflatex", "-interaction=nonstopmode", base_name + ".tex"],
-        capture_output=True,
-        text=True,
-        cwd=output_dir,
-    )
-
-    if result.returncode == 0:
-        print("PDF generated successfully!")
-        pdf_file_path = os.path.join(output_dir, base_name + ".pdf")
+        with tracing.span("parse_json"):
+            resume = json.loads(resume_text)
+        with tracing.span("render", stage="resume_tex"):
+            latex_content = build_resume_latex(resume)
+
+        # Save LaTeX file
+        with tracing.span("write_tex", stage="resume_tex"):
+            with open(tex_file_path, "w") as f:
+                f.write(latex_content)
+                tracing.add("bytes_written", f.tell())
+        manifest.record("resume_tex", tex_inputs, tex_file_path)
+
+        print("LaTeX file generated successfully!")
+
+    # Skip pdflatex when the PDF was already built from this exact .tex
+    pdf_inputs = file_digest(tex_file_path)
+    ok = True
+    if not force and manifest.is_fresh("resume_pdf", pdf_inputs, pdf_file_path):
+        print("PDF is up to date, skipping compilation")
         print("Output file: " + pdf_file_path)
     else:
-        print("LaTeX compilation failed!")
-        print("Error output:")
-        print(result.stderr)
-
-except FileNotFoundError:
-    print(
-        "pdflatex not found. Please install a LaTeX distribution (like TeX Live or MiKTeX)"
-    )
-    print(
-        f"You can still compile manually by running: cd {output_dir} && pdflatex "
-        + base_name
-        + ".tex"
-    )
-except Exception as e:
-    print(f"Error during compilation: {e}")
-    print(
-        f"You can still compile manually by running: cd {output_dir} && pdflatex "
-        + base_name
-        + ".tex"
-    )
-
-# Delete all files in the output directory that are not .pdf, .tex, or .json files
-for filename in os.listdir(output_dir):
-    if not (filename.endswith('.pdf') or filename.endswith('.tex') or filename.endswith('.json')):
-        file_path = os.path.join(output_dir, filename)
-        try:
-            if os.path.isfile(file_path):
-                os.remove(file_path)
-                print(f"Deleted: {file_path}")
-        except Exception as e:
-            print(f"Error deleting {file_path}: {e}")
\ No newline at end of file
+        # Compile LaTeX to PDF
+        print("Compiling LaTeX to PDF...")
+        with CompilePool(workers=1) as pool:
+            ok = print_result(pool.compile(tex_file_path))
+            if ok:
+                manifest.record("resume_pdf", pdf_inputs, pdf_file_path)
+    return ok
+
+
+def main(argv=None):
+    # Get input file from command line argument
+    args = list(sys.argv[1:] if argv is None else argv)
+    force = "--force" in args
+    if force:
+        args.remove("--force")
+    use_preview = "--preview" in args
+    if use_preview:
+        args.remove("--preview")
+    profile_path = tracing.pop_profile_arg(args)
+    if profile_path:
+        tracing.enable(profile_path)
+    if len(args) != 1:
+        print("Usage: python resume_builder.py <input_json_file> [--force] [--preview] [--profile[=trace.json]]")
+        print("Example: python resume_builder.py my_resume.json")
+        print("--preview writes an approximate PDF without pdflatex (see preview.py)")
+        sys.exit(1)
+
+    input_file = args[0]
+
+    # Check if input file exists
+    if not os.path.exists(input_file):
+        print(f"Error: File '{input_file}' not found.")
+        sys.exit(1)
+
+    try:
+        ok = build_preview(input_file) if use_preview else build(input_file, force)
+    finally:
+        tracing.finish()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
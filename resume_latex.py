@@ -0,0 +1,59 @@
+"""
+LaTeX rendering for the resume and cover letter, shared by resume_builder.py and combo.py.
+
+The documents themselves live in resume_template.tex and cover_letter_template.tex and
+are rendered with the compiled template engine in latex_template.py. Both templates
+escape every inserted value with latex_escape.escape, so they take the resume and
+cover letter text exactly as loaded or generated.
+"""
+import functools
+import hashlib
+import os
+
+import latex_escape
+import latex_template
+from latex_escape import escape
+from latex_template import load_template
+
+TEMPLATE_DIR = os.path.dirname(os.path.abspath(__file__))
+RESUME_TEMPLATE = os.path.join(TEMPLATE_DIR, "resume_template.tex")
+COVER_TEMPLATE = os.path.join(TEMPLATE_DIR, "cover_letter_template.tex")
+
+
+def resume_template():
+    return load_template(RESUME_TEMPLATE, finalize=escape)
+
+
+def build_resume_latex(resume, prerendered=None):
+    """
+    Create LaTeX content for a resume dict of plain text; values are escaped as they are
+    inserted. Sections already rendered with render_resume_section can be passed in
+    `prerendered` to be reused as is.
+    """
+    return resume_template().render(resume, prerendered)
+
+
+def render_resume_section(name, resume):
+    """Render one template section (heading, summary, experience, ...) of the resume."""
+    return resume_template().render_section(name, resume)
+
+
+def build_cover_latex(resume, cover_letter_content):
+    """Create the cover letter LaTeX document around the generated text."""
+    return load_template(COVER_TEMPLATE, finalize=escape).render(
+        {"name": resume["name"], "contact": resume["contact"], "body": cover_letter_content}
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def builder_fingerprint():
+    """
+    Hash of the builder code, the template engine and both templates, i.e. of
+    everything that shapes the output.
+    """
+    h = hashlib.sha256()
+    for path in (__file__, latex_escape.__file__, latex_template.__file__, RESUME_TEMPLATE,
+                 COVER_TEMPLATE):
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
@@ -0,0 +1,179 @@
+"""
+Schema for the tailored resume JSON and a validator compiled from it.
+
+The schema is a small JSON Schema subset (type, required, properties, items,
+maxItems, minLength). compile_schema() turns it into nested closures once, so
+validating a response is just a walk over the data with no schema interpretation.
+Errors are reported per top-level section, which is what lets combo.py re-request
+only the part of the resume that came back wrong.
+"""
+
+MAX_ACHIEVEMENTS = 5
+
+_TEXT = {"type": "string"}
+_TEXT_LIST = {"type": "array", "items": _TEXT}
+
+RESUME_SCHEMA = {
+    "type": "object",
+    "required": ["name", "contact", "summary", "experience", "projects", "education", "skills"],
+    "properties": {
+        "name": {"type": "string", "minLength": 1},
+        "contact": {
+            "type": "object",
+            "required": ["email", "phone", "linkedin", "portfolio"],
+            "properties": {"email": _TEXT, "phone": _TEXT, "linkedin": _TEXT, "portfolio": _TEXT},
+        },
+        "summary": {"type": "string", "minLength": 1},
+        "experience": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["title", "company", "location", "date", "achievements"],
+                "properties": {
+                    "title": _TEXT,
+                    "company": _TEXT,
+                    "location": _TEXT,
+                    "date": _TEXT,
+                    "achievements": dict(_TEXT_LIST, maxItems=MAX_ACHIEVEMENTS),
+                },
+            },
+        },
+        "projects": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["name", "subtitle", "date", "details"],
+                "properties": {"name": _TEXT, "subtitle": _TEXT, "date": _TEXT, "details": _TEXT_LIST},
+            },
+        },
+        "education": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["degree", "school", "location", "year", "gpa", "relevant_coursework"],
+                "properties": {
+                    "degree": _TEXT,
+                    "school": _TEXT,
+                    "location": _TEXT,
+                    "year": _TEXT,
+                    "gpa": _TEXT,
+                    "relevant_coursework": _TEXT_LIST,
+                },
+            },
+        },
+        "skills": {
+            "type": "object",
+            "required": ["languages", "tools_and_technologies"],
+            "properties": {"languages": _TEXT_LIST, "tools_and_technologies": _TEXT_LIST},
+        },
+    },
+}
+
+_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+}
+
+
+def compile_schema(schema):
+    """
+    Build a validator for schema. The validator is called as check(value, path, errors)
+    and appends (path, message) tuples to errors.
+    """
+    expected = _TYPES[schema["type"]]
+    checks = []
+
+    if "minLength" in schema:
+        min_length = schema["minLength"]
+
+        def check_min_length(value, path, errors):
+            if len(value.strip()) < min_length:
+                errors.append((path, "must not be empty"))
+        checks.append(check_min_length)
+
+    if "maxItems" in schema:
+        max_items = schema["maxItems"]
+
+        def check_max_items(value, path, errors):
+            if len(value) > max_items:
+                errors.append((path, f"has {len(value)} items, at most {max_items} allowed"))
+        checks.append(check_max_items)
+
+    if "items" in schema:
+        check_item = compile_schema(schema["items"])
+
+        def check_items(value, path, errors):
+            for i, item in enumerate(value):
+                check_item(item, path + (i,), errors)
+        checks.append(check_items)
+
+    if "required" in schema or "properties" in schema:
+        required = tuple(schema.get("required", ()))
+        properties = tuple((k, compile_schema(s)) for k, s in schema.get("properties", {}).items())
+
+        def check_properties(value, path, errors):
+            for key in required:
+                if key not in value:
+                    errors.append((path + (key,), "is missing"))
+            for key, check_property in properties:
+                if key in value:
+                    check_property(value[key], path + (key,), errors)
+        checks.append(check_properties)
+
+    def check(value, path, errors):
+        if not isinstance(value, expected):
+            errors.append((path, f"should be of type {schema['type']}, got {type(value).__name__}"))
+            return
+        for sub_check in checks:
+            sub_check(value, path, errors)
+
+    return check
+
+
+_check_resume = compile_schema(RESUME_SCHEMA)
+
+
+def validate_resume(resume):
+    """Return a list of (path, message) errors; empty when the resume is valid."""
+    errors = []
+    _check_resume(resume, (), errors)
+    return errors
+
+
+def trim_to_schema(value, schema=RESUME_SCHEMA):
+    """
+    Copy of value with every list cut to its schema's maxItems (keeping the first
+    items), the one kind of error that can be fixed without asking the model again.
+    """
+    if schema["type"] == "array" and isinstance(value, list):
+        value = value[:schema.get("maxItems", len(value))]
+        if "items" in schema:
+            value = [trim_to_schema(item, schema["items"]) for item in value]
+        return value
+    if schema["type"] == "object" and isinstance(value, dict):
+        properties = schema.get("properties", {})
+        return {key: trim_to_schema(item, properties[key]) if key in properties else item
+                for key, item in value.items()}
+    return value
+
+
+def section_errors(section, value):
+    """Validation errors for one top-level section on its own."""
+    # The other sections are missing from this one-key resume; only this section's errors count
+    return errors_by_section(validate_resume({section: value})).get(section, [])
+
+
+def errors_by_section(errors):
+    """Group validation errors by the top-level resume key they belong to."""
+    sections = {}
+    for path, message in errors:
+        section = path[0] if path else None
+        sections.setdefault(section, []).append(format_error(path, message))
+    return sections
+
+
+def format_error(path, message):
+    where = "".join(f"[{p}]" if isinstance(p, int) else ("." if i else "") + p
+                    for i, p in enumerate(path))
+    return f"{where or 'resume'} {message}"
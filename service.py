@@ -0,0 +1,371 @@
+"""
+Resident tailoring service: combo.py's pipeline behind a local HTTP API.
+
+A combo.py run pays for interpreter start-up, importing openai/httpx, building a
+client, reading resume.json, compiling the templates and a cold pdflatex format
+before any real work happens. The service does all of that once and keeps it warm:
+one OpenAI client (and its connection pool), the parsed resume.json (re-read only
+when the file changes), the compiled templates, the precompiled preamble formats,
+the response cache and the pdflatex compile pool.
+
+    python service.py [--port 8400 | --socket /tmp/tailor.sock] [--base-url URL]
+
+    POST /tailor   {"company": "acme", "job_description": "<text>"}
+                   or {"company": ..., "job_description_path": "postings/acme.txt"}
+                   optional: "patch", "stream", "force", "speculative_cover", "page_fit",
+                   "progress" (JSON true/false) and "candidates" (a whole number)
+                   Returns {"ok", "seconds", "artifacts": {...}}. With "progress": true
+                   the response is NDJSON: {"event": "log", "line": ...} for every line
+                   the pipeline prints, then {"event": "done", ...}.
+                   A malformed request gets 400 before anything runs; a job that fails
+                   while running gets 500 (or an {"event": "error"} line). Jobs for the
+                   same company run one at a time, since they share its output directory.
+    GET  /health   uptime, job counts, cache and compile pool summaries
+
+    curl -s localhost:8400/tailor -d '{"company": "acme", "job_description_path": "job_description.txt"}'
+"""
+import argparse
+import contextlib
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import combo
+import latex_format
+from compile_pool import CompilePool
+from llm_cache import ResponseCache
+from resume_latex import build_cover_latex, build_resume_latex, resume_template
+from token_budget import count_tokens, token_summary
+
+DEFAULT_PORT = 8400
+DEFAULT_MAX_JOBS = 8
+# Boolean request options passed on to combo.tailor, with their defaults
+FLAGS = {"speculative_cover": False, "stream": False, "force": False, "patch": False, "page_fit": True}
+
+
+def _flag(job, name, default):
+    value = job.get(name, default)
+    if not isinstance(value, bool):
+        raise ValueError(f"'{name}' must be true or false")
+    return value
+
+
+class _RoutedStdout:
+    """
+    sys.stdout replacement that sends a thread's prints to its own sink when one is
+    set, so each request can stream the progress of its own pipeline. Lines printed
+    on the pipeline's helper threads (the cover letter request) go to the log.
+    """
+
+    def __init__(self, default):
+        self.default = default
+        self._local = threading.local()
+
+    def set_sink(self, sink):
+        self._local.sink = sink
+
+    def write(self, text):
+        sink = getattr(self._local, "sink", None)
+        return (sink or self.default).write(text)
+
+    def flush(self):
+        sink = getattr(self._local, "sink", None)
+        (sink or self.default).flush()
+
+    def __getattr__(self, name):
+        return getattr(self.default, name)
+
+
+class _ProgressSink:
+    """Turns printed lines into NDJSON log events on the response."""
+
+    def __init__(self, emit):
+        self.emit = emit
+        self._partial = ""
+
+    def write(self, text):
+        # Spinners and "\r" line rewrites are terminal decoration; keep whole lines only
+        self._partial += text.replace("\r", "\n")
+        *lines, self._partial = self._partial.split("\n")
+        for line in lines:
+            if line.strip():
+                self.emit({"event": "log", "line": line.strip()})
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class TailorService:
+    def __init__(self, resume_path="resume.json", base_url=None, compile_workers=None,
+                 max_jobs=DEFAULT_MAX_JOBS, use_cache=True):
+        self.started = time.time()
+        self.resume_path = resume_path
+        self.client = combo.create_client(base_url)
+        self.cache = ResponseCache(enabled=use_cache)
+        self.pool = CompilePool(compile_workers)
+        self.slots = threading.BoundedSemaphore(max_jobs)
+        self._resume = None
+        self._resume_stat = None
+        self._lock = threading.Lock()
+        self._company_locks = {}  # normcased company -> [lock, jobs holding or waiting]
+        self.completed = 0
+        self.failed = 0
+
+    def warm_up(self):
+        """Load everything a first request would otherwise pay for."""
+        start = time.perf_counter()
+        resume = self.resume()
+        resume_template()
+        count_tokens(json.dumps(resume), combo.MODEL)
+        formats = 0
+        for latex in (build_resume_latex(resume), build_cover_latex(resume, "")):
+            preamble = latex_format.split_preamble(latex)
+            if preamble is not None and latex_format.ensure_format(preamble):
+                formats += 1
+        print(f"Warmed up in {time.perf_counter() - start:.2f}s ({formats} preamble formats ready)")
+
+    def resume(self):
+        """The parsed resume.json, re-read only when the file changed."""
+        st = os.stat(self.resume_path)
+        key = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if key != self._resume_stat:
+                with open(self.resume_path) as f:
+                    self._resume = json.load(f)
+                self._resume_stat = key
+            return self._resume
+
+    def prepare(self, job):
+        """
+        Check a request dict and read its job description. Returns the arguments for
+        execute(); raises ValueError or OSError for a bad request.
+        """
+        company = job.get("company")
+        if not isinstance(company, str) or not company.strip():
+            raise ValueError("'company' must be a plain name")
+        company = company.strip()
+        if os.sep in company or company.startswith("."):
+            raise ValueError("'company' must be a plain name")
+        if "job_description" in job:
+            job_desc = job["job_description"]
+        elif "job_description_path" in job:
+            if not isinstance(job["job_description_path"], str):
+                raise ValueError("'job_description_path' must be a string")
+            with open(job["job_description_path"]) as f:
+                job_desc = f.read()
+        else:
+            raise ValueError("need 'job_description' or 'job_description_path'")
+        if not isinstance(job_desc, str) or not job_desc.strip():
+            raise ValueError("the job description is empty")
+        resume = job.get("resume")
+        if resume is not None and not isinstance(resume, dict):
+            raise ValueError("'resume' must be a JSON object")
+        options = {name: _flag(job, name, default) for name, default in FLAGS.items()}
+        _flag(job, "progress", False)
+        options["candidates"] = job.get("candidates", 1)
+        error = combo.check_candidates(options["candidates"], options["stream"], options["patch"])
+        if error:
+            raise ValueError(error)
+        return company, job_desc, resume, options
+
+    @contextlib.contextmanager
+    def company_lock(self, company):
+        """
+        Hold the lock of company's output directory, since jobs for the same company
+        share its files and build manifest. A lock is dropped once nobody holds or
+        waits for it, so the table only has entries for companies being built.
+        """
+        key = os.path.normcase(company)
+        with self._lock:
+            entry = self._company_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._company_locks[key]
+
+    def execute(self, company, job_desc, resume, options):
+        """Run one prepared tailoring job. Returns the response dict."""
+        start = time.perf_counter()
+        ok = False
+        try:
+            with self.company_lock(company), self.slots:
+                artifacts = combo.tailor(
+                    self.client, company, resume or self.resume(), job_desc, show_progress=False,
+                    cache=self.cache, pool=self.pool, **options
+                )
+            ok = artifacts["resume_pdf"] is not None and artifacts["cover_pdf"] is not None
+        finally:
+            with self._lock:
+                if ok:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+        artifacts = {name: path and os.path.abspath(path) for name, path in artifacts.items()}
+        return {"ok": ok, "seconds": round(time.perf_counter() - start, 3), "artifacts": artifacts}
+
+    def run(self, job):
+        """Run one tailoring job (a request dict). Returns the response dict."""
+        return self.execute(*self.prepare(job))
+
+    def health(self):
+        with self._lock:
+            completed, failed = self.completed, self.failed
+        return {
+            "status": "ok",
+            "uptime": round(time.time() - self.started, 1),
+            "jobs_completed": completed,
+            "jobs_failed": failed,
+            "compile_queue_depth": self.pool.queue_depth,
+            "cache": self.cache.summary(),
+            "compile_pool": self.pool.summary(),
+            "tokens": token_summary(),
+        }
+
+
+class Handler(BaseHTTPRequestHandler):
+    service = None  # TailorService, set by make_server()
+    stdout = None  # _RoutedStdout
+
+    def address_string(self):
+        # Unix socket peers have no address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def _json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/health":
+            self._json(200, self.service.health())
+        else:
+            self._json(404, {"error": f"unknown endpoint {self.path}"})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/tailor":
+            self._json(404, {"error": f"unknown endpoint {self.path}"})
+            return
+        try:
+            job = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        except ValueError:
+            self._json(400, {"error": "request body must be JSON"})
+            return
+        if not isinstance(job, dict):
+            self._json(400, {"error": "request body must be a JSON object"})
+            return
+        try:
+            prepared = self.service.prepare(job)
+        except (ValueError, OSError) as e:
+            self._json(400, {"error": str(e)})
+            return
+        if job.get("progress"):
+            self._run_streaming(prepared)
+            return
+        # Anything raised from here on is the pipeline's failure, not the request's
+        try:
+            self._json(200, self.service.execute(*prepared))
+        except Exception as e:
+            self._json(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def _run_streaming(self, prepared):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        lock = threading.Lock()
+
+        def emit(event):
+            with lock:
+                try:
+                    self.wfile.write(json.dumps(event).encode("utf-8") + b"\n")
+                    self.wfile.flush()
+                except OSError:
+                    pass  # client went away; the job still finishes
+
+        self.stdout.set_sink(_ProgressSink(emit))
+        try:
+            result = self.service.execute(*prepared)
+            emit(dict(result, event="done"))
+        except Exception as e:
+            emit({"event": "error", "error": f"{type(e).__name__}: {e}"})
+        finally:
+            self.stdout.set_sink(None)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)  # stale socket from an earlier run
+        socketserver.UnixStreamServer.server_bind(self)
+        self.server_name, self.server_port = "localhost", 0
+
+
+def make_server(service, host="127.0.0.1", port=DEFAULT_PORT, socket_path=None):
+    if not isinstance(sys.stdout, _RoutedStdout):
+        sys.stdout = _RoutedStdout(sys.stdout)
+    handler = type("TailorHandler", (Handler,), {"service": service, "stdout": sys.stdout})
+    if socket_path:
+        return UnixHTTPServer(socket_path, handler)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the tailoring pipeline as a local service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--resume", default="resume.json")
+    parser.add_argument("--base-url", metavar="URL",
+                        help="OpenAI-compatible API endpoint (default: $OPENAI_BASE_URL or OpenAI)")
+    parser.add_argument("--compile-workers", type=int, default=None,
+                        help="concurrent pdflatex processes (default: CPU count)")
+    parser.add_argument("--max-jobs", type=int, default=DEFAULT_MAX_JOBS,
+                        help=f"pipelines to run at once (default {DEFAULT_MAX_JOBS})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always call the API instead of reusing cached responses")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    service = TailorService(args.resume, args.base_url, args.compile_workers, args.max_jobs,
+                            use_cache=not args.no_cache)
+    service.warm_up()
+    server = make_server(service, args.host, args.port, args.socket)
+    where = args.socket or f"http://{args.host}:{server.server_port}"
+    print(f"Tailoring service listening on {where}", flush=True)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))  # clean shutdown under a supervisor
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.server_close()
+        service.pool.shutdown()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+        print(service.cache.summary())
+        print(service.pool.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Manifest loading in batch.py."""
+import os
+
+import pytest
+
+import batch
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_paths_are_relative_to_the_manifest(tmp_path):
+    path = write(tmp_path, "jobs.csv", "company,job_description\nacme,postings/acme.txt\n")
+    assert batch.load_manifest(path) == [
+        {"company": "acme", "job_description": os.path.join(str(tmp_path), "postings/acme.txt")}
+    ]
+
+
+def test_duplicate_company_is_rejected(tmp_path):
+    path = write(tmp_path, "jobs.jsonl", '{"company": "dup", "job_description": "a.txt"}\n\n'
+                                         '{"company": " dup ", "job_description": "b.txt"}\n')
+    with pytest.raises(ValueError, match="row 2 repeats company 'dup' from row 1"):
+        batch.load_manifest(path)
+
+
+def test_rows_need_both_fields(tmp_path):
+    path = write(tmp_path, "jobs.jsonl", '{"company": "acme"}\n')
+    with pytest.raises(ValueError, match="row 1 needs both"):
+        batch.load_manifest(path)
+
+
+def test_workers_must_be_positive(capsys):
+    with pytest.raises(SystemExit):
+        batch.parse_args(["jobs.jsonl", "--workers", "0"])
+    assert "--workers must be at least 1" in capsys.readouterr().err
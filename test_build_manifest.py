@@ -0,0 +1,53 @@
+"""Checkpoint freshness in build_manifest."""
+from build_manifest import BuildManifest, digest
+
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+def test_digest_separates_parts():
+    assert digest("ab", "c") != digest("a", "bc")
+    assert digest("a") == digest(b"a")
+
+
+def test_fresh_until_inputs_or_artifact_change(tmp_path):
+    artifact = write(tmp_path / "out.tex", "x")
+    manifest = BuildManifest(str(tmp_path))
+    assert not manifest.is_fresh("resume_tex", "in", artifact)
+    manifest.record("resume_tex", "in", artifact)
+    assert manifest.is_fresh("resume_tex", "in", artifact)
+    assert not manifest.is_fresh("resume_tex", "other", artifact)
+    write(tmp_path / "out.tex", "edited by hand")
+    assert not manifest.is_fresh("resume_tex", "in", artifact)
+
+
+def test_missing_artifact_is_stale(tmp_path):
+    artifact = write(tmp_path / "out.pdf", "x")
+    manifest = BuildManifest(str(tmp_path))
+    manifest.record("resume_pdf", "in", artifact)
+    (tmp_path / "out.pdf").unlink()
+    assert not manifest.is_fresh("resume_pdf", "in", artifact)
+
+
+def test_failed_and_forgotten_stages_are_stale(tmp_path):
+    artifact = write(tmp_path / "out.tex", "x")
+    manifest = BuildManifest(str(tmp_path))
+    manifest.record("resume_tex", "in", artifact)
+    manifest.fail("resume_tex", "in", "boom")
+    assert not manifest.is_fresh("resume_tex", "in", artifact)
+    manifest.record("resume_tex", "in", artifact)
+    manifest.forget("resume_tex")
+    assert not manifest.is_fresh("resume_tex", "in", artifact)
+
+
+def test_checkpoints_survive_a_reload(tmp_path):
+    artifact = write(tmp_path / "out.tex", "x")
+    BuildManifest(str(tmp_path)).record("resume_tex", "in", artifact)
+    assert BuildManifest(str(tmp_path)).is_fresh("resume_tex", "in", artifact)
+
+
+def test_corrupt_manifest_starts_empty(tmp_path):
+    write(tmp_path / ".build_manifest.json", "{not json")
+    assert BuildManifest(str(tmp_path)).stages == {}
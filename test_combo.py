@@ -0,0 +1,69 @@
+"""Section repair in combo.py, with a stand-in client instead of the API."""
+import copy
+import json
+import types
+
+import combo
+from resume_schema import MAX_ACHIEVEMENTS, validate_resume
+
+with open("resume.json") as f:
+    RESUME = json.load(f)
+
+
+class FakeClient:
+    """Answers every chat completion with the next of `answers`, recording the prompts."""
+
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.prompts = []
+        self.chat = types.SimpleNamespace(completions=self)
+
+    def create(self, model, messages, max_tokens=None, **kwargs):
+        self.prompts.append(messages[-1]["content"])
+        message = types.SimpleNamespace(content=self.answers.pop(0))
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message, finish_reason="stop")],
+                                     usage=None)
+
+
+def too_long_experience(resume):
+    resume = copy.deepcopy(resume)
+    resume["experience"][0]["achievements"] = [f"Built thing {i}" for i in range(MAX_ACHIEVEMENTS + 1)]
+    return resume
+
+
+def test_valid_resume_makes_no_calls():
+    client = FakeClient()
+    optimized, repaired = combo.repair_resume(client, copy.deepcopy(RESUME), RESUME, "job")
+    assert optimized == RESUME and repaired == set() and client.prompts == []
+
+
+def test_only_the_failing_section_is_re_requested():
+    fixed = copy.deepcopy(RESUME["experience"])
+    fixed[0]["achievements"] = ["Led it"]
+    client = FakeClient(json.dumps({"experience": fixed}))
+    optimized, repaired = combo.repair_resume(client, too_long_experience(RESUME), RESUME, "job")
+    assert repaired == {"experience"}
+    assert optimized["experience"] == fixed
+    assert len(client.prompts) == 1 and '"experience" section' in client.prompts[0]
+
+
+def test_fallback_to_the_original_section_is_trimmed_to_the_schema():
+    original = too_long_experience(RESUME)
+    answers = ["not json"] * combo.MAX_REPAIR_ATTEMPTS
+    optimized, repaired = combo.repair_resume(FakeClient(*answers), too_long_experience(RESUME),
+                                              original, "job")
+    assert repaired == {"experience"}
+    assert optimized["experience"][0]["achievements"] == \
+        original["experience"][0]["achievements"][:MAX_ACHIEVEMENTS]
+    assert validate_resume(optimized) == []
+
+
+def test_invalid_original_section_is_not_copied_back():
+    original = copy.deepcopy(RESUME)
+    original["summary"] = ""
+    broken = copy.deepcopy(RESUME)
+    broken["summary"] = "   "
+    answers = ["{}"] * combo.MAX_REPAIR_ATTEMPTS
+    optimized, repaired = combo.repair_resume(FakeClient(*answers), broken, original, "job")
+    assert repaired == set()
+    assert optimized["summary"] == "   "
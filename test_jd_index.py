@@ -0,0 +1,42 @@
+"""Persistence of the job description index."""
+import json
+import os
+import shutil
+
+from jd_index import INDEX_NAME, JdIndex
+
+
+def build(directory, files):
+    for name, text in files.items():
+        (directory / name).write_text(text)
+    index = JdIndex(str(directory)).load()
+    index.update()
+    index.save()
+    return index
+
+
+def test_saved_index_loads_back(tmp_path):
+    build(tmp_path, {"a.txt": "python django", "b.txt": "go kubernetes"})
+    loaded = JdIndex(str(tmp_path)).load()
+    assert [doc["file"] for doc in loaded.docs] == ["a.txt", "b.txt"]
+    assert loaded.update() == (0, 0, 0)
+
+
+def test_files_from_different_saves_are_not_paired(tmp_path):
+    build(tmp_path, {"a.txt": "python django", "b.txt": "go kubernetes"})
+    old_arrays = tmp_path / "old.npz"
+    shutil.copy(tmp_path / (INDEX_NAME + ".npz"), old_arrays)
+    # Same row count, different postings: only the save id tells the pairs apart
+    os.remove(tmp_path / "b.txt")
+    build(tmp_path, {"c.txt": "rust embedded"})
+    shutil.copy(old_arrays, tmp_path / (INDEX_NAME + ".npz"))
+    assert JdIndex(str(tmp_path)).load().docs == []
+
+
+def test_index_without_a_save_id_is_rebuilt(tmp_path):
+    build(tmp_path, {"a.txt": "python"})
+    meta_path = tmp_path / (INDEX_NAME + ".json")
+    meta = json.loads(meta_path.read_text())
+    del meta["save_id"]
+    meta_path.write_text(json.dumps(meta))
+    assert JdIndex(str(tmp_path)).load().docs == []
@@ -0,0 +1,95 @@
+"""RFC 6902 behaviour of json_patch.apply_patch."""
+import pytest
+
+from json_patch import JsonPatchError, apply_patch, parse_pointer
+
+DOC = {"a": {"b": [1, 2, 3]}, "c": "x", "~/": 0}
+
+
+def test_pointer_escapes():
+    assert parse_pointer("") == []
+    assert parse_pointer("/~0~1/a") == ["~/", "a"]
+    with pytest.raises(JsonPatchError):
+        parse_pointer("a/b")
+
+
+def test_add_appends_with_dash_and_inserts_by_index():
+    doc = apply_patch(DOC, [{"op": "add", "path": "/a/b/-", "value": 4},
+                            {"op": "add", "path": "/a/b/0", "value": 0}])
+    assert doc["a"]["b"] == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.parametrize("path", ["/a/b/01", "/a/b/4", "/a/b/-1", "/a/b/x"])
+def test_bad_array_indexes(path):
+    with pytest.raises(JsonPatchError):
+        apply_patch(DOC, [{"op": "replace", "path": path, "value": 0}])
+
+
+def test_dash_is_only_valid_for_add():
+    with pytest.raises(JsonPatchError):
+        apply_patch(DOC, [{"op": "remove", "path": "/a/b/-"}])
+
+
+def test_replace_needs_an_existing_target():
+    assert apply_patch(DOC, [{"op": "replace", "path": "/c", "value": "y"}])["c"] == "y"
+    with pytest.raises(JsonPatchError):
+        apply_patch(DOC, [{"op": "replace", "path": "/missing", "value": 1}])
+
+
+def test_replace_whole_document():
+    assert apply_patch(DOC, [{"op": "replace", "path": "", "value": [1]}]) == [1]
+
+
+def test_remove_whole_document_is_refused():
+    with pytest.raises(JsonPatchError):
+        apply_patch(DOC, [{"op": "remove", "path": ""}])
+
+
+def test_move_and_copy():
+    doc = apply_patch(DOC, [{"op": "move", "from": "/a/b/0", "path": "/a/b/-"},
+                            {"op": "copy", "from": "/c", "path": "/d"}])
+    assert doc["a"]["b"] == [2, 3, 1] and doc["d"] == "x" and doc["c"] == "x"
+
+
+def test_move_into_its_own_child_is_refused():
+    with pytest.raises(JsonPatchError, match="own child"):
+        apply_patch(DOC, [{"op": "move", "from": "/a", "path": "/a/b/0"}])
+
+
+@pytest.mark.parametrize("op", [
+    {"op": "move", "from": 3, "path": "/c"},
+    {"op": "copy", "from": "/c", "path": None},
+    {"op": "add", "path": "/c"},
+    {"op": "move", "path": "/c"},
+    {"op": "frobnicate", "path": "/c"},
+    "not an object",
+])
+def test_malformed_operations_raise_the_patch_error(op):
+    with pytest.raises(JsonPatchError):
+        apply_patch(DOC, [op])
+
+
+def test_test_operation():
+    assert apply_patch(DOC, [{"op": "test", "path": "/a/b/1", "value": 2}]) == DOC
+    with pytest.raises(JsonPatchError):
+        apply_patch(DOC, [{"op": "test", "path": "/a/b/1", "value": 3}])
+
+
+def test_failure_leaves_the_input_untouched():
+    doc = {"a": [1, 2]}
+    with pytest.raises(JsonPatchError):
+        apply_patch(doc, [{"op": "add", "path": "/a/-", "value": 3},
+                          {"op": "remove", "path": "/missing"}])
+    assert doc == {"a": [1, 2]}
+
+
+def test_values_are_copied_not_shared():
+    value = {"k": [1]}
+    doc = apply_patch(DOC, [{"op": "add", "path": "/v", "value": value}])
+    doc["v"]["k"].append(2)
+    assert value == {"k": [1]}
+
+
+def test_patch_must_be_a_list():
+    with pytest.raises(JsonPatchError):
+        apply_patch(DOC, {"op": "add"})
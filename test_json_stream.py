@@ -0,0 +1,31 @@
+"""Malformed optimize answers keep their good sections instead of aborting the run."""
+import combo
+from json_stream import SectionStreamParser
+
+
+def test_trailing_comma_drops_only_that_section():
+    text = '{"name": "a", "skills": [1, 2,], "summary": "s"}'
+    parser = SectionStreamParser()
+    completed = parser.feed(text)
+    assert completed == [("name", "a"), ("summary", "s")]
+    assert parser.unparsed == ["skills"]
+    assert combo.parse_resume_json(text) == {"name": "a", "summary": "s"}
+
+
+def test_bad_literal_drops_only_that_section():
+    text = '{"name": "a", "n": tru, "summary": "s"}'
+    assert combo.parse_resume_json(text) == {"name": "a", "summary": "s"}
+
+
+def test_truncated_document_keeps_complete_sections():
+    text = '{"name": "a", "summary": "s", "skills": {"languages": ["Py'
+    assert combo.parse_resume_json(text) == {"name": "a", "summary": "s"}
+
+
+def test_streaming_renderer_falls_back_on_a_malformed_key():
+    text = '{"name": "a", "b\\q": 1, "summary": "s"}'
+    renderer = combo.StreamingResumeRenderer()
+    for i in range(0, len(text), 5):
+        renderer.feed(text[i:i + 5])
+    assert renderer.failed and not renderer.rendered
+    assert combo.parse_resume_json(text) == {"name": "a"}
@@ -0,0 +1,38 @@
+"""latex_escape: text and URL escaping."""
+from latex_escape import LatexString, escape, escape_tree, escape_url
+
+
+def test_every_special_character():
+    assert escape("&%$#_{}~^") == r"\&\%\$\#\_\{\}\textasciitilde{}\textasciicircum{}"
+    assert escape("<|>") == r"\textless{}\textbar{}\textgreater{}"
+
+
+def test_inserted_braces_are_not_escaped_again():
+    assert escape("~{x}") == r"\textasciitilde{}\{x\}"
+
+
+def test_backslash_is_escaped_in_one_pass():
+    assert escape("a\\b{c}") == r"a\textbackslash{}b\{c\}"
+    assert escape("\\~") == r"\textbackslash{}\textasciitilde{}"
+
+
+def test_plain_text_and_non_strings():
+    assert escape("Built 5+ apps, cut cost 50 percent.") == "Built 5+ apps, cut cost 50 percent."
+    assert escape(3.9) == "3.9"
+
+
+def test_latex_strings_pass_through():
+    value = LatexString(r"\textbf{x}")
+    assert escape(value) is value
+
+
+def test_urls_keep_their_characters():
+    url = escape_url("https://example.com/a_b?x=1&y=2#top")
+    assert url == r"https://example.com/a_b?x=1\&y=2\#top"
+    assert isinstance(url, LatexString) and escape(url) is url
+
+
+def test_escape_tree_copies_nested_values():
+    tree = {"a": ["50%", {"b": "x_y"}], "n": 1}
+    assert escape_tree(tree) == {"a": [r"50\%", {"b": r"x\_y"}], "n": 1}
+    assert tree["a"][0] == "50%"
@@ -0,0 +1,77 @@
+"""Keys, expiry and eviction in llm_cache.ResponseCache."""
+import os
+import time
+
+from llm_cache import EVICT_TO, ResponseCache
+
+JSON_MODE = {"type": "json_object"}
+
+
+def test_key_covers_every_output_parameter():
+    base = ResponseCache.key("m", 100, "p")
+    assert ResponseCache.key("m", 100, "p", 1, None) == base
+    assert len({base, ResponseCache.key("m2", 100, "p"), ResponseCache.key("m", 200, "p"),
+                ResponseCache.key("m", 100, "q"), ResponseCache.key("m", 100, "p", 2),
+                ResponseCache.key("m", 100, "p", response_format=JSON_MODE)}) == 6
+
+
+def test_response_format_entries_are_separate(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put("m", 100, "p", "{}", response_format=JSON_MODE)
+    assert cache.get("m", 100, "p") is None
+    assert cache.get("m", 100, "p", response_format=JSON_MODE) == "{}"
+    cache.discard("m", 100, "p", response_format=JSON_MODE)
+    assert cache.get("m", 100, "p", response_format=JSON_MODE) is None
+
+
+def test_multi_candidate_entries(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put("m", 100, "p", ["a", "b"], 2)
+    assert cache.get("m", 100, "p", 2) == ["a", "b"]
+    assert cache.get("m", 100, "p") is None
+
+
+def test_expired_entries_miss(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_age=60)
+    cache.put("m", 100, "p", "old")
+    path = cache._path(cache.key("m", 100, "p"))
+    os.utime(path, (time.time() - 120, time.time() - 120))
+    assert cache.get("m", 100, "p") is None
+    assert not os.path.exists(path)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    cache = ResponseCache(str(tmp_path / "c"), enabled=False)
+    cache.put("m", 100, "p", "x")
+    assert cache.get("m", 100, "p") is None
+    assert not os.path.exists(tmp_path / "c")
+
+
+def test_eviction_drops_least_recently_used_below_the_limit(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=4000)
+    for i in range(60):
+        cache.put("m", 100, f"p{i}", "x" * 100)
+        time.sleep(0.001)  # distinct mtimes
+    sizes = [os.path.getsize(os.path.join(root, name))
+             for root, _, names in os.walk(str(tmp_path)) for name in names]
+    assert sum(sizes) <= 4000
+    assert cache.get("m", 100, "p59") is not None
+    assert cache.get("m", 100, "p0") is None
+
+
+def test_eviction_trims_to_the_low_water_mark(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_bytes=4000)
+    for i in range(30):
+        cache.put("m", 100, f"p{i}", "x" * 200)
+        time.sleep(0.001)
+    cache.evict()
+    total = sum(os.path.getsize(os.path.join(root, name))
+                for root, _, names in os.walk(str(tmp_path)) for name in names)
+    assert total <= 4000
+    # A walk that found the cache over the limit leaves room below it
+    cache.max_bytes = total - 1
+    cache.evict()
+    remaining = sum(os.path.getsize(os.path.join(root, name))
+                    for root, _, names in os.walk(str(tmp_path)) for name in names)
+    assert remaining <= (total - 1) * EVICT_TO
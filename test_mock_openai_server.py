@@ -0,0 +1,23 @@
+"""Canned answers of the mock server for the repair prompt."""
+import json
+
+import combo
+from mock_openai_server import canned_answer
+
+
+def repair_answer(section, original):
+    return json.loads(canned_answer(combo.build_repair_prompt(section, original, ["missing"], "job")))
+
+
+def test_repair_trims_achievements():
+    original = [{"company": "A", "achievements": [str(i) for i in range(7)]}]
+    assert repair_answer("experience", original)["experience"][0]["achievements"] == list("01234")
+
+
+def test_repair_of_a_null_section_echoes_it():
+    assert repair_answer("experience", None) == {"experience": None}
+
+
+def test_repair_of_malformed_entries_echoes_them():
+    original = ["not an entry", {"company": "A", "achievements": None}]
+    assert repair_answer("experience", original) == {"experience": original}
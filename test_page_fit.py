@@ -0,0 +1,21 @@
+"""Which bullets page_fit trims first."""
+import pytest
+
+from page_fit import rank_bullets
+
+pytest.importorskip("numpy")
+
+JOB = "Acme is hiring. At Acme you will build Python services. Acme Acme Acme."
+RESUME = {
+    "experience": [
+        {"achievements": ["Built Python services", "Shipped the Acme integration"]},
+    ],
+}
+
+
+def test_company_name_keeps_a_bullet_without_ignore():
+    assert rank_bullets(RESUME, JOB)[0] == ("experience", 0, 0)
+
+
+def test_ignored_company_name_adds_no_value():
+    assert rank_bullets(RESUME, JOB, ignore=["Acme"])[0] == ("experience", 0, 1)
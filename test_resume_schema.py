@@ -0,0 +1,45 @@
+"""The resume schema, its validator and trim_to_schema."""
+import copy
+import json
+
+from resume_schema import MAX_ACHIEVEMENTS, section_errors, trim_to_schema, validate_resume
+
+with open("resume.json") as f:
+    RESUME = json.load(f)
+
+
+def test_shipped_resume_is_valid():
+    assert validate_resume(RESUME) == []
+
+
+def test_reports_missing_and_mistyped_fields_by_path():
+    resume = copy.deepcopy(RESUME)
+    del resume["summary"]
+    resume["experience"][0]["title"] = 5
+    assert sorted(validate_resume(resume)) == [
+        (("experience", 0, "title"), "should be of type string, got int"),
+        (("summary",), "is missing"),
+    ]
+
+
+def test_too_many_achievements():
+    experience = copy.deepcopy(RESUME["experience"])
+    experience[0]["achievements"] = ["a"] * (MAX_ACHIEVEMENTS + 2)
+    assert section_errors("experience", experience) == [
+        f"experience[0].achievements has {MAX_ACHIEVEMENTS + 2} items, at most {MAX_ACHIEVEMENTS} allowed"
+    ]
+
+
+def test_trim_keeps_the_first_items_and_copies():
+    resume = copy.deepcopy(RESUME)
+    achievements = [f"a{i}" for i in range(MAX_ACHIEVEMENTS + 2)]
+    resume["experience"][0]["achievements"] = achievements
+    trimmed = trim_to_schema(resume)
+    assert trimmed["experience"][0]["achievements"] == achievements[:MAX_ACHIEVEMENTS]
+    assert len(resume["experience"][0]["achievements"]) == MAX_ACHIEVEMENTS + 2
+    assert validate_resume(trimmed) == []
+
+
+def test_trim_leaves_other_errors_alone():
+    assert trim_to_schema(None) is None
+    assert section_errors("summary", trim_to_schema("", {"type": "string", "minLength": 1}))
@@ -0,0 +1,166 @@
+"""
+Token accounting for the chat completion calls.
+
+count_tokens() counts prompt tokens locally (with tiktoken when it is installed,
+otherwise a characters-per-token estimate) so max_tokens can be sized from the
+input before anything is sent. complete() checks finish_reason. When a response
+stops at the token limit it asks the model to continue from where it stopped,
+rather than starting the whole request over. Every API call logs its prompt and
+completion token counts, and the running totals are kept for token_summary().
+"""
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import tracing
+
+CHARS_PER_TOKEN = 4  # rough average for English text and JSON without tiktoken
+CONTEXT_WINDOW = 128000
+MAX_OUTPUT_TOKENS = 16384
+MAX_CONTINUATIONS = 3
+CONTINUE_PROMPT = ("Your previous answer was cut off. Continue exactly where it stopped, "
+                   "without repeating anything and without any other text.")
+
+_totals_lock = threading.Lock()
+_totals = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "continuations": 0}
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model):
+    # tiktoken is imported on first use: it is slow to import and offline paths never count tokens
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # tiktoken downloads its tables on first use; work offline without it
+        return None
+
+
+def count_tokens(text, model):
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text))
+
+
+def output_budget(source_text, model, ratio=1.5, floor=1000, prompt=None):
+    """
+    max_tokens for an answer expected to be about ratio x as long as source_text,
+    never below floor and never more than the model's output or context limits.
+    """
+    budget = max(floor, int(count_tokens(source_text, model) * ratio) + 256)
+    budget = min(budget, MAX_OUTPUT_TOKENS)
+    if prompt is not None:
+        budget = min(budget, CONTEXT_WINDOW - count_tokens(prompt, model))
+    return budget
+
+
+def log_usage(label, usage, finish_reason, estimate=None):
+    """Print one call's token counts and add them to the totals."""
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    with _totals_lock:
+        _totals["calls"] += 1
+        _totals["prompt_tokens"] += prompt_tokens or 0
+        _totals["completion_tokens"] += completion_tokens or 0
+    tracing.add("prompt_tokens", prompt_tokens or 0)
+    tracing.add("completion_tokens", completion_tokens or 0)
+    if usage is None:
+        counts = f"~{estimate} prompt tokens (no usage reported)" if estimate else "no usage reported"
+    else:
+        counts = f"{prompt_tokens} prompt + {completion_tokens} completion tokens"
+    print(f"Tokens ({label or 'completion'}): {counts}, finish_reason={finish_reason}")
+
+
+def continuation_messages(prompt, partial):
+    return [
+        {"role": "user", "content": prompt},
+        {"role": "assistant", "content": partial},
+        {"role": "user", "content": CONTINUE_PROMPT},
+    ]
+
+
+def complete(client, model, prompt, max_tokens, response_format=None, label=None):
+    """
+    Chat completion for a single prompt that continues truncated answers
+    (finish_reason == "length") up to MAX_CONTINUATIONS times. Returns the text.
+    """
+    estimate = count_tokens(prompt, model)
+    kwargs = {"response_format": response_format} if response_format is not None else {}
+    response = client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=max_tokens,
+        **kwargs
+    )
+    choice = response.choices[0]
+    log_usage(label, getattr(response, "usage", None), choice.finish_reason, estimate)
+    return continue_if_truncated(client, model, prompt, max_tokens, choice.message.content or "",
+                                 choice.finish_reason, label)
+
+
+def complete_n(client, model, prompt, max_tokens, n, response_format=None, label=None):
+    """
+    n independent answers to one prompt, requested in a single call with the `n`
+    parameter. Truncated choices are continued one by one. Servers that ignore `n`
+    return fewer choices; the missing ones are requested as parallel single calls,
+    so it still costs one round trip. Returns a list of texts.
+    """
+    estimate = count_tokens(prompt, model)
+    kwargs = {"response_format": response_format} if response_format is not None else {}
+    response = client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=max_tokens,
+        n=n,
+        **kwargs
+    )
+    choices = sorted(response.choices, key=lambda c: c.index or 0)[:n]
+    log_usage(f"{label or 'completion'} x{len(choices)}", getattr(response, "usage", None),
+              ",".join(sorted({str(c.finish_reason) for c in choices})), estimate)
+
+    def finish(choice):
+        return continue_if_truncated(client, model, prompt, max_tokens, choice.message.content or "",
+                                     choice.finish_reason, label)
+
+    def single(_):
+        return complete(client, model, prompt, max_tokens, response_format, label)
+
+    with ThreadPoolExecutor(max_workers=n) as executor:
+        texts = executor.map(finish, choices)
+        extra = executor.map(single, range(n - len(choices)))
+        return list(texts) + list(extra)
+
+
+def continue_if_truncated(client, model, prompt, max_tokens, content, finish_reason, label=None):
+    """Append continuations to content while the model keeps stopping at max_tokens."""
+    for _ in range(MAX_CONTINUATIONS):
+        if finish_reason != "length":
+            break
+        print(f"Response ({label or 'completion'}) hit max_tokens={max_tokens}, requesting continuation")
+        with _totals_lock:
+            _totals["continuations"] += 1
+        # No JSON mode here: the continuation is a fragment, not a JSON document
+        response = client.chat.completions.create(
+            model=model,
+            messages=continuation_messages(prompt, content),
+            max_tokens=max_tokens,
+        )
+        choice = response.choices[0]
+        finish_reason = choice.finish_reason
+        log_usage((label or "completion") + " continuation", getattr(response, "usage", None),
+                  finish_reason)
+        content += choice.message.content or ""
+    return content
+
+
+def token_summary():
+    with _totals_lock:
+        totals = dict(_totals)
+    return (f"Tokens: {totals['prompt_tokens']} prompt + {totals['completion_tokens']} completion "
+            f"over {totals['calls']} calls ({totals['continuations']} continuations)")
@@ -0,0 +1,205 @@
+"""
+Lightweight tracing for the pipeline scripts (enabled with --profile).
+
+Wrap a stage in `with tracing.span("render", stage="resume_tex"):` to record its wall
+time, the CPU time of the thread that ran it and any counters attached to it
+(tracing.add("bytes_written", n), tracing.add("completion_tokens", n) inside the
+span). Spans nest per thread. Spans that run on pool threads show up on their own
+track.
+
+When tracing is off (the default) span() returns a shared no-op object, so the
+instrumentation costs one function call per stage. finish() writes the spans as
+Chrome trace JSON (open in chrome://tracing or ui.perfetto.dev), or as one JSON
+object per line when the path ends in .jsonl, and prints a per-stage summary.
+"""
+import functools
+import json
+import os
+import threading
+import time
+
+DEFAULT_PROFILE = "profile.trace.json"
+
+_tracer = None
+_local = threading.local()
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+    def add(self, key, amount):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    def __init__(self, tracer, name, attrs):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.start = self.wall = self.cpu = 0.0
+        self.thread = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, key, amount):
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self.thread = threading.current_thread().name
+        self._cpu_start = time.thread_time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.wall = time.perf_counter() - self.start
+        self.cpu = time.thread_time() - self._cpu_start
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        _local.stack.pop()
+        self.tracer.record(self)
+        return False
+
+
+class Tracer:
+    def __init__(self, path):
+        self.path = path
+        self.origin = time.perf_counter()
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def record(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def write(self):
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        threads = {}
+        for s in spans:
+            threads.setdefault(s.thread, len(threads) + 1)
+
+        with open(self.path, "w") as f:
+            if self.path.endswith(".jsonl"):
+                for s in spans:
+                    f.write(json.dumps({
+                        "name": s.name,
+                        "start": round(s.start - self.origin, 6),
+                        "wall": round(s.wall, 6),
+                        "cpu": round(s.cpu, 6),
+                        "thread": s.thread,
+                        **s.attrs,
+                    }) + "\n")
+            else:
+                events = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                           "args": {"name": name}} for name, tid in threads.items()]
+                for s in spans:
+                    events.append({
+                        "name": s.name,
+                        "cat": "pipeline",
+                        "ph": "X",
+                        "ts": round((s.start - self.origin) * 1e6, 1),
+                        "dur": round(s.wall * 1e6, 1),
+                        "pid": os.getpid(),
+                        "tid": threads[s.thread],
+                        "args": dict(s.attrs, cpu_ms=round(s.cpu * 1000, 3)),
+                    })
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return spans
+
+    def summary(self, spans):
+        totals = {}
+        for s in spans:
+            count, wall, cpu = totals.get(s.name, (0, 0.0, 0.0))
+            totals[s.name] = (count + 1, wall + s.wall, cpu + s.cpu)
+        lines = [f"{'stage':<24} {'count':>5} {'wall s':>8} {'cpu s':>8}"]
+        for name, (count, wall, cpu) in sorted(totals.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{name:<24} {count:5} {wall:8.3f} {cpu:8.3f}")
+        return "\n".join(lines)
+
+
+def enable(path=DEFAULT_PROFILE):
+    global _tracer
+    _tracer = Tracer(path)
+
+
+def enabled():
+    return _tracer is not None
+
+
+def span(name, **attrs):
+    if _tracer is None:
+        return _NULL_SPAN
+    return Span(_tracer, name, attrs)
+
+
+def traced(name=None):
+    """Decorator that runs every call of the function inside a span."""
+    def decorate(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with Span(_tracer, span_name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def current():
+    """The innermost open span on this thread (a no-op span when there is none)."""
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else _NULL_SPAN
+
+
+def add(key, amount):
+    """Add to a counter (bytes, tokens, ...) on the current span."""
+    if _tracer is not None:
+        current().add(key, amount)
+
+
+def finish():
+    """Write the trace file and print the per-stage summary; a no-op when disabled."""
+    global _tracer
+    if _tracer is None:
+        return
+    tracer, _tracer = _tracer, None
+    spans = tracer.write()
+    print(tracer.summary(spans))
+    print(f"Profile written to {tracer.path} ({len(spans)} spans)")
+
+
+def pop_profile_arg(args):
+    """
+    For scripts that parse sys.argv by hand: remove --profile[=PATH] from args and
+    return the trace path, or None when profiling was not requested. A separate PATH
+    argument is only taken when it ends in .trace.json(l), so an input .json file
+    that follows --profile stays an input.
+    """
+    for i, arg in enumerate(args):
+        if arg.startswith("--profile="):
+            args.pop(i)
+            return arg.split("=", 1)[1] or DEFAULT_PROFILE
+    if "--profile" not in args:
+        return None
+    i = args.index("--profile")
+    args.pop(i)
+    if i < len(args) and args[i].endswith((".trace.json", ".trace.jsonl")):
+        return args.pop(i)
+    return DEFAULT_PROFILE